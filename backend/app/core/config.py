@@ -29,11 +29,18 @@ class Settings(BaseSettings):
     
     # Database (PostgreSQL for auth)
     DATABASE_URL: str = ""  # Must be provided by env
+    DB_POOL_SIZE: int = 10        # Connections kept open by the async engine
+    DB_MAX_OVERFLOW: int = 20     # Extra connections allowed under bursts
+    DB_POOL_TIMEOUT: float = 10.0  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800   # Reconnect connections older than this (seconds)
     
     # JWT Auth
     JWT_SECRET: str = ""    # Must be provided by env
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_MINUTES: int = 60
+    AUTH_TOKEN_CACHE_SIZE: int = 10_000   # Verified tokens kept until they expire (LRU)
+    AUTH_USER_CACHE_TTL: int = 30         # Seconds a user's role/status is trusted without a query
+    AUTH_USER_CACHE_SIZE: int = 10_000
     
     # Admin
     ADMIN_EMAIL: str = ""    # Must be provided by env
@@ -49,6 +56,70 @@ class Settings(BaseSettings):
     # Frontend URL (for email links)
     FRONTEND_URL: str = ""   # Must be provided by env
 
+    # In-memory graph indexes
+    INDEX_TTL_SECONDS: int = 600     # Rebuild graph-derived indexes after this age
+    INDEX_REFRESH_DELAY_SECONDS: float = 5.0  # Writes within this delay share one background rebuild
+    FACET_MAX_HITS: int = 100000     # Upper bound on rows evaluated by a faceted search
+
+    # Map clustering
+    MAP_CLUSTER_MAX_ZOOM: int = 16   # Above this zoom, individual points are returned
+    MAP_CLUSTER_RADIUS: int = 60     # Cluster cell size in pixels (256px tiles), rounded to 256 / 2^k
+    MAP_CACHE_MAX_AGE: int = 300     # Cache-Control max-age for /map/all responses
+
+    # Aggregated entity detail (/entity/{type}/{id}/full)
+    ENTITY_DETAIL_DEADLINE_SECONDS: float = 8.0  # Shared deadline for all sections
+    ENTITY_DETAIL_CACHE_TTL: int = 600           # Seconds a complete document stays cached
+    ENTITY_DETAIL_CACHE_SIZE: int = 2000         # Max cached documents (LRU)
+    DOCUMENT_STORE_PATH: str = "entity_documents.sqlite3"  # SQLite file of materialized detail documents
+    DOCUMENT_STORE_CONCURRENCY: int = 4          # Documents built at a time when materializing
+    DOCUMENT_STORE_MATERIALIZE_ON_RELOAD: bool = True
+
+    # Batch entity lookup (/entities/batch)
+    ENTITY_BATCH_MAX_URIS: int = 5000     # URIs accepted per request
+    ENTITY_BATCH_CHUNK_SIZE: int = 500    # URIs per VALUES query
+    ENTITY_BATCH_CACHE_TTL: int = 600     # Seconds a resolved URI stays cached
+    ENTITY_BATCH_CACHE_SIZE: int = 50000  # Max cached URIs (LRU)
+
+    # Shared label dictionary (memory-mapped, see app.services.label_dictionary)
+    LABEL_DICTIONARY_PATH: str = "label_dictionary.bin"
+    LABEL_BATCH_MAX_URIS: int = 20000     # URIs accepted per /labels/batch request
+
+    # Graph exploration (/graph/neighbourhood)
+    GRAPH_EDGE_PAGE_SIZE: int = 10000     # Triples per query when loading the adjacency graph
+    GRAPH_MAX_DEPTH: int = 3
+    GRAPH_MAX_NODES: int = 2000
+    GRAPH_DEFAULT_FANOUT: int = 50        # Neighbours expanded per node unless overridden
+
+    # Similar exhibitions (/exhibitions/{id}/similar)
+    SIMILAR_TOP_K: int = 50               # Neighbours kept per exhibition in the precomputed table
+    SIMILAR_MAX_FEATURE_SHARE: float = 0.05  # Features in more exhibitions than this share are ignored
+    SIMILAR_BLOCK_PAIRS: int = 5_000_000  # Candidate pairs scored per block (bounds memory)
+
+    # Bulk creation (/bulk/*)
+    BULK_MAX_ITEMS: int = 1000            # Entities accepted per bulk request
+    BULK_CHUNK_BYTES: int = 256_000       # Max size of each INSERT DATA update sent to Virtuoso
+
+    # Asynchronous writes (?async_write=true, /jobs/{id})
+    WRITE_QUEUE_PATH: str = "write_queue.sqlite3"
+    WRITE_QUEUE_BATCH_SIZE: int = 100     # Jobs coalesced into one apply round
+    WRITE_QUEUE_MAX_BYTES: int = 1_000_000  # Max size of each coalesced SPARQL Update request
+    WRITE_QUEUE_LINGER_SECONDS: float = 0.2  # Wait after a wake-up so bursts are applied together
+
+    # Duplicate check (/duplicates/check)
+    DUPLICATE_MAX_DISTANCE: int = 2       # Max edit distance of "similar" names
+    DUPLICATE_MAX_CANDIDATES: int = 200   # Names sharing the most trigrams that are scored
+
+    # Response cache for graph reads, invalidated by entity URI
+    RESPONSE_CACHE_TTL: int = 600
+    RESPONSE_CACHE_SIZE: int = 5000       # Max cached responses (LRU)
+    RESPONSE_CACHE_MAX_BYTES: int = 1_000_000  # Larger responses are not cached
+
+    # Buffered metric ingestion (POST /metrics/)
+    METRIC_BUFFER_SIZE: int = 10_000      # Max buffered events; the oldest are dropped beyond it
+    METRIC_FLUSH_SIZE: int = 500          # Events per bulk INSERT (and flush trigger)
+    METRIC_FLUSH_INTERVAL_SECONDS: float = 5.0
+    METRIC_EXPORT_BATCH_SIZE: int = 5000  # Rows fetched per round trip by /metrics/export
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,25 +1,61 @@
 """
 Database connection and session management.
+
+Request handlers use the async engine (asyncpg) through `get_async_db`, so a
+slow query never blocks the event loop. The sync engine is kept for code that
+already runs outside of it: startup (`create_tables`, seeding), scripts and
+worker threads (metric buffer flushes, the streaming CSV export).
 """
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
 
+# Async driver for each sync dialect found in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url: str) -> URL:
+    """DATABASE_URL with its async driver (postgresql:// -> postgresql+asyncpg://)."""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    query = dict(parsed.query)
+    # asyncpg takes 'ssl' instead of libpq's 'sslmode'
+    if drivername == "postgresql+asyncpg" and "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return parsed.set(drivername=drivername, query=query)
+
+
 # Create engine
 engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session factory used by the request handlers
+async_engine = create_async_engine(
+    async_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base class for models
 Base = declarative_base()
 
 
 def get_db():
     """
-    Dependency that provides a database session.
-    
+    Dependency that provides a (sync) database session.
+
     Usage:
         @router.get("/")
         def endpoint(db: Session = Depends(get_db)):
@@ -32,6 +68,26 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    Dependency that provides an async database session.
+
+    Usage:
+        @router.get("/")
+        async def endpoint(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(User))
+            ...
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def create_tables():
     """Create all tables in the database."""
     Base.metadata.create_all(bind=engine)
+
+
+async def dispose_engines():
+    """Close the pooled connections (at shutdown)."""
+    await async_engine.dispose()
+    engine.dispose()
@@ -4,8 +4,10 @@ Security utilities for authentication.
 Provides password hashing, JWT token creation and validation.
 """
 
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -16,6 +18,9 @@ from app.core.config import settings
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Verified tokens: token -> (expiry timestamp, payload)
+_verified_tokens: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+
 
 def hash_password(password: str) -> str:
     """
@@ -72,14 +77,37 @@ def decode_token(token: str) -> Optional[dict]:
     """
     Decode and validate a JWT token.
     
+    Valid tokens are remembered until their 'exp' claim, so a token is only
+    verified once (up to AUTH_TOKEN_CACHE_SIZE tokens); invalid ones are not
+    remembered.
+    
     Args:
         token: JWT token string
         
     Returns:
         Decoded payload dict, or None if invalid
     """
+    cached = _verified_tokens.get(token)
+    if cached is not None:
+        expires, payload = cached
+        if time.time() < expires:
+            _verified_tokens.move_to_end(token)
+            return dict(payload)
+        del _verified_tokens[token]
+
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        return payload
     except JWTError:
         return None
+
+    expires = payload.get("exp")
+    if isinstance(expires, (int, float)):
+        _verified_tokens[token] = (float(expires), dict(payload))
+        while len(_verified_tokens) > settings.AUTH_TOKEN_CACHE_SIZE:
+            _verified_tokens.popitem(last=False)
+    return payload
+
+
+def clear_token_cache() -> None:
+    """Forget every verified token (e.g. after rotating JWT_SECRET)."""
+    _verified_tokens.clear()
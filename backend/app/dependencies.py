@@ -2,13 +2,14 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import decode_token
 from app.models.user import User, UserRole, UserStatus
 from app.services.sparql_client import SparqlClient, sparql_client
+from app.services.user_cache import load_user
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 security = HTTPBearer(auto_error=False)
@@ -16,9 +17,9 @@ security = HTTPBearer(auto_error=False)
 ALGORITHM = "HS256"
 
 
-def get_current_user(
+async def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Optional[User]:
     """
     Get current authenticated user from JWT token.
@@ -35,13 +36,13 @@ def get_current_user(
     if not user_id:
         return None
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await load_user(db, int(user_id))
     return user
 
 
-def get_current_user_optional(
+async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Optional[User]:
     """
     Get current authenticated user from JWT token if available, otherwise return None.
@@ -58,15 +59,15 @@ def get_current_user_optional(
         if not user_id:
             return None
         
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        user = await load_user(db, int(user_id))
         return user
     except Exception:
         return None
 
 
-def require_user(
+async def require_user(
     credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """
     Require authenticated active user.
@@ -86,7 +87,7 @@ def require_user(
         )
     
     user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await load_user(db, int(user_id))
     
     if not user:
         raise HTTPException(
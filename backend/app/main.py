@@ -5,14 +5,23 @@ Provides REST API endpoints for the OntoExhibit knowledge graph.
 """
 
 from contextlib import asynccontextmanager
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.core.database import create_tables
+from app.core.database import create_tables, dispose_engines
 from app.dependencies import get_current_user
-from app.routers import artworks, exhibitions, institutions, misc, persons, auth, catalogs, companies, map, example_queries, metrics
+from app.routers import artworks, exhibitions, institutions, misc, persons, auth, catalogs, companies, map, example_queries, metrics, entities, graph, bulk, jobs
 from app.core.seeding import seed_example_queries
+from app.services.graph_adjacency import adjacency_index
+from app.services.graph_index import track_stale_reads
+from app.services.map_index import map_index
+from app.services.metric_buffer import metric_buffer
+from app.services.name_index import name_indexes
+from app.services.sparql_client import sparql_client
+from app.services.write_queue import write_queue
+from app.services.response_cache import response_cache, response_dependencies
+from app.utils.http_cache import etag_matches, graph_etag, graph_path, is_graph_read, make_etag, request_signature
 
 
 @asynccontextmanager
@@ -33,8 +42,22 @@ async def lifespan(app: FastAPI):
         print("----------------------------------------------------------------")
     except Exception as e:
         print(f"Database initialization error (may be expected if DB not ready): {e}")
+
+    # Build the map snapshot in the background so the first map load is cached
+    map_index.warm(sparql_client)
+    # Write invalidation reaches the direct neighbours of touched entities
+    adjacency_index.warm(sparql_client)
+    # Duplicate checks run while typing: have the name index ready
+    name_indexes.warm(sparql_client)
+    # Apply asynchronous writes (including those left queued by a previous run)
+    write_queue.start(sparql_client)
+    # Flush buffered metric events in the background
+    metric_buffer.start()
     yield
-    # Shutdown: nothing to do
+    # Shutdown: queued writes stay in the journal until the next start
+    await write_queue.stop()
+    await metric_buffer.stop()
+    await dispose_engines()
 
 
 app = FastAPI(
@@ -59,6 +82,62 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def graph_etag_middleware(request: Request, call_next):
+    """
+    Response cache and conditional GETs for graph reads.
+    
+    JSON responses are kept in the response cache with a content ETag until a
+    write touches an entity they depend on. Other responses get an ETag
+    derived from the graph version, so a matching If-None-Match is answered
+    with 304 before the endpoint (and Virtuoso) is reached. Responses that set
+    their own ETag keep it. Responses built from a stale GraphIndex (still
+    rebuilding after a write) are sent with no-store instead.
+    """
+    if not is_graph_read(request):
+        return await call_next(request)
+
+    key = request_signature(request)
+    if request.method == "GET":
+        cached = response_cache.get(key)
+        if cached is not None:
+            headers = {"ETag": cached.etag, "Cache-Control": "no-cache", "X-Cache": "HIT"}
+            if etag_matches(request, cached.etag):
+                return Response(status_code=304, headers=headers)
+            return Response(cached.body, media_type=cached.media_type, headers=headers)
+
+    etag = graph_etag(request, sparql_client.version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    stale_reads = track_stale_reads()
+    response = await call_next(request)
+    if stale_reads["stale"]:
+        # Built from an index that is being rebuilt: neither cache nor validate it
+        for header in ("etag", "cache-control"):
+            if header in response.headers:
+                del response.headers[header]
+        response.headers["Cache-Control"] = "no-store"
+        return response
+    if response.status_code != 200 or "etag" in response.headers:
+        return response
+
+    media_type = response.headers.get("content-type", "")
+    if request.method == "GET" and media_type.startswith("application/json"):
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        passthrough = {k: v for k, v in response.headers.items() if k.lower() not in ("content-length", "content-type")}
+        if len(body) <= settings.RESPONSE_CACHE_MAX_BYTES:
+            content_etag = make_etag(body)
+            response_cache.set(key, body, media_type, content_etag, response_dependencies(graph_path(request), body))
+            headers = {"ETag": content_etag, "Cache-Control": "no-cache", "X-Cache": "MISS"}
+        return Response(body, media_type=media_type, headers={**passthrough, **headers})
+
+    response.headers.update(headers)
+    return response
+
+
 # Include routers
 app.include_router(auth.router, prefix=settings.DEPLOY_PATH)
 app.include_router(persons.router)
@@ -73,6 +152,10 @@ app.include_router(example_queries.router)
 app.include_router(map.router)
 app.include_router(example_queries.router)
 app.include_router(metrics.router)
+app.include_router(entities.router)
+app.include_router(graph.router)
+app.include_router(bulk.router)
+app.include_router(jobs.router)
 
 @app.get(f"{settings.DEPLOY_PATH}/", tags=["root"])
 async def root():
@@ -28,3 +28,26 @@ class Metric(Base):
     
     def __repr__(self):
         return f"<Metric(id={self.id}, type={self.event_type}, user={self.user_id})>"
+
+
+class MetricHourly(Base):
+    """
+    Hourly rollup of metric events: number of events per (hour, event type).
+
+    Maintained by the metric ingestion buffer in the same transaction as the
+    raw rows (see app.services.metric_rollups).
+    """
+    __tablename__ = "metrics_hourly"
+
+    bucket = Column(DateTime, primary_key=True)
+    event_type = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class MetricDaily(Base):
+    """Daily rollup of metric events: number of events per (day, event type)."""
+    __tablename__ = "metrics_daily"
+
+    bucket = Column(DateTime, primary_key=True)
+    event_type = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -6,7 +6,7 @@ Provides REST API endpoints for accessing and managing artwork data.
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import ORJSONResponse
 
 from app.core.config import settings
@@ -14,9 +14,14 @@ from app.dependencies import get_sparql_client, require_user
 from app.models.domain import ObraDeArte
 from app.models.user import User
 from app.models.responses import ErrorResponseModel, StandardResponseModel
-from app.routers.pagination import paginated_query
+from app.routers.pagination import faceted_query, paginated_query
+from app.services.facets import facet_indexes
+from app.services.invalidation import invalidate_write
+from app.services.name_index import name_indexes
 from app.services.queries.artworks import ArtworkQueries
 from app.services.sparql_client import SparqlClient
+from app.services.triple_diff import diff_update
+from app.services.write_queue import write_queue
 from app.utils.cursor import decode_cursor
 from app.utils.parsers import parse_sparql_response
 
@@ -101,16 +106,77 @@ async def all_artworks(
     )
     
     return ORJSONResponse(content=result)
+
+
+@router.get(
+    "/faceted_artworks", 
+    summary="Individuals of class artwork with facet counts", 
+    response_class=ORJSONResponse
+)
+async def faceted_artworks(
+    cursor: Optional[str] = None,
+    page_size: int = 10, 
+    q: Optional[str] = None,
+    author_name: Optional[str] = None,
+    type_filter: Optional[str] = None,
+    start_date: Optional[str] = None,
+    owner: Optional[str] = None,
+    topic: Optional[str] = None,
+    exhibition: Optional[str] = None,
+    author_uri: Optional[str] = None,
+    owner_uri: Optional[str] = None,
+    exhibition_uri: Optional[str] = None,
+    production_place: Optional[str] = None,
+    client: SparqlClient = Depends(get_sparql_client)
+):
+    """
+    Same filters and pagination as /all_artworks, plus the number of matching
+    artworks per type and topic.
+    """
+    query_ids = ArtworkQueries.get_obras_ids(
+        limit=settings.FACET_MAX_HITS,
+        text_search=q,
+        author_name=author_name,
+        type_filter=type_filter,
+        start_date=start_date,
+        owner=owner,
+        topic=topic,
+        exhibition=exhibition,
+        author_uri=author_uri,
+        owner_uri=owner_uri,
+        exhibition_uri=exhibition_uri,
+        production_place=production_place
+    )
+    
+    result = await faceted_query(
+        client=client,
+        facet_index=facet_indexes["artwork"],
+        get_ids_query=query_ids,
+        get_details_func=ArtworkQueries.get_obras_details,
+        cursor=cursor,
+        page_size=page_size,
+        label_field="inner_label"
+    )
+    
+    return ORJSONResponse(content=result)
+
+
 @router.post("/create_artwork", status_code=status.HTTP_201_CREATED)
 async def create_artwork(
     obra: ObraDeArte, 
     client: SparqlClient = Depends(get_sparql_client),
+    async_write: bool = Query(False, description="Queue the write and return a job (see /jobs/{id})"),
     user: User = Depends(require_user)
 ):
     """Create a new artwork in the knowledge graph."""
     try:
         query, uri = ArtworkQueries.add_obra(obra)
+        if async_write:
+            job = write_queue.enqueue("create_artwork", [query], [uri], {"uri": uri, "label": obra.name}, user_id=user.id)
+            return ORJSONResponse(status_code=status.HTTP_202_ACCEPTED, content=job)
         response = await client.update(query)
+        invalidate_write([query], [uri])
+        name_indexes.add("artwork", uri, obra.name)
         return {"uri": uri, "label": obra.name}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error adding artwork: {str(e)}")
@@ -120,6 +186,7 @@ async def create_artwork(
 async def update_artwork(
     obra: ObraDeArte, 
     client: SparqlClient = Depends(get_sparql_client),
+    async_write: bool = Query(False, description="Queue the write and return a job (see /jobs/{id})"),
     user: User = Depends(require_user)
 ):
     """Update an existing artwork in the knowledge graph."""
@@ -127,16 +194,21 @@ async def update_artwork(
         if not obra.uri:
             raise HTTPException(status_code=400, detail="URI is required for update")
         
-        # Delete existing triples for this entity (execute each query separately)
+        # Patterns of the entity's current triples, and the triples it should have
         delete_queries = ArtworkQueries.delete_obra(obra.uri)
-        for delete_query in delete_queries:
-            await client.update(delete_query)
-        
-        # Insert new triples with updated data
         insert_query, uri = ArtworkQueries.add_obra(obra)
-        await client.update(insert_query)
+        result = {"uri": uri, "label": obra.name, "updated": True}
+        if async_write:
+            job = write_queue.enqueue(
+                "update_artwork", [*delete_queries, insert_query], [obra.uri, uri], result, user_id=user.id
+            )
+            return ORJSONResponse(status_code=status.HTTP_202_ACCEPTED, content=job)
+
+        # Only the triples that changed are written
+        result.update(await diff_update(client, delete_queries, insert_query))
+        invalidate_write([*delete_queries, insert_query], [obra.uri, uri])
         
-        return {"uri": uri, "label": obra.name, "updated": True}
+        return result
     except HTTPException:
         raise
     except Exception as e:
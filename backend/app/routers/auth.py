@@ -1,8 +1,9 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import hash_password, verify_password, create_access_token
 from app.dependencies import get_current_user, require_user, require_admin
 from app.models.user import User, UserRole, UserStatus
@@ -16,12 +17,12 @@ from app.services.email import (
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 @router.post("/register", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user."""
     # Check if user already exists
-    if db.query(User).filter(User.email == user_data.email).first():
+    if await db.scalar(select(User.id).where(User.email == user_data.email)):
         raise HTTPException(status_code=400, detail="Email already registered")
-    if db.query(User).filter(User.username == user_data.username).first():
+    if await db.scalar(select(User.id).where(User.username == user_data.username)):
         raise HTTPException(status_code=400, detail="Username already taken")
     
     # Create user
@@ -36,8 +37,8 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         role=UserRole.USER
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     # Send confirmation emails
     send_registration_confirmation(user.email, user.full_name or user.username)
@@ -53,9 +54,9 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     return MessageResponse(message="Registration successful. Your account is pending administrator approval.")
 
 @router.post("/login", response_model=Token)
-async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Log in a user."""
-    user = db.query(User).filter(User.email == credentials.email).first()
+    user = await db.scalar(select(User).where(User.email == credentials.email))
     if not user or not verify_password(credentials.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
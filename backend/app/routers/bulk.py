@@ -0,0 +1,84 @@
+"""
+Bulk creation endpoints for data-entry imports.
+
+Each endpoint accepts an array of the model taken by the matching create_*
+endpoint and writes the whole batch with a few chunked INSERT DATA updates.
+"""
+
+from typing import Any, List, Tuple
+
+from fastapi import APIRouter, Body, Depends, HTTPException
+
+from app.core.config import settings
+from app.dependencies import get_sparql_client, require_user
+from app.models.domain import Exposicion, Institucion, ObraDeArte, Persona
+from app.models.user import User
+from app.services.bulk_insert import bulk_create
+from app.services.name_index import name_indexes
+from app.services.queries.artworks import ArtworkQueries
+from app.services.queries.base import URI_ONTOLOGIA
+from app.services.queries.exhibitions import ExhibitionQueries
+from app.services.queries.institutions import InstitutionQueries
+from app.services.queries.persons import PersonQueries
+from app.services.sparql_client import SparqlClient
+
+router = APIRouter(prefix=f"{settings.DEPLOY_PATH}/bulk", tags=["bulk"])
+
+
+def build_institution(entidad: Institucion) -> Tuple[str, str]:
+    # add_institucion only returns the query; it assigns entidad.id
+    query = InstitutionQueries.add_institucion(entidad)
+    return query, f"{URI_ONTOLOGIA}institution/{entidad.id}"
+
+
+async def run_bulk(client: SparqlClient, entity_type: str, items: List[Any], builder, label) -> dict:
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BULK_MAX_ITEMS} items per request")
+    try:
+        result = await bulk_create(client, items, builder, label)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error in bulk creation: {str(e)}")
+    created = [item for item in result["data"] if item["status"] == "created"]
+    for item in created:
+        name_indexes.add(entity_type, item["uri"], item["label"])
+    return result
+
+
+@router.post("/persons")
+async def bulk_create_persons(
+    personas: List[Persona] = Body(...),
+    client: SparqlClient = Depends(get_sparql_client),
+    user: User = Depends(require_user)
+):
+    """Create many persons at once; returns per-item results and throughput."""
+    return await run_bulk(client, "person", personas, PersonQueries.add_persona, lambda p: p.name)
+
+
+@router.post("/artworks")
+async def bulk_create_artworks(
+    obras: List[ObraDeArte] = Body(...),
+    client: SparqlClient = Depends(get_sparql_client),
+    user: User = Depends(require_user)
+):
+    """Create many artworks at once; returns per-item results and throughput."""
+    return await run_bulk(client, "artwork", obras, ArtworkQueries.add_obra, lambda o: o.name)
+
+
+@router.post("/exhibitions")
+async def bulk_create_exhibitions(
+    exposiciones: List[Exposicion] = Body(...),
+    client: SparqlClient = Depends(get_sparql_client),
+    user: User = Depends(require_user)
+):
+    """Create many exhibitions at once; returns per-item results and throughput."""
+    return await run_bulk(client, "exhibition", exposiciones, ExhibitionQueries.add_exposicion, lambda e: e.name)
+
+
+@router.post("/institutions")
+async def bulk_create_institutions(
+    entidades: List[Institucion] = Body(...),
+    client: SparqlClient = Depends(get_sparql_client),
+    user: User = Depends(require_user)
+):
+    """Create many institutions at once; returns per-item results and throughput."""
+    return await run_bulk(client, "institution", entidades, build_institution, lambda e: e.nombre)
@@ -0,0 +1,263 @@
+"""
+Aggregated entity detail endpoints.
+
+A detail page needs several sections (details, exhibitions, collaborators...)
+that are otherwise fetched one endpoint at a time. /entity/{type}/{id}/full
+runs every section concurrently under a shared deadline and returns them in a
+single document.
+
+Complete documents are kept in the entity document store (SQLite), which is
+materialized after data loads, so most detail views are a single lookup. The
+single-section endpoints (/get_person, /get_actor_roles, /get_exhibition,
+/get_object_any_type) answer from the same documents when they are stored.
+Writes through create_*/update_* drop the documents of the written entity,
+and only those are rebuilt.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.core.config import settings
+from app.dependencies import get_sparql_client, require_admin
+from app.routers import artworks, catalogs, companies, exhibitions, institutions, persons
+from app.services.detail_cache import building_documents, detail_cache, entity_id
+from app.services.entity_batch import object_properties
+from app.services.graph_index import run_in_background
+from app.services.queries.entities import EntityQueries
+from app.services.sparql_client import SparqlClient, sparql_client
+from app.utils.parsers import parse_sparql_response
+
+router = APIRouter(prefix=f"{settings.DEPLOY_PATH}/entity", tags=["entities"])
+
+# Each section reuses the endpoint serving it on its own: (id, client) -> {"data": ...}
+Section = Callable[[str, SparqlClient], Awaitable[Dict[str, Any]]]
+
+
+def object_section(object_type: str) -> Section:
+    """Section with the properties served by /get_object_any_type/{object_type}/{id}."""
+    async def section(id: str, client: SparqlClient) -> Dict[str, Any]:
+        return {"data": [await object_properties(client, object_type, id)]}
+    return section
+
+
+SECTIONS: Dict[str, Dict[str, Section]] = {
+    "institution": {
+        "details": institutions.get_institution,
+        "exhibitions": institutions.get_institution_exhibitions,
+        "lender_exhibitions": institutions.get_institution_lender_exhibitions,
+        "owned_artworks": institutions.get_institution_owned_artworks,
+        "collaborators": institutions.get_institution_collaborators,
+        "executives": institutions.get_institution_executives,
+        "parent": institutions.get_institution_parent,
+        "children": institutions.get_institution_children,
+        "object": object_section("institution"),
+    },
+    "person": {
+        "details": persons.get_person,
+        "roles": persons.get_actor_roles,
+        "collaborators": persons.get_person_collaborators,
+        "executive_positions": persons.get_person_executive_positions,
+        "object": object_section("human_actant"),
+    },
+    "exhibition": {
+        "details": exhibitions.get_exhibition,
+        "museographers": exhibitions.get_exhibition_museographers,
+        "catalogs": catalogs.get_exhibition_catalogs,
+        "object": object_section("exhibition"),
+    },
+    "artwork": {
+        "details": artworks.get_artwork,
+        "object": object_section("work_manifestation"),
+    },
+    "catalog": {
+        "details": catalogs.get_catalog,
+        "exhibitions": catalogs.get_catalog_exhibitions,
+    },
+    "company": {
+        "details": companies.get_company,
+        "museographer_exhibitions": companies.get_company_museographer_exhibitions,
+        "object": object_section("company"),
+    },
+}
+
+TYPE_ALIASES = {
+    "exposicion": "exhibition",
+    "persona": "person",
+    "human_actant": "person",
+    "actant": "person",
+    "actor": "person",
+    "institucion": "institution",
+    "obra": "artwork",
+    "catalogo": "catalog",
+    "empresa": "company",
+}
+
+
+async def run_section(section: Section, id: str, client: SparqlClient) -> Dict[str, Any]:
+    """Run one section, capturing its result or error and its duration."""
+    started = time.perf_counter()
+    try:
+        result = await section(id, client)
+        outcome = {"status": "ok", "data": result.get("data")}
+    except HTTPException as e:
+        outcome = {"status": "error", "error": str(e.detail)}
+    except Exception as e:
+        outcome = {"status": "error", "error": str(e)}
+    outcome["ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return outcome
+
+
+async def build_document(entity_type: str, id: str, client: SparqlClient) -> Dict[str, Any]:
+    """Run every section of `entity_type` for `id` under the shared deadline."""
+    started = time.perf_counter()
+    # The sections query the graph: a stored copy of this document is what is being replaced
+    with building_documents():
+        tasks = {
+            name: asyncio.create_task(run_section(section, id, client))
+            for name, section in SECTIONS[entity_type].items()
+        }
+    await asyncio.wait(tasks.values(), timeout=settings.ENTITY_DETAIL_DEADLINE_SECONDS)
+
+    results = {}
+    for name, task in tasks.items():
+        if task.done():
+            results[name] = task.result()
+        else:
+            task.cancel()
+            results[name] = {
+                "status": "timeout",
+                "error": "Section did not finish before the deadline",
+                "ms": round(settings.ENTITY_DETAIL_DEADLINE_SECONDS * 1000, 1),
+            }
+
+    return {
+        "type": entity_type,
+        "id": id,
+        "sections": results,
+        "complete": all(section["status"] == "ok" for section in results.values()),
+        "ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def is_storable(document: Dict[str, Any]) -> bool:
+    """Only complete documents of entities that exist are cached and stored."""
+    return document["complete"] and bool(document["sections"]["details"].get("data"))
+
+
+async def rebuild_documents(keys: List[Tuple[str, str]], client: SparqlClient) -> None:
+    """Rebuild the given (type, id) documents after a write."""
+    for entity_type, id in keys:
+        try:
+            document = await build_document(entity_type, id, client)
+            if is_storable(document):
+                detail_cache.set(entity_type, id, document)
+        except Exception as e:
+            print(f"Error rebuilding {entity_type} document {id}: {e}")
+
+
+def schedule_rebuild(keys: List[Tuple[str, str]]) -> None:
+    """detail_cache listener: rebuild dropped documents in the background."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    run_in_background(rebuild_documents(keys, sparql_client))
+
+
+detail_cache.on_invalidate(schedule_rebuild)
+
+
+async def materialize_documents(client: SparqlClient, types: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Build and store the document of every entity of the given types.
+
+    Runs at most DOCUMENT_STORE_CONCURRENCY documents at a time; returns how
+    many documents were stored per type.
+    """
+    semaphore = asyncio.Semaphore(settings.DOCUMENT_STORE_CONCURRENCY)
+    stored: Dict[str, int] = {}
+
+    async def materialize_one(entity_type: str, id: str) -> bool:
+        async with semaphore:
+            document = await build_document(entity_type, id, client)
+        if is_storable(document) and detail_cache.store is not None:
+            # Straight to the store: materializing everything would only churn the LRU
+            detail_cache.store.put(entity_type, id, document)
+            return True
+        return False
+
+    for entity_type in types or list(SECTIONS):
+        response = await client.query(EntityQueries.entity_uris(entity_type))
+        ids = sorted({entity_id(row["uri"]) for row in parse_sparql_response(response) if row.get("uri")})
+        results = await asyncio.gather(*(materialize_one(entity_type, id) for id in ids))
+        stored[entity_type] = sum(results)
+    return stored
+
+
+_materialization: Optional[asyncio.Task] = None
+
+
+def start_materialization(client: SparqlClient, types: Optional[List[str]] = None) -> bool:
+    """Start materializing documents in the background; False if a run is in progress."""
+    global _materialization
+    if _materialization is not None and not _materialization.done():
+        return False
+
+    async def run():
+        try:
+            stored = await materialize_documents(client, types)
+            print(f"Entity documents materialized: {stored}")
+        except Exception as e:
+            print(f"Error materializing entity documents: {e}")
+
+    _materialization = run_in_background(run())
+    return True
+
+
+@router.post("/materialize", summary="Rebuild the entity document store")
+async def materialize(
+    types: Optional[List[str]] = Query(None),
+    client: SparqlClient = Depends(get_sparql_client),
+    admin=Depends(require_admin)
+):
+    """
+    Materialize the detail document of every entity (of the given 'types') in
+    the background. Usually triggered by /reload_graph after a data load.
+    """
+    types = [TYPE_ALIASES.get(t.lower(), t.lower()) for t in types] if types else None
+    unknown = [t for t in types or [] if t not in SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unsupported entity types: {unknown}")
+    started = start_materialization(client, types)
+    return {
+        "status": "started" if started else "already running",
+        "documents": detail_cache.store.count() if detail_cache.store is not None else {},
+    }
+
+
+@router.get("/{type}/{id:path}/full")
+async def get_entity_full(type: str, id: str, client: SparqlClient = Depends(get_sparql_client)):
+    """
+    Get every section of an entity detail page in one response.
+
+    Served from the entity document store when available. Otherwise sections
+    run concurrently; those not finished within ENTITY_DETAIL_DEADLINE_SECONDS
+    are reported as "timeout" and the others are still returned. Each section
+    carries its 'status' and duration in 'ms'. Complete documents are stored
+    until the entity is written.
+    """
+    entity_type = TYPE_ALIASES.get(type.lower(), type.lower())
+    if entity_type not in SECTIONS:
+        raise HTTPException(status_code=400, detail=f"Unsupported entity type: {type}")
+
+    cached = detail_cache.get(entity_type, id)
+    if cached is not None:
+        return {**cached, "cached": True}
+
+    document = await build_document(entity_type, id, client)
+    if is_storable(document):
+        detail_cache.set(entity_type, id, document)
+    return {**document, "cached": False}
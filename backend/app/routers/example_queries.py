@@ -8,13 +8,15 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import decode_token
 from app.models.example_query import ExampleQuery
 from app.models.user import User, UserStatus, UserRole
+from app.services.user_cache import load_user
 
 
 router = APIRouter(prefix=f"{settings.DEPLOY_PATH}/example-queries", tags=["example-queries"])
@@ -45,9 +47,9 @@ class ExampleQueryResponse(BaseModel):
         from_attributes = True
 
 
-def get_current_user(
+async def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials],
-    db: Session
+    db: AsyncSession
 ) -> Optional[User]:
     """Extract and validate the current user from JWT token."""
     if not credentials:
@@ -61,7 +63,7 @@ def get_current_user(
     if not user_id:
         return None
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await load_user(db, int(user_id))
     if not user or user.status != UserStatus.ACTIVE:
         return None
     
@@ -70,7 +72,7 @@ def get_current_user(
 
 @router.get("", response_model=List[ExampleQueryResponse])
 async def list_example_queries(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     category: Optional[str] = None
 ):
     """
@@ -79,14 +81,14 @@ async def list_example_queries(
     Public endpoint - no authentication required.
     Optionally filter by category.
     """
-    query = db.query(ExampleQuery, User.username).join(
+    query = select(ExampleQuery, User.username).join(
         User, ExampleQuery.user_id == User.id
-    ).filter(ExampleQuery.is_approved == True)
+    ).where(ExampleQuery.is_approved == True)
     
     if category:
-        query = query.filter(ExampleQuery.category == category)
+        query = query.where(ExampleQuery.category == category)
     
-    results = query.order_by(ExampleQuery.created_at.desc()).all()
+    results = (await db.execute(query.order_by(ExampleQuery.created_at.desc()))).all()
     
     return [
         ExampleQueryResponse(
@@ -107,14 +109,14 @@ async def list_example_queries(
 async def create_example_query(
     query_data: ExampleQueryCreate,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new example query.
     
     Requires authentication. Only active users can create queries.
     """
-    user = get_current_user(credentials, db)
+    user = await get_current_user(credentials, db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -122,10 +124,10 @@ async def create_example_query(
         )
     
     # Check for duplicate name by same user
-    existing = db.query(ExampleQuery).filter(
+    existing = await db.scalar(select(ExampleQuery.id).where(
         ExampleQuery.name == query_data.name,
         ExampleQuery.user_id == user.id
-    ).first()
+    ))
     
     if existing:
         raise HTTPException(
@@ -144,8 +146,8 @@ async def create_example_query(
     )
     
     db.add(new_query)
-    db.commit()
-    db.refresh(new_query)
+    await db.commit()
+    await db.refresh(new_query)
     
     return ExampleQueryResponse(
         id=new_query.id,
@@ -163,7 +165,7 @@ async def create_example_query(
 async def delete_example_query(
     query_id: int,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete an example query.
@@ -171,14 +173,14 @@ async def delete_example_query(
     Requires authentication. Users can only delete their own queries.
     Admins can delete any query.
     """
-    user = get_current_user(credentials, db)
+    user = await get_current_user(credentials, db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication required"
         )
     
-    example_query = db.query(ExampleQuery).filter(ExampleQuery.id == query_id).first()
+    example_query = await db.get(ExampleQuery, query_id)
     
     if not example_query:
         raise HTTPException(
@@ -193,7 +195,7 @@ async def delete_example_query(
             detail="You can only delete your own queries"
         )
     
-    db.delete(example_query)
-    db.commit()
+    await db.delete(example_query)
+    await db.commit()
     
     return None
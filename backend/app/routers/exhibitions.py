@@ -6,7 +6,7 @@ Provides REST API endpoints for accessing and managing exhibition data.
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import ORJSONResponse
 
 from app.core.config import settings
@@ -14,9 +14,17 @@ from app.dependencies import get_sparql_client, require_user
 from app.models.domain import Exposicion
 from app.models.user import User
 from app.models.responses import ErrorResponseModel, StandardResponseModel
-from app.routers.pagination import paginated_query
+from app.routers.pagination import faceted_query, paginated_query
+from app.services.detail_cache import stored_section
+from app.services.exhibition_similarity import exhibition_similarity_index
+from app.services.facets import facet_indexes
+from app.services.invalidation import invalidate_write
+from app.services.label_dictionary import resolve_labels
+from app.services.name_index import name_indexes
 from app.services.queries.exhibitions import ExhibitionQueries
 from app.services.sparql_client import SparqlClient
+from app.services.triple_diff import diff_update
+from app.services.write_queue import write_queue
 from app.utils.cursor import decode_cursor
 from app.utils.parsers import parse_sparql_response
 
@@ -107,16 +115,83 @@ async def all_exhibitions(
     )
     
     return ORJSONResponse(content=result)
+
+
+@router.get(
+    "/faceted_exhibitions", 
+    summary="Individuals of class exhibition with facet counts", 
+    response_class=ORJSONResponse
+)
+async def faceted_exhibitions(
+    cursor: Optional[str] = None,
+    page_size: int = 10, 
+    q: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    curator_name: Optional[str] = None,
+    place: Optional[str] = None,
+    organizer: Optional[str] = None,
+    sponsor: Optional[str] = None,
+    theme: Optional[str] = None,
+    exhibition_type: Optional[str] = None,
+    participating_actant: Optional[str] = None,
+    displayed_artwork: Optional[str] = None,
+    curator: Optional[str] = None,
+    organizer_uri: Optional[str] = None,
+    sponsor_uri: Optional[str] = None,
+    client: SparqlClient = Depends(get_sparql_client)
+):
+    """
+    Same filters and pagination as /all_exhibitions, plus the number of matching
+    exhibitions per exhibition type and theme.
+    """
+    query_ids = ExhibitionQueries.get_exposiciones_ids(
+        limit=settings.FACET_MAX_HITS,
+        text_search=q,
+        start_date=start_date,
+        end_date=end_date,
+        curator_name=curator_name,
+        place=place,
+        organizer=organizer,
+        sponsor=sponsor,
+        theme=theme,
+        exhibition_type=exhibition_type,
+        participating_actant=participating_actant,
+        displayed_artwork=displayed_artwork,
+        curator=curator,
+        organizer_uri=organizer_uri,
+        sponsor_uri=sponsor_uri
+    )
+    
+    result = await faceted_query(
+        client=client,
+        facet_index=facet_indexes["exhibition"],
+        get_ids_query=query_ids,
+        get_details_func=ExhibitionQueries.get_exposiciones_details,
+        cursor=cursor,
+        page_size=page_size,
+        label_field="inner_label"
+    )
+    
+    return ORJSONResponse(content=result)
+
+
 @router.post("/create_exhibition", status_code=status.HTTP_201_CREATED)
 async def create_exhibition(
     exposicion: Exposicion, 
     client: SparqlClient = Depends(get_sparql_client),
+    async_write: bool = Query(False, description="Queue the write and return a job (see /jobs/{id})"),
     user: User = Depends(require_user)
 ):
     """Create a new exhibition in the knowledge graph."""
     try:
         query, uri = ExhibitionQueries.add_exposicion(exposicion)
+        if async_write:
+            job = write_queue.enqueue("create_exhibition", [query], [uri], {"uri": uri, "label": exposicion.name}, user_id=user.id)
+            return ORJSONResponse(status_code=status.HTTP_202_ACCEPTED, content=job)
         response = await client.update(query)
+        invalidate_write([query], [uri])
+        name_indexes.add("exhibition", uri, exposicion.name)
         return {"uri": uri, "label": exposicion.name, "message": "Exhibition created successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error adding exhibition: {str(e)}")
@@ -126,6 +201,7 @@ async def create_exhibition(
 async def update_exhibition(
     exposicion: Exposicion, 
     client: SparqlClient = Depends(get_sparql_client),
+    async_write: bool = Query(False, description="Queue the write and return a job (see /jobs/{id})"),
     user: User = Depends(require_user)
 ):
     """Update an existing exhibition in the knowledge graph."""
@@ -133,16 +209,21 @@ async def update_exhibition(
         if not exposicion.uri:
             raise HTTPException(status_code=400, detail="URI is required for update")
         
-        # Delete existing triples for this entity (execute each query separately)
+        # Patterns of the entity's current triples, and the triples it should have
         delete_queries = ExhibitionQueries.delete_exposicion(exposicion.uri)
-        for delete_query in delete_queries:
-            await client.update(delete_query)
-        
-        # Insert new triples with updated data
         insert_query, uri = ExhibitionQueries.add_exposicion(exposicion)
-        await client.update(insert_query)
+        result = {"uri": uri, "label": exposicion.name, "updated": True}
+        if async_write:
+            job = write_queue.enqueue(
+                "update_exhibition", [*delete_queries, insert_query], [exposicion.uri, uri], result, user_id=user.id
+            )
+            return ORJSONResponse(status_code=status.HTTP_202_ACCEPTED, content=job)
+
+        # Only the triples that changed are written
+        result.update(await diff_update(client, delete_queries, insert_query))
+        invalidate_write([*delete_queries, insert_query], [exposicion.uri, uri])
         
-        return {"uri": uri, "label": exposicion.name, "updated": True}
+        return result
     except HTTPException:
         raise
     except Exception as e:
@@ -169,10 +250,39 @@ async def get_exhibition_museographers(id: str, client: SparqlClient = Depends(g
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/exhibitions/{id:path}/similar")
+async def get_similar_exhibitions(
+    id: str,
+    limit: int = Query(10, ge=1, le=settings.SIMILAR_TOP_K),
+    client: SparqlClient = Depends(get_sparql_client)
+):
+    """
+    Get the exhibitions most similar to this one.
+
+    Served from the precomputed neighbour table: 'score' is the Jaccard index
+    of both exhibitions' participants, artworks, themes, venue and place, and
+    'shared' the number of those they have in common.
+    """
+    uri = f"https://w3id.org/OntoExhibit#exhibition/{id}"
+    try:
+        similarity = await exhibition_similarity_index.get(client)
+        similar = similarity.similar(uri, limit)
+        if similar:
+            labels = await resolve_labels(client, [s["uri"] for s in similar])
+            for exhibition in similar:
+                exhibition["label"] = labels.get(exhibition["uri"])
+        return {"data": similar}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/get_exhibition/{id:path}")
 async def get_exhibition(id: str, client: SparqlClient = Depends(get_sparql_client)):
     """Get detailed information for a specific exhibition by ID."""
     query = ExhibitionQueries.GET_EXHIBITION_BY_ID % id
+    stored = stored_section("exhibition", id, "details")
+    if stored is not None:
+        return {"data": stored, "sparql": query}
     try:
         response = await client.query(query)
         flat_data = parse_sparql_response(response)
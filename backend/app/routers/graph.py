@@ -0,0 +1,51 @@
+"""
+Graph exploration router - neighbourhoods for network visualizations.
+"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.core.config import settings
+from app.dependencies import get_sparql_client
+from app.services.graph_adjacency import adjacency_index
+from app.services.label_dictionary import resolve_labels
+from app.services.sparql_client import SparqlClient
+
+router = APIRouter(prefix=f"{settings.DEPLOY_PATH}/graph", tags=["graph"])
+
+
+@router.get("/neighbourhood/{uri:path}")
+async def get_neighbourhood(
+    uri: str,
+    depth: int = Query(1, ge=1, le=settings.GRAPH_MAX_DEPTH),
+    limit: int = Query(200, ge=1, le=settings.GRAPH_MAX_NODES),
+    fanout: int = Query(settings.GRAPH_DEFAULT_FANOUT, ge=1, le=settings.GRAPH_MAX_NODES,
+                        description="Max neighbours expanded per node"),
+    types: Optional[List[str]] = Query(None, description="Edge types (predicate names) to follow"),
+    labels: bool = Query(True, description="Attach node labels"),
+    client: SparqlClient = Depends(get_sparql_client)
+):
+    """
+    Get the nodes and edges within 'depth' hops of an entity.
+    
+    Walks the in-memory adjacency graph in both edge directions. Nodes carry
+    their hop 'depth' and 'degree'; edges their 'type' (predicate name).
+    'truncated' is true when the fan-out or node limit cut the walk short.
+    """
+    try:
+        graph = await adjacency_index.get(client)
+        result = graph.neighbourhood(uri, depth=depth, limit=limit, fanout=fanout, predicates=types)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Entity not found in the graph")
+
+    if labels:
+        try:
+            names = await resolve_labels(client, [node["id"] for node in result["nodes"]])
+        except Exception:
+            names = {}
+        for node in result["nodes"]:
+            node["label"] = names.get(node["id"])
+
+    return {**result, "edge_types": graph.predicates if types is None else types}
@@ -6,7 +6,7 @@ Provides REST API endpoints for accessing and managing institution data.
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import ORJSONResponse
 
 from app.core.config import settings
@@ -14,9 +14,14 @@ from app.dependencies import get_sparql_client, require_user
 from app.models.domain import Institucion
 from app.models.user import User
 from app.models.responses import ErrorResponseModel, StandardResponseModel
-from app.routers.pagination import paginated_query
+from app.routers.pagination import faceted_query, paginated_query
+from app.services.facets import facet_indexes
+from app.services.invalidation import invalidate_write
+from app.services.name_index import name_indexes
 from app.services.queries.institutions import InstitutionQueries
 from app.services.sparql_client import SparqlClient
+from app.services.triple_diff import diff_update
+from app.services.write_queue import write_queue
 from app.utils.cursor import decode_cursor
 from app.utils.parsers import group_by_uri, parse_sparql_response
 
@@ -87,19 +92,67 @@ async def all_institutions(
     )
     
     return ORJSONResponse(content=result)
+
+
+@router.get(
+    "/faceted_institutions", 
+    summary="Individuals of class institution with facet counts", 
+    response_class=ORJSONResponse
+)
+async def faceted_institutions(
+    cursor: Optional[str] = None,
+    page_size: int = 10, 
+    q: Optional[str] = None,
+    place: Optional[str] = None,
+    apelation: Optional[str] = None,
+    institution_type: Optional[str] = None,
+    client: SparqlClient = Depends(get_sparql_client)
+):
+    """
+    Same filters and pagination as /all_institutions, plus the number of matching
+    institutions per institution type.
+    """
+    query_ids = InstitutionQueries.get_instituciones_ids(
+        limit=settings.FACET_MAX_HITS,
+        text_search=q,
+        place=place,
+        apelation=apelation,
+        institution_type=institution_type
+    )
+    
+    result = await faceted_query(
+        client=client,
+        facet_index=facet_indexes["institution"],
+        get_ids_query=query_ids,
+        get_details_func=InstitutionQueries.get_instituciones_details,
+        cursor=cursor,
+        page_size=page_size,
+        label_field="label"
+    )
+    
+    return ORJSONResponse(content=result)
+
+
 @router.post("/create_institution", status_code=status.HTTP_201_CREATED)
 async def create_institution(
     entidad: Institucion, 
     client: SparqlClient = Depends(get_sparql_client),
+    async_write: bool = Query(False, description="Queue the write and return a job (see /jobs/{id})"),
     user: User = Depends(require_user)
 ):
     """Create a new institution in the knowledge graph."""
     try:
         query = InstitutionQueries.add_institucion(entidad)
+        uri = f"{settings.URI_ONTOLOGIA}institution/{entidad.id}"
+        if async_write:
+            job = write_queue.enqueue("create_institution", [query], [uri], {"label": entidad.nombre, "uri": uri}, user_id=user.id)
+            return ORJSONResponse(status_code=status.HTTP_202_ACCEPTED, content=job)
         await client.update(query)
+        invalidate_write([query], [uri])
+        name_indexes.add("institution", uri, entidad.nombre)
         return {
             "label": entidad.nombre,
-            "uri": f"{settings.URI_ONTOLOGIA}{entidad.id}",
+            "uri": uri,
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error adding institution: {str(e)}")
@@ -109,6 +162,7 @@ async def create_institution(
 async def update_institution(
     entidad: Institucion, 
     client: SparqlClient = Depends(get_sparql_client),
+    async_write: bool = Query(False, description="Queue the write and return a job (see /jobs/{id})"),
     user: User = Depends(require_user)
 ):
     """Update an existing institution in the knowledge graph."""
@@ -116,16 +170,21 @@ async def update_institution(
         if not entidad.uri:
             raise HTTPException(status_code=400, detail="URI is required for update")
         
-        # Delete existing triples for this entity (execute each query separately)
+        # Patterns of the entity's current triples, and the triples it should have
         delete_queries = InstitutionQueries.delete_institucion(entidad.uri)
-        for delete_query in delete_queries:
-            await client.update(delete_query)
-        
-        # Insert new triples with updated data
         insert_query = InstitutionQueries.add_institucion(entidad)
-        await client.update(insert_query)
+        result = {"uri": entidad.uri, "label": entidad.nombre, "updated": True}
+        if async_write:
+            job = write_queue.enqueue(
+                "update_institution", [*delete_queries, insert_query], [entidad.uri], result, user_id=user.id
+            )
+            return ORJSONResponse(status_code=status.HTTP_202_ACCEPTED, content=job)
+
+        # Only the triples that changed are written
+        result.update(await diff_update(client, delete_queries, insert_query))
+        invalidate_write([*delete_queries, insert_query], [entidad.uri])
         
-        return {"uri": entidad.uri, "label": entidad.nombre, "updated": True}
+        return result
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,30 @@
+"""
+Status of asynchronous writes (create/update endpoints called with async_write=true).
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.core.config import settings
+from app.dependencies import require_user
+from app.models.user import User, UserRole
+from app.services.write_queue import write_queue
+
+router = APIRouter(prefix=f"{settings.DEPLOY_PATH}/jobs", tags=["jobs"])
+
+
+@router.get("/{id}")
+async def get_job(id: str, user: User = Depends(require_user)):
+    """
+    Get the status of a queued write: "queued" (with its 'position' in the
+    queue), "running", "done" (with the 'result' of the write) or "failed"
+    (with its 'error').
+
+    Only the user who submitted the write, or an admin, can read its job.
+    """
+    try:
+        job = write_queue.get(id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if job is None or (job["user_id"] != user.id and user.role != UserRole.ADMIN):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {**job, "pending": write_queue.pending()}
@@ -1,251 +1,227 @@
 """
 Map router - Provides geolocated data for the interactive world map.
 """
-import random
 import asyncio
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 from app.core.config import settings
 from app.dependencies import get_sparql_client
+from app.services.map_index import ENTITY_TYPES, fetch_entities, map_index, parse_bbox
 from app.services.sparql_client import SparqlClient
+from app.utils.http_cache import cached_json_response, etag_matches
 from app.utils.parsers import parse_sparql_response
 from app.services.queries.base import PREFIXES
 
 router = APIRouter(prefix=f"{settings.DEPLOY_PATH}/map", tags=["map"])
 
-# --- Queries ---
 
-GET_EXHIBITIONS = f"""
-    {PREFIXES}
-    SELECT DISTINCT ?uri ?label ?lat ?long ?date_start ?date_end
-    WHERE {{
-        ?uri rdf:type <https://w3id.org/OntoExhibit#Exhibition> .
-        ?uri <http://www.w3.org/2003/01/geo/wgs84_pos#lat> ?lat .
-        ?uri <http://www.w3.org/2003/01/geo/wgs84_pos#long> ?long .
-        
-        OPTIONAL {{ ?uri rdfs:label ?direct_label }}
-        OPTIONAL {{ 
-            ?uri <https://w3id.org/OntoExhibit#hasTitle> ?title_node . 
-            ?title_node rdfs:label ?title_label 
-        }}
-        BIND(COALESCE(?title_label, ?direct_label, "Untitled Exhibition") AS ?label)
-        
-        OPTIONAL {{
-            ?uri <https://w3id.org/OntoExhibit#hasOpening> ?opening .
-            ?opening <https://w3id.org/OntoExhibit#hasTimeSpan> ?time_opening .
-            ?time_opening rdfs:label ?date_start
-        }}
-        OPTIONAL {{
-            ?uri <https://w3id.org/OntoExhibit#hasClosing> ?closing .
-            ?closing <https://w3id.org/OntoExhibit#hasTimeSpan> ?time_closing .
-            ?time_closing rdfs:label ?date_end
-        }}
-    }}
-"""
-
-GET_INSTITUTIONS = f"""
-    {PREFIXES}
-    SELECT DISTINCT ?uri ?label ?lat ?long
-    WHERE {{
-        ?uri rdf:type <https://w3id.org/OntoExhibit#Institution> .
-        ?uri <https://w3id.org/OntoExhibit#hasHeadquarters> ?hq .
-        ?hq <http://www.w3.org/2003/01/geo/wgs84_pos#lat> ?lat .
-        ?hq <http://www.w3.org/2003/01/geo/wgs84_pos#long> ?long .
-        
-        ?uri rdfs:label ?label .
-    }}
-"""
+@router.get("/all")
+async def get_all_geolocated_entities(
+    request: Request,
+    types: Optional[List[str]] = Query(None),
+    bbox: Optional[str] = Query(None, description="Viewport as 'west,south,east,north'"),
+    zoom: Optional[int] = Query(None, ge=0, le=24, description="Map zoom level; enables server-side clustering"),
+    from_year: Optional[int] = Query(None, description="Only entities active from this year"),
+    to_year: Optional[int] = Query(None, description="Only entities active until this year"),
+    client: SparqlClient = Depends(get_sparql_client)
+):
+    """
+    Get geolocated entities.
+    Optional 'types' valid values: 'exhibition', 'institution', 'person', 'artwork'.
+    If not provided, returns all.
+    
+    When 'zoom' is given, points are clustered on the server: the response holds
+    'clusters' (centroid, count and per-type counts) and the standalone 'data'
+    points inside 'bbox'. Individual points are only returned once the zoom is
+    past MAP_CLUSTER_MAX_ZOOM or a cluster holds a single point.
+    
+    'from_year'/'to_year' keep only the entities whose date range overlaps the
+    window (entities without dates are always kept), using the interval index.
+    
+    Every variant is served from the map index. Clustered and year-filtered
+    responses carry a strong content ETag and Cache-Control; the full list
+    gets the graph-version ETag, so a revalidation is answered with 304
+    without reading it.
+    """
+    if types is None:
+        types = list(ENTITY_TYPES)
 
-GET_PERSONS = f"""
-    {PREFIXES}
-    SELECT DISTINCT ?uri ?label ?lat ?long ?date_start ?date_end ?loc_type
-    WHERE {{
-        # Relaxed Type Check: Removed completely to allow any entity with location properties
-        # {{
-        #     ?uri rdf:type <https://w3id.org/OntoExhibit#Human_Actant> .
-        # }} UNION {{
-        #     ?uri rdf:type <https://w3id.org/OntoExhibit#Person> .
-        # }} UNION {{
-        #     ?uri rdf:type <https://w3id.org/OntoExhibit#Group> .
-        # }}
+    if zoom is not None:
+        try:
+            viewport = parse_bbox(bbox)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid bbox: {e}")
+        try:
+            points = await map_index.get(client)
+            hierarchy = points.hierarchy(types, from_year, to_year)
+            clusters, singles = hierarchy.clusters(zoom, viewport)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        return cached_json_response(request, {
+            "clusters": clusters,
+            "data": singles,
+            "count": sum(c["count"] for c in clusters) + len(singles),
+            "zoom": zoom,
+        }, settings.MAP_CACHE_MAX_AGE)
 
-        # Get Locations (UNION to get multiple per person)
-        {{
-            ?uri <https://w3id.org/OntoExhibit#hasResidency> ?place .
-            BIND("residence" AS ?loc_type)
-        }} UNION {{
-            ?uri <https://w3id.org/OntoExhibit#hasPlaceOfBirth> ?place .
-            BIND("birth" AS ?loc_type)
-        }} UNION {{ 
-            ?uri <https://w3id.org/OntoExhibit#hasFoundation> ?evt_f . 
-            ?evt_f <https://w3id.org/OntoExhibit#hasPlaceOfFoundation> ?place .
-            BIND("birth" AS ?loc_type)
-        }} UNION {{
-            ?uri <https://w3id.org/OntoExhibit#hasBirth> ?evt_b .
-            ?evt_b <https://w3id.org/OntoExhibit#hasPlaceOfBirth> ?place .
-            BIND("birth" AS ?loc_type)
-        }}
-        
-        ?place <http://www.w3.org/2003/01/geo/wgs84_pos#lat> ?lat .
-        ?place <http://www.w3.org/2003/01/geo/wgs84_pos#long> ?long .
-        
-        ?uri rdfs:label ?label .
-        
-        # Birth / Foundation Date
-        OPTIONAL {{
-            {{
-                ?uri <https://w3id.org/OntoExhibit#hasBirth> ?start_event .
-            }} UNION {{
-                ?uri <https://w3id.org/OntoExhibit#hasFoundation> ?start_event .
-            }}
-            ?start_event <https://w3id.org/OntoExhibit#hasTimeSpan> ?start_time .
-            ?start_time rdfs:label ?date_start
-        }}
-        
-        # Death / Dissolution Date
-        OPTIONAL {{
-            {{
-                ?uri <https://w3id.org/OntoExhibit#hasDeath> ?end_event .
-            }} UNION {{
-                ?uri <https://w3id.org/OntoExhibit#hasDissolution> ?end_event .
-            }}
-            ?end_event <https://w3id.org/OntoExhibit#hasTimeSpan> ?end_time .
-            ?end_time rdfs:label ?date_end
-        }}
-    }}
-"""
+    if from_year is not None or to_year is not None:
+        try:
+            points = await map_index.get(client)
+            data = points.items_at(points.point_ids(types, from_year, to_year))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        return cached_json_response(request, {"data": data, "count": len(data)}, settings.MAP_CACHE_MAX_AGE)
 
-GET_ARTWORKS = f"""
-    {PREFIXES}
-    SELECT DISTINCT ?uri ?label ?lat ?long ?date_start ?date_end
-    WHERE {{
-        ?uri rdf:type <https://w3id.org/OntoExhibit#Work_Manifestation> .
-        
-        # Find owner
-        ?uri <https://w3id.org/OntoExhibit#hasOwner> ?role .
-        ?owner <https://w3id.org/OntoExhibit#hasRole> ?role .
-        
-        # Get owner's location (Inst HQ or Person Residence)
-        {{
-            ?owner <https://w3id.org/OntoExhibit#hasHeadquarters> ?loc .
-        }} UNION {{
-            ?owner <https://w3id.org/OntoExhibit#hasResidency> ?loc .
-            # ?loc rdf:type <https://w3id.org/OntoExhibit#Place_Of_Residence> . REMOVED STRICT CHECK
-        }}
-        
-        ?loc <http://www.w3.org/2003/01/geo/wgs84_pos#lat> ?lat .
-        ?loc <http://www.w3.org/2003/01/geo/wgs84_pos#long> ?long .
-        
-        OPTIONAL {{ ?uri rdfs:label ?direct_label }}
-        OPTIONAL {{ 
-            ?uri <https://w3id.org/OntoExhibit#hasTitle> ?title_node . 
-            ?title_node rdfs:label ?title_label 
-        }}
-        BIND(COALESCE(?title_label, ?direct_label, "Untitled Artwork") AS ?label)
+    try:
+        points = await map_index.get(client)
+        data = points.items_at(points.point_ids(types))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    # Plain JSON: the graph ETag answers revalidations before the index is read
+    return {"data": data, "count": len(data)}
 
-        # Artwork dates (Production)
-        OPTIONAL {{
-             ?uri <https://w3id.org/OntoExhibit#hasProduction> ?prod .
-             OPTIONAL {{
-                ?prod <https://w3id.org/OntoExhibit#hasTimeSpan> ?tr_s .
-                ?tr_s <https://w3id.org/OntoExhibit#hasStartingDate> ?start_date_node .
-                ?start_date_node rdfs:label ?date_start .
-             }}
-             OPTIONAL {{
-                ?prod <https://w3id.org/OntoExhibit#hasTimeSpan> ?tr_e .
-                ?tr_e <https://w3id.org/OntoExhibit#hasEndingDate> ?end_date_node .
-                ?end_date_node rdfs:label ?date_end .
-             }}
-        }}
-    }}
-"""
 
-def process_entities(data: List[dict], entity_type: str) -> List[dict]:
-    result = []
-    for item in data:
-        uri = item.get("uri", "")
-        # Extract ID from URI (last part after / or #)
-        id_part = uri.split("/")[-1] if "/" in uri else uri.split("#")[-1]
-        
-        # Check for location type (residence/birth) to generate unique ID for multiple points
-        loc_type = item.get("loc_type")
-        if loc_type:
-            id_part = f"{id_part}_{loc_type}"
+@router.get("/stream")
+async def stream_geolocated_entities(
+    types: Optional[List[str]] = Query(None),
+    client: SparqlClient = Depends(get_sparql_client)
+):
+    """
+    Streaming variant of /map/all, as NDJSON.
+    
+    The query of each entity type runs concurrently and its points are sent as
+    one line as soon as it finishes: {"type", "data", "count"}. A type whose
+    query fails sends {"type", "error"} instead, without affecting the others.
+    The last line is {"done": true, "count": total}.
+    """
+    if types is None:
+        types = list(ENTITY_TYPES)
+    types = [t for t in ENTITY_TYPES if t in types]
 
-        lat = item.get("lat")
-        long = item.get("long")
-        
-        if not lat or not long:
-            continue
-            
+    async def fetch_type(etype):
         try:
-            # Jitter: Add small random noise to coordinates to prevent exact overlaps
-            # +/- 0.0001 degrees is roughly 11 meters
-            jitter_amount = 0.0001
-            lat_float = float(lat) + random.uniform(-jitter_amount, jitter_amount)
-            long_float = float(long) + random.uniform(-jitter_amount, jitter_amount)
-        except (ValueError, TypeError):
-            continue
-        
-        result.append({
-            "id": id_part,
-            "uri": uri,
-            "type": entity_type,
-            "label": item.get("label", f"Unknown {entity_type}"),
-            "lat": lat_float,
-            "long": long_float,
-            "date_start": item.get("date_start"),
-            "date_end": item.get("date_end")
-        })
-    return result
+            return etype, await fetch_entities(client, etype), None
+        except Exception as e:
+            return etype, None, str(e)
 
-@router.get("/all")
-async def get_all_geolocated_entities(
+    async def lines():
+        total = 0
+        for next_done in asyncio.as_completed([fetch_type(etype) for etype in types]):
+            etype, data, error = await next_done
+            if error is not None:
+                yield orjson.dumps({"type": etype, "error": error}) + b"\n"
+                continue
+            total += len(data)
+            yield orjson.dumps({"type": etype, "data": data, "count": len(data)}) + b"\n"
+        yield orjson.dumps({"done": True, "count": total}) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get("/cluster_leaves")
+async def get_cluster_leaves(
+    cluster_id: str,
     types: Optional[List[str]] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    from_year: Optional[int] = Query(None, description="Only entities active from this year"),
+    to_year: Optional[int] = Query(None, description="Only entities active until this year"),
     client: SparqlClient = Depends(get_sparql_client)
 ):
     """
-    Get geolocated entities.
-    Optional 'types' valid values: 'exhibition', 'institution', 'person', 'artwork'.
-    If not provided, returns all.
+    Get the points inside a cluster returned by /map/all?zoom=...
+    
+    'types', 'from_year' and 'to_year' must match the request that produced the cluster.
     """
+    if types is None:
+        types = list(ENTITY_TYPES)
     try:
-        if types is None:
-            types = ['exhibition', 'institution', 'person', 'artwork']
-        
-        # Helper to run query safely
-        async def fetch_type(etype, query):
-            resp = await client.query(query)
-            data = parse_sparql_response(resp)
-            return process_entities(data, etype)
+        points = await map_index.get(client)
+        hierarchy = points.hierarchy(types, from_year, to_year)
+        leaves = hierarchy.leaves(cluster_id, limit=limit, offset=offset)
+    except (ValueError, IndexError):
+        raise HTTPException(status_code=400, detail="Invalid cluster_id")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"data": leaves, "count": len(leaves)}
 
-        tasks = []
-        if 'exhibition' in types:
-            tasks.append(fetch_type('exhibition', GET_EXHIBITIONS))
-        if 'institution' in types:
-            tasks.append(fetch_type('institution', GET_INSTITUTIONS))
-        if 'person' in types:
-            tasks.append(fetch_type('person', GET_PERSONS))
-        if 'artwork' in types:
-            tasks.append(fetch_type('artwork', GET_ARTWORKS))
-            
-        if not tasks:
-            return {"data": [], "count": 0}
+@router.get("/bbox")
+async def get_entities_in_bbox(
+    bbox: str = Query(..., description="Viewport as 'west,south,east,north'"),
+    types: Optional[List[str]] = Query(None),
+    limit: int = Query(5000, ge=1, le=50000),
+    from_year: Optional[int] = Query(None, description="Only entities active from this year"),
+    to_year: Optional[int] = Query(None, description="Only entities active until this year"),
+    client: SparqlClient = Depends(get_sparql_client)
+):
+    """Get the geolocated entities inside a bounding box, served from the spatial index."""
+    if types is None:
+        types = list(ENTITY_TYPES)
+    try:
+        viewport = parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bbox: {e}")
+    try:
+        points = await map_index.get(client)
+        data = points.in_bbox(viewport, types, limit, from_year, to_year)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"data": data, "count": len(data)}
 
-        results = await asyncio.gather(*tasks)
-        
-        # Flatten list
-        all_entities = []
-        for res in results:
-            all_entities.extend(res)
-        
-        return {"data": all_entities, "count": len(all_entities)}
+
+@router.get("/nearby")
+async def get_entities_nearby(
+    lat: float = Query(..., ge=-90, le=90),
+    long: float = Query(..., ge=-180, le=180),
+    radius: float = Query(10.0, gt=0, le=20000, description="Search radius in km"),
+    types: Optional[List[str]] = Query(None),
+    limit: int = Query(100, ge=1, le=5000),
+    from_year: Optional[int] = Query(None, description="Only entities active from this year"),
+    to_year: Optional[int] = Query(None, description="Only entities active until this year"),
+    client: SparqlClient = Depends(get_sparql_client)
+):
+    """
+    Get the geolocated entities within 'radius' km of a point, nearest first.
+    
+    Each item carries its 'distance_km'.
+    """
+    if types is None:
+        types = list(ENTITY_TYPES)
+    try:
+        points = await map_index.get(client)
+        data = points.nearby(lat, long, radius, types, limit, from_year, to_year)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"data": data, "count": len(data)}
+
+
+@router.get("/snapshot")
+async def get_map_snapshot(request: Request, client: SparqlClient = Depends(get_sparql_client)):
+    """
+    Get every map point as a compact columnar snapshot (see app.services.map_snapshot).
+    
+    The snapshot is precomputed and precompressed; it is served gzip-encoded
+    when the client accepts it, with an ETag so unchanged data revalidates
+    with a 304.
+    """
+    try:
+        snapshot = (await map_index.get(client)).snapshot()
     except Exception as e:
-        import traceback
-        traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request, snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(snapshot.gzipped, media_type="application/json", headers=headers)
+    return Response(snapshot.body, media_type="application/json", headers=headers)
+
+
 GET_MAP_META = f"""
     {PREFIXES}
     SELECT (MIN(?min_date) as ?min_year) (MAX(?max_date) as ?max_year)
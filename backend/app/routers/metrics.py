@@ -9,17 +9,18 @@ from typing import List, Dict, Any, Optional
 from enum import Enum
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, Date
-import csv
-import io
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.dependencies import get_current_user_optional, require_admin
 from app.models.metric import Metric
 from app.models.user import User
-from app.schemas.metric import MetricCreate, MetricResponse, MetricSummary, MetricTimeSeries, MetricTrend
+from app.services import metric_rollups
+from app.services.metric_buffer import metric_buffer
+from app.services.metric_export import export_csv
+from app.schemas.metric import MetricAccepted, MetricCreate, MetricResponse, MetricSummary, MetricTimeSeries, MetricTrend
 
 router = APIRouter(prefix=f"{settings.DEPLOY_PATH}/metrics", tags=["metrics"])
 
@@ -51,59 +52,62 @@ def get_date_range(time_range: TimeRange) -> tuple[datetime, datetime]:
     return start, end
 
 
-@router.post("/", response_model=MetricResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=MetricAccepted, status_code=status.HTTP_202_ACCEPTED)
 async def create_metric(
     metric_data: MetricCreate,
-    db: Session = Depends(get_db),
     user: User = Depends(get_current_user_optional)
 ):
     """
     Record a new metric event.
+
+    The event is buffered and written to the database in bulk shortly after
+    (see app.services.metric_buffer), so it shows up in the reports with a
+    delay of at most METRIC_FLUSH_INTERVAL_SECONDS.
     """
-    metric = Metric(
-        user_id=user.id if user else None,
-        event_type=metric_data.event_type,
-        payload=metric_data.payload
-    )
-    
-    db.add(metric)
-    db.commit()
-    db.refresh(metric)
-    
-    return metric
+    metric_buffer.add(metric_data.event_type, metric_data.payload, user.id if user else None)
+    return {"status": "accepted", "buffered": len(metric_buffer)}
+
+
+@router.get("/buffer")
+async def get_metric_buffer(admin: User = Depends(require_admin)):
+    """
+    State of the metric ingestion buffer: buffered, flushed and dropped events.
+    """
+    return metric_buffer.stats()
+
+
+@router.post("/rollups/rebuild")
+async def rebuild_metric_rollups(admin: User = Depends(require_admin)):
+    """
+    Recompute the hourly and daily rollups read by the dashboards from the raw
+    metrics table (admin only). They are kept up to date on ingestion; this is
+    only needed after editing the raw table by hand.
+    """
+    try:
+        buckets = await metric_buffer.rebuild_rollups()
+        return {"status": "rebuilt", "hourly_buckets": buckets}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/summary", response_model=List[MetricSummary])
 async def get_metrics_summary(
     time_range: TimeRange = Query(TimeRange.all, description="Time range filter"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin: User = Depends(require_admin)
 ):
     """
     Get aggregated metrics (admin only).
     """
     start, end = get_date_range(time_range)
-    
-    # Count by event type within date range
-    results = db.query(
-        Metric.event_type, 
-        func.count(Metric.id)
-    ).filter(
-        Metric.timestamp >= start,
-        Metric.timestamp <= end
-    ).group_by(Metric.event_type).all()
-    
-    summary = []
-    for event_type, count in results:
-        summary.append(MetricSummary(event_type=event_type, count=count))
-        
-    return summary
+    counts = await db.run_sync(metric_rollups.event_counts, start, end)
+    return [MetricSummary(event_type=event_type, count=count) for event_type, count in counts.items()]
 
 
 @router.get("/trends", response_model=List[MetricTrend])
 async def get_metrics_trends(
     time_range: TimeRange = Query(TimeRange.week, description="Time range for current period"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin: User = Depends(require_admin)
 ):
     """
@@ -116,27 +120,9 @@ async def get_metrics_trends(
     previous_start = current_start - duration
     previous_end = current_start
     
-    # Current period counts
-    current_results = db.query(
-        Metric.event_type, 
-        func.count(Metric.id)
-    ).filter(
-        Metric.timestamp >= current_start,
-        Metric.timestamp <= current_end
-    ).group_by(Metric.event_type).all()
-    
-    current_counts = {event_type: count for event_type, count in current_results}
-    
-    # Previous period counts
-    previous_results = db.query(
-        Metric.event_type, 
-        func.count(Metric.id)
-    ).filter(
-        Metric.timestamp >= previous_start,
-        Metric.timestamp < previous_end
-    ).group_by(Metric.event_type).all()
-    
-    previous_counts = {event_type: count for event_type, count in previous_results}
+    # Both periods are read from the rollups
+    current_counts = await db.run_sync(metric_rollups.event_counts, current_start, current_end)
+    previous_counts = await db.run_sync(metric_rollups.event_counts, previous_start, previous_end)
     
     # Combine and calculate trends
     all_types = set(current_counts.keys()) | set(previous_counts.keys())
@@ -167,37 +153,21 @@ async def get_metrics_trends(
 async def get_metrics_timeseries(
     time_range: TimeRange = Query(TimeRange.month, description="Time range filter"),
     event_type: Optional[str] = Query(None, description="Filter by event type"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin: User = Depends(require_admin)
 ):
     """
     Get time-series metrics data grouped by day (admin only).
     """
     start, end = get_date_range(time_range)
-    
-    query = db.query(
-        cast(Metric.timestamp, Date).label('date'),
-        Metric.event_type,
-        func.count(Metric.id).label('count')
-    ).filter(
-        Metric.timestamp >= start,
-        Metric.timestamp <= end
-    )
-    
-    if event_type:
-        query = query.filter(Metric.event_type == event_type)
-    
-    results = query.group_by(
-        cast(Metric.timestamp, Date),
-        Metric.event_type
-    ).order_by(cast(Metric.timestamp, Date)).all()
+    counts = await db.run_sync(metric_rollups.daily_counts, start, end, event_type)
     
     return [
         MetricTimeSeries(
-            date=str(row.date),
-            event_type=row.event_type,
-            count=row.count
-        ) for row in results
+            date=day.isoformat(),
+            event_type=type_,
+            count=count
+        ) for (day, type_), count in sorted(counts.items())
     ]
 
 
@@ -205,7 +175,7 @@ async def get_metrics_timeseries(
 async def get_recent_metrics(
     limit: int = 50,
     time_range: TimeRange = Query(TimeRange.all, description="Time range filter"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin: User = Depends(require_admin)
 ):
     """
@@ -213,51 +183,33 @@ async def get_recent_metrics(
     """
     start, end = get_date_range(time_range)
     
-    return db.query(Metric).filter(
+    return (await db.scalars(select(Metric).where(
         Metric.timestamp >= start,
         Metric.timestamp <= end
-    ).order_by(Metric.timestamp.desc()).limit(limit).all()
+    ).order_by(Metric.timestamp.desc()).limit(limit))).all()
 
 
 @router.get("/export")
 async def export_metrics(
     time_range: TimeRange = Query(TimeRange.all, description="Time range filter"),
-    db: Session = Depends(get_db),
+    gzip: bool = Query(False, description="Compress the CSV with gzip"),
     admin: User = Depends(require_admin)
 ):
     """
     Export metrics as CSV (admin only).
+
+    The file is streamed while it is read from the database (server-side
+    cursor, METRIC_EXPORT_BATCH_SIZE rows at a time); payloads are written as
+    JSON. With 'gzip' the stream is compressed into a .csv.gz file.
     """
     start, end = get_date_range(time_range)
     
-    metrics = db.query(Metric).filter(
-        Metric.timestamp >= start,
-        Metric.timestamp <= end
-    ).order_by(Metric.timestamp.desc()).all()
-    
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Header
-    writer.writerow(['ID', 'Timestamp', 'Event Type', 'User ID', 'Payload'])
-    
-    # Data rows
-    for m in metrics:
-        writer.writerow([
-            m.id,
-            m.timestamp.isoformat(),
-            m.event_type,
-            m.user_id or '',
-            str(m.payload) if m.payload else ''
-        ])
-    
-    output.seek(0)
-    
     filename = f"metrics_{time_range.value}_{datetime.utcnow().strftime('%Y%m%d')}.csv"
+    if gzip:
+        filename += ".gz"
     
     return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
+        export_csv(start, end, compress=gzip),
+        media_type="application/gzip" if gzip else "text/csv",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
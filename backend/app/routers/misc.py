@@ -1,17 +1,31 @@
 import re
-from typing import Optional
+import time
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from pydantic import BaseModel
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import decode_token
-from app.dependencies import get_sparql_client
+from app.dependencies import get_sparql_client, require_admin
+from app.routers.entities import start_materialization
+from app.services.co_participation import co_participation_index
+from app.services.detail_cache import detail_cache, stored_section
+from app.services.entity_batch import entity_batch, is_valid_uri, object_properties
+from app.services.exhibition_similarity import exhibition_similarity_index
+from app.services.graph_adjacency import adjacency_index
+from app.services.invalidation import invalidate_for_update
+from app.services.label_dictionary import label_index, resolve_labels
+from app.services.map_index import map_index
+from app.services.name_index import NAME_TYPES, TYPE_ALIASES, name_indexes
 from app.services.queries.misc import MiscQueries
+from app.services.response_cache import response_cache
 from app.services.sparql_client import SparqlClient
+from app.services.user_cache import load_user
 from app.utils.parsers import group_by_uri, parse_sparql_response
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix=f"{settings.DEPLOY_PATH}", tags=["misc"])
 security = HTTPBearer(auto_error=False)
@@ -101,7 +115,7 @@ async def execute_sparql(
     request: dict,
     client: SparqlClient = Depends(get_sparql_client),
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Execute a SPARQL query.
@@ -134,7 +148,7 @@ async def execute_sparql(
             # Verify user exists and is active
             from app.models.user import User, UserStatus
             user_id = payload.get("sub")
-            user = db.query(User).filter(User.id == int(user_id)).first()
+            user = await load_user(db, int(user_id))
             
             if not user:
                 raise HTTPException(status_code=401, detail="User not found")
@@ -144,6 +158,8 @@ async def execute_sparql(
             
             # Use update method for modifying queries
             response = await client.update(query)
+            # Drop what depends on the entities it names (or everything)
+            invalidate_for_update(query)
             # Update responses might be different format
             if isinstance(response, dict) and "message" in response:
                 return {"data": [], "message": response.get("message", "Update successful")}
@@ -160,6 +176,39 @@ async def execute_sparql(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/reload_graph", summary="Signal that the graph data was reloaded")
+async def reload_graph(
+    client: SparqlClient = Depends(get_sparql_client),
+    admin=Depends(require_admin)
+):
+    """
+    Mark the graph as changed after an ETL load into Virtuoso.
+    
+    In-memory indexes (facets...) are rebuilt on their next use; the map index
+    and its snapshot, the adjacency graph, the label dictionary, the
+    co-participation network, the similar exhibitions table and the
+    duplicate-check name index are rebuilt right away in the background, and
+    so is the entity document store (if DOCUMENT_STORE_MATERIALIZE_ON_RELOAD).
+    """
+    version = client.bump_version()
+    detail_cache.clear()
+    response_cache.clear()
+    map_index.warm(client)
+    adjacency_index.invalidate()
+    adjacency_index.warm(client)
+    label_index.invalidate()
+    label_index.warm(client)
+    co_participation_index.invalidate()
+    co_participation_index.warm(client)
+    exhibition_similarity_index.invalidate()
+    exhibition_similarity_index.warm(client)
+    name_indexes.invalidate()
+    name_indexes.warm(client)
+    if settings.DOCUMENT_STORE_MATERIALIZE_ON_RELOAD:
+        start_materialization(client)
+    return {"version": version}
+
+
 @router.post("/report")
 async def report_incident(
     report: dict
@@ -168,6 +217,17 @@ async def report_incident(
     print(f"INCIDENT REPORT: {report}")
     return {"status": "received", "message": "Report submitted successfully"}
 
+
+# get_object_any_type type -> entity document type holding its "object" section
+DOCUMENT_TYPES = {
+    "exhibition": "exhibition",
+    "human_actant": "person",
+    "institution": "institution",
+    "company": "company",
+    "work_manifestation": "artwork",
+}
+
+
 @router.get("/get_object_any_type/{type}/{id:path}")
 async def get_object_any_type(
     type: str, id: str, client: SparqlClient = Depends(get_sparql_client)
@@ -184,25 +244,119 @@ async def get_object_any_type(
     elif type in ["artwork", "obra", "work", "work_manifestation"]:
         type = "work_manifestation"
 
-    query = MiscQueries.GET_OBJECT_ANY_TYPE % (type, id, type, id, type, id)
+    document_type = DOCUMENT_TYPES.get(type)
+    if document_type is not None:
+        stored = stored_section(document_type, id, "object")
+        if stored is not None:
+            return {"data": stored}
+
     try:
-        response = await client.query(query)
-        flat_data = parse_sparql_response(response)
-        print(f"DEBUG: get_object_any_type({type}, {id}) response: {flat_data}")
-        
-        # Pivot data: convert list of {p, o} to single dict {p: o}
-        # This matches what frontend expects (properties object)
-        properties = {}
-        for item in flat_data:
-            p = item.get("p")
-            o = item.get("o")
-            if p and o:
-                # If multiple values exist for same property, you might want a list, 
-                # but frontend seems to take first or simple value. 
-                # We'll just overwrite or keep first. Let's keep first for simplicity or overwrite?
-                # Frontend loop iterates keys, so we need keys to be predicates.
-                properties[p] = o
-                
+        properties = await object_properties(client, type, id)
         return {"data": [properties]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+class UriBatchRequest(BaseModel):
+    uris: List[str]
+
+
+@router.post("/entities/batch", summary="Resolve many entity URIs in one call")
+async def get_entities_batch(
+    request: UriBatchRequest,
+    client: SparqlClient = Depends(get_sparql_client)
+):
+    """
+    Get the label and properties (as in get_object_any_type) of many URIs.
+    
+    URIs are resolved with chunked VALUES queries and cached per URI until the
+    graph changes. The response groups the objects by entity type and lists
+    the URIs that were not found or are not valid IRIs.
+    """
+    if len(request.uris) > settings.ENTITY_BATCH_MAX_URIS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.ENTITY_BATCH_MAX_URIS} URIs per request"
+        )
+    valid = [uri for uri in request.uris if is_valid_uri(uri)]
+    invalid = [uri for uri in request.uris if not is_valid_uri(uri)]
+
+    try:
+        resolved, cache_hits = await entity_batch.resolve(client, valid)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    grouped = {}
+    missing = []
+    for uri, obj in resolved.items():
+        if obj is None:
+            missing.append(uri)
+        else:
+            grouped.setdefault(obj["type"], []).append(obj)
+
+    return {
+        "data": grouped,
+        "count": len(resolved) - len(missing),
+        "missing": missing,
+        "invalid": invalid,
+        "cache_hits": cache_hits,
+    }
+
+
+@router.post("/labels/batch", summary="Resolve the labels of many URIs")
+async def get_labels_batch(
+    request: UriBatchRequest,
+    client: SparqlClient = Depends(get_sparql_client)
+):
+    """
+    Get the label of each URI from the shared label dictionary.
+    
+    Returns {uri: label} in 'data' and the URIs without a label in 'missing'.
+    """
+    if len(request.uris) > settings.LABEL_BATCH_MAX_URIS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.LABEL_BATCH_MAX_URIS} URIs per request"
+        )
+    try:
+        labels = await resolve_labels(client, request.uris)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    missing = [uri for uri in dict.fromkeys(request.uris) if uri not in labels]
+    return {"data": labels, "count": len(labels), "missing": missing}
+
+
+@router.get("/duplicates/check", summary="Check a name against existing entities")
+async def check_duplicates(
+    type: str,
+    name: str,
+    limit: int = Query(10, ge=1, le=50),
+    client: SparqlClient = Depends(get_sparql_client)
+):
+    """
+    Look for existing entities of 'type' (person, institution, exhibition,
+    artwork) that an entity named 'name' would duplicate.
+    
+    'exact' are names equal once accents, case and punctuation are ignored;
+    'collision' is the entity that already has the URI a create with this name
+    would get; 'similar' are names a few edits away ('distance').
+    """
+    entity_type = TYPE_ALIASES.get(type.lower(), type.lower())
+    if entity_type not in NAME_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported entity type: {type}")
+    try:
+        started = time.perf_counter()
+        indexes = await name_indexes.get(client)
+        result = indexes[entity_type].check(entity_type, name, limit=limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {**result, "type": entity_type, "ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+@router.get("/cache/stats", summary="Response cache statistics")
+async def get_cache_stats(admin=Depends(require_admin)):
+    """
+    Hit ratio of the graph read response cache, overall, since the last write
+    and before it, and how many responses the last write invalidated.
+    """
+    return response_cache.stats()
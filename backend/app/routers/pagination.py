@@ -10,6 +10,7 @@ from typing import Any, Callable, Dict, List, Optional, Tuple
 from fastapi import HTTPException
 from fastapi.responses import ORJSONResponse
 
+from app.services.facets import FacetIndex
 from app.services.sparql_client import SparqlClient
 from app.utils.cursor import decode_cursor, encode_cursor
 from app.utils.parsers import parse_sparql_response
@@ -62,30 +63,107 @@ async def paginated_query(
             if label_value and uri_value:
                 next_cursor = encode_cursor(label_value, uri_value)
         
-        # Extract URIs
-        uris = [item["uri"] for item in data_ids if "uri" in item]
+        # Step 2: Get details
+        final_data = await fetch_details(client, data_ids, get_details_func)
         
-        if not uris:
-            return {"data": data_ids, "next_cursor": next_cursor}
+        return {"data": final_data, "next_cursor": next_cursor}
         
-        # Step 2: Get details
-        query_details = get_details_func(uris)
-        response_details = await client.query(query_details)
-        data_details = parse_sparql_response(response_details)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def fetch_details(
+    client: SparqlClient,
+    data_ids: List[Dict[str, Any]],
+    get_details_func: Callable[[List[str]], str],
+) -> List[Dict[str, Any]]:
+    """
+    Replace each ID row with its details row, keeping the original order.
+    
+    Rows whose URI has no details are returned unchanged.
+    """
+    uris = [item["uri"] for item in data_ids if "uri" in item]
+    
+    if not uris:
+        return data_ids
+    
+    query_details = get_details_func(uris)
+    response_details = await client.query(query_details)
+    data_details = parse_sparql_response(response_details)
+    
+    # Merge: Map details by URI
+    details_map = {item["uri"]: item for item in data_details}
+    
+    # Reconstruct list maintaining original order
+    final_data = []
+    for item_id in data_ids:
+        uri = item_id.get("uri")
+        if uri and uri in details_map:
+            final_data.append(details_map[uri])
+        else:
+            final_data.append(item_id)
+    
+    return final_data
+
+
+async def faceted_query(
+    client: SparqlClient,
+    facet_index: FacetIndex,
+    get_ids_query: str,
+    get_details_func: Callable[[List[str]], str],
+    cursor: Optional[str] = None,
+    page_size: int = 10,
+    label_field: str = "label",
+) -> Dict[str, Any]:
+    """
+    Execute a faceted search: one page of results plus facet counts.
+    
+    The filtered ID query is evaluated once without paging; its URIs become a
+    bitmap over the entity's FacetTable so every facet count is a bitwise AND.
+    The page itself is cut from the same (URI-ordered) result list.
+    
+    Args:
+        client: SparqlClient instance
+        facet_index: FacetIndex of the entity type being searched
+        get_ids_query: Filtered IDs query, built with a limit of FACET_MAX_HITS
+        get_details_func: Function that takes list of URIs and returns details query
+        cursor: Pagination cursor from previous page (or None for first page)
+        page_size: Number of items per page
+        label_field: Field name used for cursor (default: "label")
+        
+    Returns:
+        Dict with 'data', 'next_cursor', 'total' and 'facets'
+    """
+    try:
+        table = await facet_index.get(client)
         
-        # Merge: Map details by URI
-        details_map = {item["uri"]: item for item in data_details}
+        response_ids = await client.query(get_ids_query)
+        data_ids = parse_sparql_response(response_ids)
         
-        # Reconstruct list maintaining original order
-        final_data = []
-        for item_id in data_ids:
-            uri = item_id.get("uri")
-            if uri and uri in details_map:
-                final_data.append(details_map[uri])
-            else:
-                final_data.append(item_id)
+        total = len(data_ids)
+        facets = table.counts(table.mask(item["uri"] for item in data_ids if "uri" in item))
         
-        return {"data": final_data, "next_cursor": next_cursor}
+        # Cursor logic - IDs are ordered by URI, so resume after the last one seen
+        decoded = decode_cursor(cursor) if cursor else None
+        if decoded:
+            last_uri = decoded[1]
+            data_ids = [item for item in data_ids if item.get("uri", "") > last_uri]
+        
+        next_cursor = None
+        page = data_ids[:page_size]
+        if len(data_ids) > page_size:
+            last_item = page[-1]
+            label_value = last_item.get(label_field) or last_item.get("inner_label") or last_item.get("label")
+            next_cursor = encode_cursor(label_value or "", last_item.get("uri", ""))
+        
+        final_data = await fetch_details(client, page, get_details_func)
+        
+        return {
+            "data": final_data,
+            "next_cursor": next_cursor,
+            "total": total,
+            "facets": facets,
+        }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -6,7 +6,7 @@ Provides REST API endpoints for accessing and managing person/actor data.
 
 from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import ORJSONResponse
 
 from app.core.config import settings
@@ -14,9 +14,17 @@ from app.dependencies import get_sparql_client, require_user
 from app.models.domain import Persona
 from app.models.user import User
 from app.models.responses import ErrorResponseModel, StandardResponseModel
-from app.routers.pagination import paginated_query
+from app.routers.pagination import faceted_query, paginated_query
+from app.services.co_participation import co_participation_index
+from app.services.detail_cache import stored_section
+from app.services.facets import facet_indexes
+from app.services.invalidation import invalidate_write
+from app.services.label_dictionary import resolve_labels
+from app.services.name_index import name_indexes
 from app.services.queries.persons import PersonQueries
 from app.services.sparql_client import SparqlClient
+from app.services.triple_diff import diff_update
+from app.services.write_queue import write_queue
 from app.utils.cursor import decode_cursor
 from app.utils.parsers import group_by_uri, parse_sparql_response
 
@@ -79,6 +87,51 @@ async def all_persons(
     return ORJSONResponse(content=result)
 
 
+@router.get(
+    "/faceted_persons", 
+    summary="Individuals of class person with facet counts", 
+    response_class=ORJSONResponse
+)
+async def faceted_persons(
+    cursor: Optional[str] = None,
+    page_size: int = 10, 
+    q: Optional[str] = None,
+    birth_place: Optional[str] = None,
+    birth_date: Optional[str] = None,
+    death_date: Optional[str] = None,
+    gender: Optional[str] = None,
+    activity: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    client: SparqlClient = Depends(get_sparql_client)
+):
+    """
+    Same filters and pagination as /all_persons, plus the number of matching
+    actors per gender, activity and entity type.
+    """
+    query_ids = PersonQueries.get_personas_ids(
+        limit=settings.FACET_MAX_HITS,
+        text_search=q,
+        birth_place=birth_place,
+        birth_date=birth_date,
+        death_date=death_date,
+        gender=gender,
+        activity=activity,
+        entity_type=entity_type
+    )
+    
+    result = await faceted_query(
+        client=client,
+        facet_index=facet_indexes["person"],
+        get_ids_query=query_ids,
+        get_details_func=PersonQueries.get_personas_details,
+        cursor=cursor,
+        page_size=page_size,
+        label_field="label"
+    )
+    
+    return ORJSONResponse(content=result)
+
+
 @router.get("/count_persons", summary="Count of individuals of class actant/person")
 async def count_persons(client: SparqlClient = Depends(get_sparql_client)):
     """Get total count of persons/actors in the knowledge graph."""
@@ -101,6 +154,9 @@ async def count_persons(client: SparqlClient = Depends(get_sparql_client)):
 async def get_person(id: str, client: SparqlClient = Depends(get_sparql_client)):
     """Get detailed information for a specific person by ID."""
     query = PersonQueries.GET_PERSONS_AND_GROUPS % id
+    stored = stored_section("person", id, "details")
+    if stored is not None:
+        return {"data": stored, "sparql": query}
     try:
         response = await client.query(query)
         flat_data = parse_sparql_response(response)
@@ -114,12 +170,18 @@ async def get_person(id: str, client: SparqlClient = Depends(get_sparql_client))
 async def create_person(
     persona: Persona, 
     client: SparqlClient = Depends(get_sparql_client),
+    async_write: bool = Query(False, description="Queue the write and return a job (see /jobs/{id})"),
     user: User = Depends(require_user)
 ):
     """Create a new person in the knowledge graph."""
     try:
         query, uri = PersonQueries.add_persona(persona)
+        if async_write:
+            job = write_queue.enqueue("create_person", [query], [uri], {"uri": uri, "label": persona.name}, user_id=user.id)
+            return ORJSONResponse(status_code=status.HTTP_202_ACCEPTED, content=job)
         response = await client.update(query)
+        invalidate_write([query], [uri])
+        name_indexes.add("person", uri, persona.name)
         return {"uri": uri, "label": persona.name}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error adding person: {str(e)}")
@@ -129,26 +191,33 @@ async def create_person(
 async def update_person(
     persona: Persona, 
     client: SparqlClient = Depends(get_sparql_client),
+    async_write: bool = Query(False, description="Queue the write and return a job (see /jobs/{id})"),
     user: User = Depends(require_user)
 ):
     """Update an existing person in the knowledge graph.
     
-    This performs a delete of existing triples followed by re-insert with new data.
+    Only the difference between the person's current triples and the new data
+    is written; the response reports the triples 'added' and 'removed'.
     """
     try:
         if not persona.uri:
             raise HTTPException(status_code=400, detail="URI is required for update")
         
-        # Delete existing triples for this entity (execute each query separately)
+        # Patterns of the entity's current triples, and the triples it should have
         delete_queries = PersonQueries.delete_persona(persona.uri)
-        for delete_query in delete_queries:
-            await client.update(delete_query)
-        
-        # Insert new triples with updated data
         insert_query, uri = PersonQueries.add_persona(persona)
-        await client.update(insert_query)
+        result = {"uri": uri, "label": persona.name, "updated": True}
+        if async_write:
+            job = write_queue.enqueue(
+                "update_person", [*delete_queries, insert_query], [persona.uri, uri], result, user_id=user.id
+            )
+            return ORJSONResponse(status_code=status.HTTP_202_ACCEPTED, content=job)
+
+        # Only the triples that changed are written
+        result.update(await diff_update(client, delete_queries, insert_query))
+        invalidate_write([*delete_queries, insert_query], [persona.uri, uri])
         
-        return {"uri": uri, "label": persona.name, "updated": True}
+        return result
     except HTTPException:
         raise
     except Exception as e:
@@ -159,6 +228,9 @@ async def update_person(
 async def get_actor_roles(id: str, client: SparqlClient = Depends(get_sparql_client)):
     """Get all exhibitions and artworks where the actor participated in any role."""
     query = PersonQueries.get_actor_roles(id)
+    stored = stored_section("person", id, "roles")
+    if stored is not None:
+        return {"data": stored, "sparql": query}
     try:
         response = await client.query(query)
         flat_data = parse_sparql_response(response)
@@ -216,6 +288,33 @@ async def get_person_collaborators(id: str, client: SparqlClient = Depends(get_s
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/persons/{id:path}/top_collaborators")
+async def get_person_top_collaborators(
+    id: str,
+    limit: int = Query(20, ge=1, le=500),
+    types: Optional[List[str]] = Query(None, description="Collaborator entity types (human_actant, institution...)"),
+    client: SparqlClient = Depends(get_sparql_client)
+):
+    """
+    Get the actors who most often took part in the same exhibitions as this person.
+
+    Served from the precomputed co-participation network: 'weight' is the
+    number of shared exhibitions and 'jaccard' normalizes it by both actors'
+    exhibition counts. The network is rebuilt after data loads.
+    """
+    uri = f"https://w3id.org/OntoExhibit#human_actant/{id}"
+    try:
+        network = await co_participation_index.get(client)
+        collaborators = network.top_collaborators(uri, limit, types)
+        if collaborators:
+            labels = await resolve_labels(client, [c["uri"] for c in collaborators])
+            for collaborator in collaborators:
+                collaborator["label"] = labels.get(collaborator["uri"])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"data": collaborators or [], "exhibitions": network.exhibition_count(uri)}
+
+
 @router.get("/get_person_executive_positions/{id:path}")
 async def get_person_executive_positions(id: str, client: SparqlClient = Depends(get_sparql_client)):
     """Get institutions where this person holds an executive position."""
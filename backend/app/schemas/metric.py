@@ -4,15 +4,21 @@ Pydantic schemas for metrics.
 
 from datetime import datetime
 from typing import Optional, Dict, Any, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class MetricCreate(BaseModel):
     """Schema for creating a metric event."""
-    event_type: str
+    event_type: str = Field(..., max_length=50)
     payload: Optional[Dict[str, Any]] = None
 
 
+class MetricAccepted(BaseModel):
+    """Schema for a metric event accepted into the ingestion buffer."""
+    status: str
+    buffered: int
+
+
 class MetricResponse(BaseModel):
     """Schema for metric response."""
     id: int
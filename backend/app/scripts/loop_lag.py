@@ -0,0 +1,78 @@
+"""
+Load test: does database work stall the event loop?
+
+Sends concurrent requests to a database-backed endpoint and, at the same
+time, probes the health endpoint (which does no I/O) every few milliseconds.
+If handlers block the event loop, the probe latency grows with the load; with
+async database access it stays flat.
+
+Usage:
+    python -m app.scripts.loop_lag --url http://localhost:8000/api/v1 \\
+        --token <admin JWT> --path /metrics/summary?time_range=all
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import httpx
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def load(client: httpx.AsyncClient, path: str, headers: dict, deadline: float, latencies: List[float]) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get(path, headers=headers)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def probe(client: httpx.AsyncClient, deadline: float, interval: float, latencies: List[float]) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get("/")
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+
+
+async def run(args: argparse.Namespace) -> None:
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(base_url=args.url, timeout=60, limits=limits) as client:
+        baseline: List[float] = []
+        await probe(client, time.perf_counter() + 2, args.interval, baseline)
+
+        loaded: List[float] = []
+        requests: List[float] = []
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(
+            probe(client, deadline, args.interval, loaded),
+            *(load(client, args.path, headers, deadline, requests) for _ in range(args.concurrency)),
+        )
+
+    print(f"{args.path}: {len(requests)} requests, median {statistics.median(requests or [0]):.1f} ms")
+    for name, values in (("idle", baseline), ("under load", loaded)):
+        print(
+            f"health probe {name}: median {statistics.median(values or [0]):.1f} ms, "
+            f"p99 {percentile(values, 0.99):.1f} ms, max {max(values or [0]):.1f} ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000/api/v1", help="API base URL (with DEPLOY_PATH)")
+    parser.add_argument("--path", default="/metrics/summary?time_range=all", help="Database-backed endpoint")
+    parser.add_argument("--token", default="", help="JWT sent to the endpoint")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds under load")
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between health probes")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
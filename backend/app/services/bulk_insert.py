@@ -0,0 +1,137 @@
+"""
+Bulk creation of entities.
+
+Each entity is built with the same `add_*` builder used by the single create
+endpoints; the triples of every INSERT DATA query are merged into one ordered
+set, so nodes shared across the batch (places, dates, roles...) are only sent
+once, and written back in INSERT DATA chunks of at most BULK_CHUNK_BYTES.
+"""
+
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.services.invalidation import invalidate_write
+from app.services.sparql_client import SparqlClient
+
+# Builder: entity -> (INSERT DATA query, entity URI)
+Builder = Callable[[Any], Tuple[str, str]]
+
+
+def insert_data_triples(query: str) -> List[str]:
+    """
+    Triples of an INSERT DATA query produced by an `add_*` builder.
+
+    Builders write one triple per line inside `GRAPH <...> { ... }` (literals
+    have their newlines escaped), so each statement ends a line with ".".
+    """
+    body = query[query.index("{", query.index("GRAPH")) + 1:query.rindex("}")]
+    body = body[:body.rindex("}")]
+    triples, current = [], ""
+    for line in body.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        current = f"{current} {line}" if current else line
+        if current.endswith("."):
+            triples.append(current)
+            current = ""
+    return triples
+
+
+def chunk_triples(triples: Sequence[str], max_bytes: int) -> List[List[int]]:
+    """Positions of `triples` grouped in chunks whose text stays under `max_bytes`."""
+    chunks: List[List[int]] = []
+    current: List[int] = []
+    size = 0
+    for position, triple in enumerate(triples):
+        length = len(triple.encode("utf-8")) + 3
+        if current and size + length > max_bytes:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(position)
+        size += length
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def insert_data(triples: Sequence[str]) -> str:
+    query = f"INSERT DATA\n{{\n\tGRAPH <{settings.DEFAULT_GRAPH_URL}> {{\n"
+    for triple in triples:
+        query += f"\t\t{triple}\n"
+    query += "\t}\n}"
+    return query
+
+
+async def bulk_create(
+    client: SparqlClient,
+    items: Sequence[Any],
+    builder: Builder,
+    label: Callable[[Any], Optional[str]],
+    max_bytes: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Create `items` with `builder` in as few updates as possible.
+
+    Returns per-item results ({index, uri, label, status, error}) in input
+    order and the throughput of the whole batch. An item is "created" when
+    every chunk holding one of its triples was written; items repeated in the
+    batch (same URI) are reported as "duplicate".
+    """
+    max_bytes = settings.BULK_CHUNK_BYTES if max_bytes is None else max_bytes
+    started = time.perf_counter()
+
+    results: List[Dict[str, Any]] = []
+    triple_position: Dict[str, int] = {}
+    item_triples: Dict[int, List[int]] = {}
+    seen_uris: Dict[str, int] = {}
+    for index, item in enumerate(items):
+        result = {"index": index, "uri": None, "label": label(item), "status": "created", "error": None}
+        results.append(result)
+        try:
+            query, uri = builder(item)
+            triples = insert_data_triples(query)
+        except Exception as e:
+            result.update(status="error", error=f"Could not build triples: {e}")
+            continue
+        result["uri"] = uri
+        if uri in seen_uris:
+            result.update(status="duplicate", error=f"Same entity as item {seen_uris[uri]}")
+        seen_uris.setdefault(uri, index)
+        item_triples[index] = [triple_position.setdefault(triple, len(triple_position)) for triple in triples]
+
+    triples = list(triple_position)
+    chunks = chunk_triples(triples, max_bytes)
+    chunk_of = {position: number for number, chunk in enumerate(chunks) for position in chunk}
+
+    failed_chunks: Dict[int, str] = {}
+    written: List[str] = []
+    for number, chunk in enumerate(chunks):
+        update = insert_data([triples[position] for position in chunk])
+        try:
+            await client.update(update)
+            written.append(update)
+        except Exception as e:
+            failed_chunks[number] = str(e)
+    # Created entities and the existing ones their triples link to
+    invalidate_write(written)
+
+    for index, positions in item_triples.items():
+        errors = {failed_chunks[chunk_of[p]] for p in positions if chunk_of[p] in failed_chunks}
+        if errors:
+            results[index].update(status="error", error="; ".join(sorted(errors)))
+
+    elapsed = time.perf_counter() - started
+    created = sum(1 for result in results if result["status"] == "created")
+    return {
+        "data": results,
+        "created": created,
+        "failed": sum(1 for result in results if result["status"] == "error"),
+        "triples": len(triples),
+        "chunks": len(chunks),
+        "failed_chunks": len(failed_chunks),
+        "ms": round(elapsed * 1000, 1),
+        "items_per_second": round(len(items) / elapsed, 1) if elapsed > 0 else None,
+        "triples_per_second": round(len(triples) / elapsed, 1) if elapsed > 0 else None,
+    }
@@ -0,0 +1,138 @@
+"""
+Co-participation network of actors (persons, institutions...) in exhibitions.
+
+Role triples are loaded once into a sparse actor x exhibition incidence matrix
+B (CSR: the exhibitions of actor `a` are `exhibitions[indptr[a]:indptr[a + 1]]`).
+The weighted co-participation matrix C = B @ B.T, where C[a, b] is the number
+of exhibitions `a` and `b` took part in together, is derived from it and kept
+in CSR form too, each row sorted by decreasing weight, so the top
+collaborators of an actor are the head of its row.
+
+Computing C joins every pair of roles of each exhibition, which is far too slow
+as a live SPARQL query; it is rebuilt as a batch after data loads.
+"""
+
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.services.entity_batch import entity_type_of
+from app.services.graph_index import GraphIndex, fetch_pages
+from app.services.queries.graph import GraphQueries
+from app.services.sparql_client import SparqlClient
+
+
+def csr(rows: np.ndarray, cols: np.ndarray, n_rows: int):
+    """(indptr, order) of the CSR layout of (rows, cols) entries: row r is order[indptr[r]:indptr[r + 1]]."""
+    order = np.lexsort((cols, rows))
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return indptr, order
+
+
+class CoParticipation:
+    """Incidence and co-participation matrices over (actor, exhibition) pairs."""
+
+    def __init__(self, pairs: Iterable[tuple]):
+        actor_of: Dict[str, int] = {}
+        exhibition_of: Dict[str, int] = {}
+        entries = {
+            (actor_of.setdefault(actor, len(actor_of)), exhibition_of.setdefault(exhibition, len(exhibition_of)))
+            for actor, exhibition in pairs
+        }
+        self.actor_of = actor_of
+        self.actors = list(actor_of)
+        self.exhibitions = list(exhibition_of)
+
+        incidence = np.array(sorted(entries), dtype=np.int64).reshape(-1, 2)
+        actors, exhibitions = incidence[:, 0], incidence[:, 1]
+
+        # B, actor-major: exhibitions of each actor
+        self.indptr, order = csr(actors, exhibitions, len(self.actors))
+        self.exhibition_indices = exhibitions[order]
+        self.participations = np.diff(self.indptr)
+
+        # B.T, exhibition-major: actors of each exhibition
+        by_exhibition_ptr, order = csr(exhibitions, actors, len(self.exhibitions))
+        members = actors[order]
+        sizes = np.diff(by_exhibition_ptr)
+
+        # C = B @ B.T: every ordered pair of distinct actors of each exhibition, counted
+        repeats = sizes[exhibitions[order]]
+        left = np.repeat(members, repeats)
+        entry_start = np.repeat(by_exhibition_ptr[exhibitions[order]], repeats)
+        position = np.arange(len(left)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        right = members[entry_start + position]
+        distinct = left != right
+        pair_keys = left[distinct] * len(self.actors) + right[distinct]
+        keys, weights = np.unique(pair_keys, return_counts=True)
+        rows, cols = keys // max(len(self.actors), 1), keys % max(len(self.actors), 1)
+
+        # Rows sorted by weight (desc), then by collaborator id for stable ties
+        order = np.lexsort((cols, -weights, rows))
+        self.co_indptr = np.zeros(len(self.actors) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(self.actors)), out=self.co_indptr[1:])
+        self.co_indices = cols[order]
+        self.co_weights = weights[order]
+        self.built_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.actors)
+
+    def exhibition_count(self, uri: str) -> int:
+        actor = self.actor_of.get(uri)
+        return 0 if actor is None else int(self.participations[actor])
+
+    @property
+    def pair_count(self) -> int:
+        return len(self.co_indices) // 2
+
+    def top_collaborators(self, uri: str, limit: int, types: Optional[List[str]] = None) -> Optional[List[dict]]:
+        """
+        Actors sharing the most exhibitions with `uri`, best first.
+
+        `types` restricts collaborators by entity type (e.g. "human_actant",
+        "institution"). Each entry carries the shared exhibition count
+        ('weight') and its Jaccard index over both actors' exhibitions.
+        Returns None if `uri` has no recorded participation.
+        """
+        actor = self.actor_of.get(uri)
+        if actor is None:
+            return None
+        lo, hi = self.co_indptr[actor], self.co_indptr[actor + 1]
+        own = int(self.participations[actor])
+
+        result = []
+        for other, weight in zip(self.co_indices[lo:hi].tolist(), self.co_weights[lo:hi].tolist()):
+            other_uri = self.actors[other]
+            entity_type = entity_type_of(other_uri)
+            if types and entity_type not in types:
+                continue
+            theirs = int(self.participations[other])
+            result.append({
+                "uri": other_uri,
+                "type": entity_type,
+                "weight": weight,
+                "exhibitions": theirs,
+                "jaccard": round(weight / (own + theirs - weight), 4),
+            })
+            if len(result) >= limit:
+                break
+        return result
+
+
+class CoParticipationIndex(GraphIndex[CoParticipation]):
+    """
+    CoParticipation rebuilt after writes (in the background, once per
+    INDEX_REFRESH_DELAY_SECONDS), on TTL expiry and on data reloads.
+
+    Rebuilding it is a batch job over all role triples.
+    """
+
+    async def build(self, client: SparqlClient) -> CoParticipation:
+        rows = await fetch_pages(client, GraphQueries.participations)
+        return CoParticipation((row["actor"], row["exhibition"]) for row in rows if row.get("actor") and row.get("exhibition"))
+
+
+co_participation_index = CoParticipationIndex()
@@ -0,0 +1,127 @@
+"""
+Cache of aggregated entity detail documents (/entity/{type}/{id}/full).
+
+Each document is cached as a unit under (type, id): in memory (LRU with
+ENTITY_DETAIL_CACHE_TTL) and, when a DocumentStore is attached, persisted in
+it. Documents are dropped from both when the entity is written or the graph is
+reloaded; listeners registered with `on_invalidate()` are told which documents
+were dropped so they can be rebuilt. `stored_section()` serves the
+single-section endpoints (/get_person...) from the same documents, except
+while a document is being built (`building_documents()`), when the sections
+must query the graph.
+"""
+
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.document_store import DocumentStore, document_store
+
+DocumentKey = Tuple[str, str]
+
+# True while the sections of a document run: they must not read the stored copy
+_building: ContextVar[bool] = ContextVar("building_document", default=False)
+
+
+def entity_id(uri: str) -> str:
+    """Local id of an entity URI (https://w3id.org/OntoExhibit#person/<id> -> <id>)."""
+    return uri.rstrip("/").rsplit("/", 1)[-1].rsplit("#", 1)[-1]
+
+
+class DetailCache:
+    """Bounded LRU of detail documents with a TTL, backed by an optional DocumentStore."""
+
+    def __init__(
+        self,
+        ttl: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        store: Optional[DocumentStore] = None,
+    ):
+        self.ttl = settings.ENTITY_DETAIL_CACHE_TTL if ttl is None else ttl
+        self.max_entries = settings.ENTITY_DETAIL_CACHE_SIZE if max_entries is None else max_entries
+        self.store = store
+        self._entries: "OrderedDict[DocumentKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._listeners: List[Callable[[List[DocumentKey]], None]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def on_invalidate(self, listener: Callable[[List[DocumentKey]], None]) -> None:
+        """Call `listener(keys)` with the (type, id) of the documents dropped by `invalidate()`."""
+        self._listeners.append(listener)
+
+    def get(self, entity_type: str, id: str) -> Optional[Dict[str, Any]]:
+        key = (entity_type, id)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, document = entry
+            if time.monotonic() <= expires:
+                self._entries.move_to_end(key)
+                return document
+            del self._entries[key]
+
+        document = self.store.get(entity_type, id) if self.store is not None else None
+        if document is not None:
+            self._remember(key, document)
+        return document
+
+    def set(self, entity_type: str, id: str, document: Dict[str, Any]) -> None:
+        self._remember((entity_type, id), document)
+        if self.store is not None:
+            self.store.put(entity_type, id, document)
+
+    def _remember(self, key: DocumentKey, document: Dict[str, Any]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, document)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, uri: str) -> int:
+        """Drop every cached document of the entity `uri`; returns how many were dropped."""
+        id = entity_id(uri)
+        keys = {key for key in self._entries if key[1] == id}
+        for key in keys:
+            del self._entries[key]
+        if self.store is not None:
+            keys.update(self.store.delete_id(id))
+
+        if keys:
+            for listener in self._listeners:
+                listener(sorted(keys))
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        if self.store is not None:
+            self.store.clear()
+
+
+detail_cache = DetailCache(store=document_store)
+
+
+def stored_section(entity_type: str, id: str, section: str) -> Optional[Any]:
+    """
+    Data of one section of the stored detail document of (type, id), so the
+    single-section endpoints can skip SPARQL; None if there is no document or
+    the section did not complete.
+    """
+    if _building.get():
+        return None
+    document = detail_cache.get(entity_type, id)
+    outcome = document["sections"].get(section) if document is not None else None
+    if not outcome or outcome.get("status") != "ok":
+        return None
+    return outcome.get("data")
+
+
+@contextmanager
+def building_documents() -> Iterator[None]:
+    """Within this block (and tasks started in it), `stored_section()` returns None."""
+    token = _building.set(True)
+    try:
+        yield
+    finally:
+        _building.reset(token)
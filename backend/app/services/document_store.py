@@ -0,0 +1,80 @@
+"""
+Local store of denormalized entity documents.
+
+One JSON document per entity (the output of /entity/{type}/{id}/full) is kept
+in an embedded SQLite file, so detail pages are a primary-key lookup instead
+of several multi-UNION SPARQL queries. Documents are materialized after data
+loads and rebuilt one by one when the entity is written.
+"""
+
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+from app.core.config import settings
+
+
+class DocumentStore:
+    """SQLite table of (type, id) -> JSON document."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = settings.DOCUMENT_STORE_PATH if path is None else path
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Only used from the event loop thread; statements are short PK operations
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    type TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    built_at REAL NOT NULL,
+                    PRIMARY KEY (type, id)
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS documents_id ON documents (id)")
+        return self._conn
+
+    def get(self, entity_type: str, id: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT body FROM documents WHERE type = ? AND id = ?", (entity_type, id)
+        ).fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    def put(self, entity_type: str, id: str, document: Dict[str, Any]) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO documents (type, id, body, built_at) VALUES (?, ?, ?, ?)",
+            (entity_type, id, orjson.dumps(document), time.time()),
+        )
+
+    def delete_id(self, id: str) -> List[Tuple[str, str]]:
+        """Delete the documents of every type with this id; returns the deleted keys."""
+        keys = self.conn.execute("SELECT type, id FROM documents WHERE id = ?", (id,)).fetchall()
+        self.conn.execute("DELETE FROM documents WHERE id = ?", (id,))
+        return [tuple(key) for key in keys]
+
+    def clear(self) -> None:
+        self.conn.execute("DELETE FROM documents")
+
+    def count(self) -> Dict[str, int]:
+        return dict(self.conn.execute("SELECT type, COUNT(*) FROM documents GROUP BY type").fetchall())
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+document_store = DocumentStore()
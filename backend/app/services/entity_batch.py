@@ -0,0 +1,153 @@
+"""
+Batch resolution of entity URIs (labels and basic properties).
+
+Many URIs are resolved with a few chunked `VALUES` queries instead of one
+GET_OBJECT_ANY_TYPE query each. Results, including "not found", are cached per
+URI for the current graph version.
+"""
+
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.queries.misc import MiscQueries
+from app.services.sparql_client import SparqlClient
+from app.utils.parsers import parse_sparql_response
+
+RDFS_LABEL = "http://www.w3.org/2000/01/rdf-schema#label"
+ONTOLOGY_PREFIX = "https://w3id.org/OntoExhibit#"
+
+# Absolute IRI without characters that could break out of <...> in a query
+_IRI = re.compile(r'^[A-Za-z][A-Za-z0-9+.\-]*:[^\s<>"{}|\\^`]+$')
+
+
+def is_valid_uri(uri: str) -> bool:
+    return bool(_IRI.match(uri))
+
+
+def entity_type_of(uri: str) -> str:
+    """Type segment of an entity URI (OntoExhibit#exhibition/<id> -> "exhibition")."""
+    if uri.startswith(ONTOLOGY_PREFIX):
+        local = uri[len(ONTOLOGY_PREFIX):]
+        if "/" in local:
+            return local.split("/", 1)[0]
+    return "other"
+
+
+def ranked_labels(rows: Iterable[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Label of each URI from {"uri", "label", "rank"} rows: the lowest rank wins
+    (title, then person name, then rdfs:label; see MiscQueries.ALL_LABELS),
+    ties go to the smallest label so every path picks the same one.
+    """
+    best: Dict[str, Tuple[int, str]] = {}
+    for row in rows:
+        uri, label = row.get("uri"), row.get("label")
+        if not uri or not label:
+            continue
+        candidate = (int(row.get("rank") or 9), label)
+        if uri not in best or candidate < best[uri]:
+            best[uri] = candidate
+    return {uri: label for uri, (_, label) in best.items()}
+
+
+async def object_properties(client: SparqlClient, object_type: str, id: str) -> Dict[str, Any]:
+    """Properties of one entity as {predicate: value} (GET_OBJECT_ANY_TYPE, last value kept)."""
+    query = MiscQueries.GET_OBJECT_ANY_TYPE % (object_type, id, object_type, id, object_type, id)
+    properties: Dict[str, Any] = {}
+    for row in parse_sparql_response(await client.query(query)):
+        p, o = row.get("p"), row.get("o")
+        if p and o:
+            properties[p] = o
+    return properties
+
+
+class EntityBatchResolver:
+    """Resolves URIs in chunks, with a per-URI LRU cache tied to the graph version."""
+
+    def __init__(
+        self,
+        chunk_size: Optional[int] = None,
+        ttl: Optional[int] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self.chunk_size = settings.ENTITY_BATCH_CHUNK_SIZE if chunk_size is None else chunk_size
+        self.ttl = settings.ENTITY_BATCH_CACHE_TTL if ttl is None else ttl
+        self.max_entries = settings.ENTITY_BATCH_CACHE_SIZE if max_entries is None else max_entries
+        # uri -> (expires, graph version, object or None if not found)
+        self._cache: "OrderedDict[str, Tuple[float, Any, Optional[Dict[str, Any]]]]" = OrderedDict()
+
+    def _cached(self, uri: str, version: Any) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        entry = self._cache.get(uri)
+        if entry is None:
+            return False, None
+        expires, cached_version, value = entry
+        if cached_version != version or time.monotonic() > expires:
+            del self._cache[uri]
+            return False, None
+        self._cache.move_to_end(uri)
+        return True, value
+
+    def _remember(self, uri: str, version: Any, value: Optional[Dict[str, Any]]) -> None:
+        self._cache[uri] = (time.monotonic() + self.ttl, version, value)
+        self._cache.move_to_end(uri)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def _fetch(self, client: SparqlClient, uris: List[str]) -> Dict[str, Dict[str, Any]]:
+        chunks = [uris[i:i + self.chunk_size] for i in range(0, len(uris), self.chunk_size)]
+        responses = await asyncio.gather(*(client.query(MiscQueries.get_objects(chunk)) for chunk in chunks))
+
+        properties: Dict[str, Dict[str, Any]] = {}
+        label_rows = []
+        for response in responses:
+            for row in parse_sparql_response(response):
+                uri, p, o = row.get("uri"), row.get("p"), row.get("o")
+                if uri and p and o:
+                    properties.setdefault(uri, {}).setdefault(p, o)
+                    if p == RDFS_LABEL:
+                        label_rows.append({"uri": uri, "label": o, "rank": row.get("rank")})
+        # Same label as the shared dictionary, whatever order the rows came in
+        for uri, label in ranked_labels(label_rows).items():
+            properties[uri][RDFS_LABEL] = label
+
+        return {
+            uri: {
+                "uri": uri,
+                "type": entity_type_of(uri),
+                "label": props.get(RDFS_LABEL),
+                "properties": props,
+            }
+            for uri, props in properties.items()
+        }
+
+    async def resolve(self, client: SparqlClient, uris: Iterable[str]) -> Tuple[Dict[str, Optional[Dict[str, Any]]], int]:
+        """
+        Resolve `uris` (deduplicated, order kept).
+
+        Returns ({uri: object or None if not found}, number of cache hits).
+        """
+        version = client.version
+        resolved: Dict[str, Optional[Dict[str, Any]]] = {}
+        to_fetch = []
+        for uri in dict.fromkeys(uris):
+            hit, value = self._cached(uri, version)
+            if hit:
+                resolved[uri] = value
+            else:
+                resolved[uri] = None
+                to_fetch.append(uri)
+
+        if to_fetch:
+            fetched = await self._fetch(client, to_fetch)
+            for uri in to_fetch:
+                resolved[uri] = fetched.get(uri)
+                self._remember(uri, version, resolved[uri])
+
+        return resolved, len(resolved) - len(to_fetch)
+
+
+entity_batch = EntityBatchResolver()
@@ -0,0 +1,163 @@
+"""
+"Similar exhibitions" neighbour table.
+
+Each exhibition is a binary sparse vector over its features: participants
+(actors holding a role in it), displayed artworks, themes, venue and place.
+Similarity is the Jaccard index of two exhibitions' feature sets,
+|A & B| / (|A| + |B| - |A & B|).
+
+Intersections are a sparse product X @ X.T computed block by block: for the
+exhibitions of a block, each feature's posting list yields the candidate
+exhibitions sharing it, and the candidates are counted with NumPy. Only pairs
+sharing at least one feature are ever generated, and each block is bounded to
+SIMILAR_BLOCK_PAIRS candidates. Features shared by a large share of all
+exhibitions (e.g. a main venue) are left out like stop words: they make almost
+everything similar and dominate the cost. The top SIMILAR_TOP_K neighbours of
+every exhibition are kept in a dense table.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.graph_index import GraphIndex, fetch_pages
+from app.services.queries.graph import GraphQueries
+from app.services.sparql_client import SparqlClient
+
+# Features are never dropped as too common below this number of exhibitions
+MIN_FEATURE_CAP = 100
+
+
+def group_ranks(sorted_groups: np.ndarray) -> np.ndarray:
+    """Position of each element within its run of equal values in `sorted_groups`."""
+    if not len(sorted_groups):
+        return np.zeros(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    lengths = np.diff(np.r_[starts, len(sorted_groups)])
+    return np.arange(len(sorted_groups)) - np.repeat(starts, lengths)
+
+
+class ExhibitionSimilarity:
+    """Top-k Jaccard neighbours of every exhibition."""
+
+    def __init__(
+        self,
+        rows: Iterable[tuple],
+        top_k: Optional[int] = None,
+        max_feature_share: Optional[float] = None,
+        block_pairs: Optional[int] = None,
+        min_feature_cap: int = MIN_FEATURE_CAP,
+    ):
+        self.top_k = settings.SIMILAR_TOP_K if top_k is None else top_k
+        max_feature_share = settings.SIMILAR_MAX_FEATURE_SHARE if max_feature_share is None else max_feature_share
+        block_pairs = settings.SIMILAR_BLOCK_PAIRS if block_pairs is None else block_pairs
+
+        exhibition_of: Dict[str, int] = {}
+        feature_of: Dict[str, int] = {}
+        entries = {
+            (exhibition_of.setdefault(exhibition, len(exhibition_of)), feature_of.setdefault(feature, len(feature_of)))
+            for exhibition, feature in rows
+        }
+        self.exhibition_of = exhibition_of
+        self.exhibitions = list(exhibition_of)
+        n = len(self.exhibitions)
+
+        entries = np.array(sorted(entries), dtype=np.int64).reshape(-1, 2)
+        df = np.bincount(entries[:, 1], minlength=len(feature_of))
+        cap = max(int(max_feature_share * n), min_feature_cap)
+        entries = entries[df[entries[:, 1]] <= cap]
+        self.dropped_features = int((df > cap).sum())
+        exhibitions, features = entries[:, 0], entries[:, 1]
+
+        # Exhibition-major rows (entries are sorted) and feature posting lists
+        row_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(exhibitions, minlength=n), out=row_ptr[1:])
+        self.sizes = np.diff(row_ptr)
+        order = np.lexsort((exhibitions, features))
+        postings = exhibitions[order]
+        posting_ptr = np.zeros(len(feature_of) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(features, minlength=len(feature_of)), out=posting_ptr[1:])
+        df = np.diff(posting_ptr)
+
+        self.neighbours = np.full((n, self.top_k), -1, dtype=np.int32)
+        self.scores = np.zeros((n, self.top_k), dtype=np.float32)
+        self.shared = np.zeros((n, self.top_k), dtype=np.int32)
+
+        # Candidate pairs generated by each exhibition, to cut blocks of bounded size
+        work = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(exhibitions, weights=df[features], minlength=n).astype(np.int64), out=work[1:])
+        start = 0
+        while start < n:
+            end = max(int(np.searchsorted(work, work[start] + block_pairs, side="right")) - 1, start + 1)
+            self._score_block(start, min(end, n), row_ptr, features, postings, posting_ptr, df)
+            start = end
+
+    def _score_block(self, start, end, row_ptr, features, postings, posting_ptr, df) -> None:
+        n = len(self.exhibitions)
+        lo, hi = row_ptr[start], row_ptr[end]
+        block_features = features[lo:hi]
+        block_rows = np.repeat(np.arange(start, end), np.diff(row_ptr[start:end + 1]))
+
+        repeats = df[block_features]
+        left = np.repeat(block_rows, repeats)
+        first = np.repeat(posting_ptr[block_features], repeats)
+        within = np.arange(len(left)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        right = postings[first + within]
+        distinct = left != right
+
+        keys, shared = np.unique(left[distinct] * n + right[distinct], return_counts=True)
+        rows, cols = keys // max(n, 1), keys % max(n, 1)
+        jaccard = shared / (self.sizes[rows] + self.sizes[cols] - shared)
+
+        order = np.lexsort((cols, -jaccard, rows))
+        rows, cols, jaccard, shared = rows[order], cols[order], jaccard[order], shared[order]
+        ranks = group_ranks(rows)
+        top = ranks < self.top_k
+        self.neighbours[rows[top], ranks[top]] = cols[top]
+        self.scores[rows[top], ranks[top]] = jaccard[top]
+        self.shared[rows[top], ranks[top]] = shared[top]
+
+    def __len__(self) -> int:
+        return len(self.exhibitions)
+
+    def similar(self, uri: str, limit: int) -> List[dict]:
+        """Most similar exhibitions to `uri`, best first (empty if it has no features)."""
+        exhibition = self.exhibition_of.get(uri)
+        if exhibition is None:
+            return []
+        result = []
+        for other, score, shared in zip(
+            self.neighbours[exhibition, :limit].tolist(),
+            self.scores[exhibition, :limit].tolist(),
+            self.shared[exhibition, :limit].tolist(),
+        ):
+            if other < 0:
+                break
+            result.append({"uri": self.exhibitions[other], "score": round(score, 4), "shared": shared})
+        return result
+
+
+class ExhibitionSimilarityIndex(GraphIndex[ExhibitionSimilarity]):
+    """
+    ExhibitionSimilarity rebuilt after writes (in the background, once per
+    INDEX_REFRESH_DELAY_SECONDS), on TTL expiry and on data reloads.
+
+    Rebuilding it is a batch job over the features of every exhibition.
+    """
+
+    async def build(self, client: SparqlClient) -> ExhibitionSimilarity:
+        participations = await fetch_pages(client, GraphQueries.participations)
+        features = await fetch_pages(client, GraphQueries.exhibition_features)
+        rows = [
+            (row["exhibition"], f"actor:{row['actor']}")
+            for row in participations if row.get("exhibition") and row.get("actor")
+        ]
+        rows.extend(
+            (row["exhibition"], f"{row.get('kind')}:{row['feature']}")
+            for row in features if row.get("exhibition") and row.get("feature")
+        )
+        return ExhibitionSimilarity(rows)
+
+
+exhibition_similarity_index = ExhibitionSimilarityIndex()
@@ -0,0 +1,98 @@
+"""
+Faceted search support.
+
+Keeps one in-memory table per entity type where each facet value (exhibition
+type, theme, gender...) is stored as a bitmap over the table rows. Once a filter
+set has been evaluated into a bitmap, every facet count is a single AND +
+popcount instead of one SPARQL query per facet.
+"""
+
+from typing import Any, Dict, Iterable, List
+
+from app.services.graph_index import GraphIndex
+from app.services.queries.artworks import ArtworkQueries
+from app.services.queries.exhibitions import ExhibitionQueries
+from app.services.queries.institutions import InstitutionQueries
+from app.services.queries.persons import PersonQueries
+from app.services.sparql_client import SparqlClient
+from app.utils.parsers import parse_sparql_response
+
+
+def _bitmap(rows: Iterable[int], size: int) -> int:
+    """Pack row numbers into an int bitmap (bit `r` set for each row `r`)."""
+    buffer = bytearray((size + 7) // 8)
+    for row in rows:
+        buffer[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(buffer, "little")
+
+
+class FacetTable:
+    """
+    Entity table with one bitmap per (facet, value).
+
+    Built from rows with `uri`, `facet` and `value` keys; rows without a facet
+    only register the entity.
+    """
+
+    def __init__(self, data: List[Dict[str, Any]]):
+        self.row_of: Dict[str, int] = {}
+        rows_by_value: Dict[str, Dict[str, List[int]]] = {}
+
+        for item in data:
+            uri = item.get("uri")
+            if not uri:
+                continue
+            row = self.row_of.setdefault(uri, len(self.row_of))
+            facet, value = item.get("facet"), item.get("value")
+            if facet and value:
+                rows_by_value.setdefault(facet, {}).setdefault(value, []).append(row)
+
+        size = len(self.row_of)
+        self.bitmaps: Dict[str, Dict[str, int]] = {
+            facet: {value: _bitmap(rows, size) for value, rows in values.items()}
+            for facet, values in rows_by_value.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.row_of)
+
+    def mask(self, uris: Iterable[str]) -> int:
+        """Bitmap of the table rows matching `uris` (unknown URIs are ignored)."""
+        rows = (self.row_of[uri] for uri in uris if uri in self.row_of)
+        return _bitmap(rows, len(self.row_of))
+
+    def counts(self, mask: int) -> Dict[str, Dict[str, int]]:
+        """
+        Count matching rows per facet value.
+
+        Values are ordered by descending count; values with no matches are omitted.
+        """
+        result = {}
+        for facet, values in self.bitmaps.items():
+            counts = {}
+            for value, bitmap in values.items():
+                count = bin(bitmap & mask).count("1")
+                if count:
+                    counts[value] = count
+            result[facet] = dict(sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])))
+        return result
+
+
+class FacetIndex(GraphIndex[FacetTable]):
+    """FacetTable for one entity type, loaded from a `FACET_TABLE` query."""
+
+    def __init__(self, query: str):
+        super().__init__()
+        self.query = query
+
+    async def build(self, client: SparqlClient) -> FacetTable:
+        response = await client.query(self.query)
+        return FacetTable(parse_sparql_response(response))
+
+
+facet_indexes: Dict[str, FacetIndex] = {
+    "exhibition": FacetIndex(ExhibitionQueries.FACET_TABLE),
+    "person": FacetIndex(PersonQueries.FACET_TABLE),
+    "institution": FacetIndex(InstitutionQueries.FACET_TABLE),
+    "artwork": FacetIndex(ArtworkQueries.FACET_TABLE),
+}
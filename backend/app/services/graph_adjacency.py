@@ -0,0 +1,152 @@
+"""
+In-memory adjacency of the knowledge graph for exploration views.
+
+Entity-to-entity triples are loaded once and stored in CSR form: node URIs
+are mapped to integer ids, and the neighbours of node `n` are
+`indices[indptr[n]:indptr[n + 1]]`, with the predicate code and direction of
+each edge in parallel arrays. Every triple is stored in both directions, so a
+k-hop neighbourhood is a breadth-first walk over array slices.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from app.services.graph_index import GraphIndex, fetch_pages
+from app.services.queries.graph import GraphQueries
+from app.services.sparql_client import SparqlClient
+
+ONTOLOGY_PREFIX = "https://w3id.org/OntoExhibit#"
+
+
+def predicate_name(predicate: str) -> str:
+    """Short name of a predicate (OntoExhibit#isRoleOf -> "isRoleOf")."""
+    return predicate[len(ONTOLOGY_PREFIX):] if predicate.startswith(ONTOLOGY_PREFIX) else predicate
+
+
+class AdjacencyGraph:
+    """CSR adjacency over (subject, predicate, object) triples."""
+
+    def __init__(self, triples: Iterable[tuple]):
+        node_of: Dict[str, int] = {}
+        predicate_of: Dict[str, int] = {}
+        sources, targets, predicates = [], [], []
+        for s, p, o in triples:
+            sources.append(node_of.setdefault(s, len(node_of)))
+            targets.append(node_of.setdefault(o, len(node_of)))
+            predicates.append(predicate_of.setdefault(predicate_name(p), len(predicate_of)))
+
+        self.node_of = node_of
+        self.nodes = list(node_of)
+        self.predicates = list(predicate_of)
+        self.predicate_of = predicate_of
+
+        sources = np.array(sources, dtype=np.int64)
+        targets = np.array(targets, dtype=np.int64)
+        predicates = np.array(predicates, dtype=np.int32)
+        # Both directions: outgoing edges (s -> o) and incoming ones (o <- s)
+        origin = np.concatenate([sources, targets])
+        neighbour = np.concatenate([targets, sources])
+        order = np.argsort(origin, kind="stable")
+
+        self.indices = neighbour[order]
+        self.edge_predicate = np.concatenate([predicates, predicates])[order]
+        self.edge_outgoing = np.concatenate([np.ones(len(sources), bool), np.zeros(len(sources), bool)])[order]
+        self.indptr = np.zeros(len(self.nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origin, minlength=len(self.nodes)), out=self.indptr[1:])
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices) // 2
+
+    def degree(self, node: int) -> int:
+        return int(self.indptr[node + 1] - self.indptr[node])
+
+    def neighbours(self, uri: str) -> List[str]:
+        """URIs one edge away from `uri` (in either direction)."""
+        node = self.node_of.get(uri)
+        if node is None:
+            return []
+        return [self.nodes[n] for n in np.unique(self.indices[self.indptr[node]:self.indptr[node + 1]]).tolist()]
+
+    def neighbourhood(
+        self,
+        uri: str,
+        depth: int,
+        limit: int,
+        fanout: int,
+        predicates: Optional[List[str]] = None,
+    ) -> Optional[dict]:
+        """
+        Breadth-first neighbourhood of `uri` up to `depth` hops.
+
+        At most `fanout` neighbours are expanded per node (highest degree
+        first) and at most `limit` nodes are returned. `predicates` restricts
+        the edge types followed. Returns None if `uri` is not in the graph.
+        """
+        start = self.node_of.get(uri)
+        if start is None:
+            return None
+
+        allowed = None
+        if predicates:
+            allowed = np.array([self.predicate_of[p] for p in predicates if p in self.predicate_of], dtype=np.int32)
+
+        depth_of: Dict[int, int] = {start: 0}
+        edges: Set[tuple] = set()
+        frontier = [start]
+        truncated = False
+
+        for level in range(1, depth + 1):
+            next_frontier = []
+            for node in frontier:
+                lo, hi = self.indptr[node], self.indptr[node + 1]
+                neighbours = self.indices[lo:hi]
+                edge_predicates = self.edge_predicate[lo:hi]
+                outgoing = self.edge_outgoing[lo:hi]
+                if allowed is not None:
+                    keep = np.isin(edge_predicates, allowed)
+                    neighbours, edge_predicates, outgoing = neighbours[keep], edge_predicates[keep], outgoing[keep]
+                if len(neighbours) > fanout:
+                    # Prefer well-connected neighbours: they lead to the rest of the graph
+                    degrees = self.indptr[neighbours + 1] - self.indptr[neighbours]
+                    top = np.argsort(-degrees, kind="stable")[:fanout]
+                    neighbours, edge_predicates, outgoing = neighbours[top], edge_predicates[top], outgoing[top]
+                    truncated = True
+
+                for other, predicate, out in zip(neighbours.tolist(), edge_predicates.tolist(), outgoing.tolist()):
+                    if other not in depth_of:
+                        if len(depth_of) >= limit:
+                            truncated = True
+                            continue
+                        depth_of[other] = level
+                        next_frontier.append(other)
+                    source, target = (node, other) if out else (other, node)
+                    edges.add((source, target, predicate))
+            frontier = next_frontier
+            if not frontier:
+                break
+
+        return {
+            "nodes": [
+                {"id": self.nodes[n], "depth": d, "degree": self.degree(n)}
+                for n, d in depth_of.items()
+            ],
+            "edges": [
+                {"source": self.nodes[s], "target": self.nodes[t], "type": self.predicates[p]}
+                for s, t, p in sorted(edges)
+            ],
+            "truncated": truncated,
+        }
+
+
+class AdjacencyIndex(GraphIndex[AdjacencyGraph]):
+    async def build(self, client: SparqlClient) -> AdjacencyGraph:
+        rows = await fetch_pages(client, GraphQueries.edges)
+        return AdjacencyGraph((row["s"], row["p"], row["o"]) for row in rows if row.get("s") and row.get("o"))
+
+
+adjacency_index = AdjacencyIndex()
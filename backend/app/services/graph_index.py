@@ -0,0 +1,150 @@
+"""
+In-memory indexes derived from the knowledge graph.
+
+Some views (facet counts, map layers, neighbourhoods...) need aggregates that are
+too expensive to recompute with SPARQL on every request. A GraphIndex materializes
+them once into plain Python/NumPy structures and serves them until they expire
+or are explicitly invalidated.
+"""
+
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Generic, List, Optional, Set, TypeVar
+
+from app.core.config import settings
+from app.services.sparql_client import SparqlClient
+from app.utils.parsers import parse_sparql_response
+
+T = TypeVar("T")
+
+# Strong references to the refresh tasks: the event loop only keeps weak ones
+_background_tasks: Set[asyncio.Task] = set()
+
+
+# Per-request marker set by track_stale_reads(): {"stale": True} once a stale index was served
+_stale_reads: ContextVar[Optional[Dict[str, bool]]] = ContextVar("stale_index_reads", default=None)
+
+
+def track_stale_reads() -> Dict[str, bool]:
+    """
+    Start recording, for the current request, whether any index answered with
+    a stale value. The returned marker is shared with the tasks the request
+    spawns, so it can be checked once the response is built.
+    """
+    marker = {"stale": False}
+    _stale_reads.set(marker)
+    return marker
+
+
+def run_in_background(coro) -> asyncio.Task:
+    """Start `coro` as a task that is kept alive until it finishes."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+class GraphIndex(Generic[T]):
+    """
+    Lazily built, periodically refreshed view over the graph.
+
+    Subclasses implement `build()`; callers use `get()`. The index is stale
+    when it is older than the TTL or built before the last change of the graph
+    (SparqlClient.version). A missing index is built while the caller waits; a
+    stale one keeps being served while it is rebuilt in the background, once
+    per INDEX_REFRESH_DELAY_SECONDS however many writes happen meanwhile;
+    such answers are flagged to track_stale_reads() so they are not cached.
+    """
+
+    def __init__(self, ttl: Optional[int] = None, refresh_delay: Optional[float] = None):
+        self.ttl = settings.INDEX_TTL_SECONDS if ttl is None else ttl
+        self.refresh_delay = settings.INDEX_REFRESH_DELAY_SECONDS if refresh_delay is None else refresh_delay
+        self._value: Optional[T] = None
+        self._built_at = 0.0
+        self._version: Optional[int] = None
+        self._lock = asyncio.Lock()
+        self._refresh: Optional[asyncio.Task] = None
+
+    def is_stale(self, version: Optional[int] = None) -> bool:
+        if self._value is None:
+            return True
+        if version is not None and version != self._version:
+            return True
+        return self.ttl > 0 and time.monotonic() - self._built_at > self.ttl
+
+    def invalidate(self) -> None:
+        """Drop the current value so the next `get()` rebuilds it."""
+        self._value = None
+
+    def peek(self) -> Optional[T]:
+        """The current value, possibly stale, without building it (None if not built)."""
+        return self._value
+
+    async def get(self, client: SparqlClient) -> T:
+        if not self.is_stale(client.version):
+            return self._value
+        if self._value is not None:
+            self._schedule_refresh(client)
+            marker = _stale_reads.get()
+            if marker is not None:
+                marker["stale"] = True
+            return self._value
+        return await self._rebuild(client)
+
+    async def _rebuild(self, client: SparqlClient) -> T:
+        async with self._lock:
+            # Another request may have rebuilt it while we were waiting
+            version = client.version
+            if self.is_stale(version):
+                self._value = await self.build(client)
+                self._built_at = time.monotonic()
+                self._version = version
+            return self._value
+
+    def _schedule_refresh(self, client: SparqlClient) -> None:
+        """Rebuild after `refresh_delay` in the background (one pending refresh at a time)."""
+        if self._refresh is not None and not self._refresh.done():
+            return
+
+        async def refresh():
+            await asyncio.sleep(self.refresh_delay)
+            try:
+                await self._rebuild(client)
+            except Exception as e:
+                print(f"Error refreshing {type(self).__name__}: {e}")
+
+        self._refresh = run_in_background(refresh())
+
+    def warm(self, client: SparqlClient) -> "asyncio.Task":
+        """Rebuild in the background if needed (after startup or a data load)."""
+        async def refresh():
+            try:
+                await self.get(client)
+            except Exception as e:
+                print(f"Error warming {type(self).__name__}: {e}")
+
+        return run_in_background(refresh())
+
+    async def build(self, client: SparqlClient) -> T:
+        raise NotImplementedError
+
+
+async def fetch_pages(
+    client: SparqlClient,
+    page_query: Callable[[int, int], str],
+    page_size: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    All rows of a LIMIT/OFFSET query, `page_query(limit, offset)`, fetched
+    page by page. The query must have an ORDER BY for the pages to be stable.
+    """
+    page_size = settings.GRAPH_EDGE_PAGE_SIZE if page_size is None else page_size
+    rows: List[Dict[str, Any]] = []
+    offset = 0
+    while True:
+        page = parse_sparql_response(await client.query(page_query(page_size, offset)))
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        offset += page_size
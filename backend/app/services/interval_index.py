@@ -0,0 +1,78 @@
+"""
+Interval index over year ranges.
+
+Dates in the graph are raw `rdfs:label` strings of time-span nodes ("1901",
+"1901-05-03", "1901/1902"...). They are normalized to integer years and kept
+as two sorted arrays (starts and ends), so "which entities are active between
+`from_year` and `to_year`" is two binary searches instead of a scan.
+"""
+
+import re
+from typing import Iterable, Optional
+
+import numpy as np
+
+# A bare year ("1901", "-50"), or an ISO date or date-time ("1901-05", "1901-05-03T10:00:00Z")
+_YEAR = re.compile(
+    r"^\s*(?:(?P<year>-?\d{1,4})"
+    r"|(?P<date_year>-?\d{4})-(?:0[1-9]|1[0-2])(?:-(?:0[1-9]|[12]\d|3[01])(?:T[\d:.]+(?:Z|[+-]\d{2}:?\d{2})?)?)?)\s*$"
+)
+
+
+def parse_year(value: Optional[str]) -> Optional[int]:
+    """
+    Year of a date label that is a year or an ISO date; None for anything
+    else ("19th century", "1901/1902", malformed dates...).
+    """
+    if not value:
+        return None
+    match = _YEAR.match(str(value))
+    if not match:
+        return None
+    return int(match.group("year") or match.group("date_year"))
+
+
+class IntervalIndex:
+    """
+    Sorted start/end arrays for a set of [start, end] year intervals.
+
+    A missing start or end falls back to the other one (a single year), and
+    entities without any year are undated: they are never filtered out, like
+    in the map's time slider.
+    """
+
+    def __init__(self, starts: Iterable[Optional[int]], ends: Iterable[Optional[int]]):
+        pairs = [(s if s is not None else e, e if e is not None else s) for s, e in zip(starts, ends)]
+
+        self.size = len(pairs)
+        has_year = np.array([s is not None for s, _ in pairs], dtype=bool)
+        self.undated = np.flatnonzero(~has_year)
+        dated = np.flatnonzero(has_year)
+        start = np.array([pairs[i][0] for i in dated], dtype=np.int64)
+        end = np.array([pairs[i][1] for i in dated], dtype=np.int64)
+        # Reversed intervals ("1950" - "1948") are treated as [1948, 1950]
+        start, end = np.minimum(start, end), np.maximum(start, end)
+
+        by_start = np.argsort(start, kind="stable")
+        by_end = np.argsort(end, kind="stable")
+        self.starts, self.start_ids = start[by_start], dated[by_start]
+        self.ends, self.end_ids = end[by_end], dated[by_end]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def mask(self, from_year: Optional[int] = None, to_year: Optional[int] = None) -> np.ndarray:
+        """
+        Boolean mask of the intervals overlapping [from_year, to_year].
+
+        Open bounds (None) are unbounded on that side.
+        """
+        active = np.zeros(self.size, dtype=bool)
+        # start <= to_year ...
+        upto = len(self.starts) if to_year is None else np.searchsorted(self.starts, to_year, side="right")
+        active[self.start_ids[:upto]] = True
+        # ... and not end < from_year
+        if from_year is not None:
+            active[self.end_ids[:np.searchsorted(self.ends, from_year, side="left")]] = False
+        active[self.undated] = True
+        return active
@@ -0,0 +1,86 @@
+"""
+Invalidation of cached graph reads after writes.
+
+A write touches the entities whose IRIs appear in its triples: the written
+entity and the existing ones it links to (curators, organizers, venues...).
+The responses and detail documents depending on those entities and on their
+direct neighbours in the graph are dropped, and everything else stays warm.
+"""
+
+import re
+from typing import Iterable, Sequence, Set
+
+from app.services.detail_cache import detail_cache
+from app.services.entity_batch import entity_type_of
+from app.services.graph_adjacency import adjacency_index
+from app.services.response_cache import collection_tag, entity_tags, response_cache
+
+_ONTOLOGY_IRI = re.compile(r"<(https://w3id\.org/OntoExhibit#[^>\s]+)>")
+_VARIABLE = re.compile(r"[?$][A-Za-z_]")
+
+
+def neighbours(uris: Iterable[str]) -> Set[str]:
+    """
+    Direct neighbours of `uris` in the in-memory adjacency graph (warmed at
+    startup and on reload). It reflects the graph before the write: links a
+    write adds are covered by the IRIs of its triples (`invalidate_write`).
+    """
+    graph = adjacency_index.peek()
+    if graph is None:
+        return set()
+    return {neighbour for uri in uris for neighbour in graph.neighbours(uri)}
+
+
+def query_entities(queries: Iterable[str]) -> Set[str]:
+    """Entity IRIs (OntoExhibit#<type>/<id>) mentioned in SPARQL `queries`."""
+    return {
+        uri
+        for query in queries
+        for uri in _ONTOLOGY_IRI.findall(query)
+        if entity_type_of(uri) != "other"
+    }
+
+
+def invalidate_entities(uris: Iterable[str]) -> int:
+    """
+    Invalidate what depends on the written entities `uris`.
+
+    Drops the cached responses and the detail documents of them and their
+    direct neighbours, and the list pages of their types. Returns the number
+    of responses dropped.
+    """
+    touched = {uri for uri in uris if uri}
+    affected = touched | neighbours(touched)
+    tags = {collection_tag("*")}
+    for uri in affected:
+        tags.update(entity_tags(uri))
+    tags.update(collection_tag(entity_type_of(uri)) for uri in touched)
+    # Stored documents have no TTL: related entities' documents are rebuilt too
+    for uri in sorted(affected):
+        detail_cache.invalidate(uri)
+    return response_cache.invalidate(tags)
+
+
+def invalidate_write(queries: Sequence[str], uris: Iterable[str] = ()) -> int:
+    """
+    Invalidate after executing the SPARQL updates `queries`: every entity they
+    mention (plus `uris`) counts as touched.
+    """
+    return invalidate_entities(query_entities(queries) | set(uris))
+
+
+def invalidate_for_update(query: str) -> int:
+    """
+    Invalidate after an arbitrary SPARQL update.
+
+    Scoped to the entity IRIs it mentions when it is a ground update (no
+    variables, no prefixed names); otherwise it may touch anything and every
+    cache is cleared.
+    """
+    uris = query_entities([query])
+    if uris and not _VARIABLE.search(query) and "PREFIX" not in query.upper():
+        return invalidate_entities(uris)
+    detail_cache.clear()
+    invalidated = len(response_cache)
+    response_cache.clear()
+    return invalidated
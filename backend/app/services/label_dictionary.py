@@ -0,0 +1,163 @@
+"""
+Shared URI -> label dictionary for the whole graph.
+
+Labels are computed once with the same precedence the detail queries use
+(title, then person name, then rdfs:label) and written to a single binary file
+that is memory-mapped, so every worker process shares the same pages:
+
+    magic (8 bytes) | n (uint64)
+    keys     n x uint64   sorted 64-bit hashes of the URIs
+    offsets  (n+1) x uint64 into the blob
+    blob     "uri\\0label" entries in key order (UTF-8)
+
+A lookup is a binary search over `keys` and a slice of the blob; the stored
+URI is compared to rule out hash collisions.
+"""
+
+import hashlib
+import mmap
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.entity_batch import entity_batch, is_valid_uri, ranked_labels
+from app.services.graph_index import GraphIndex
+from app.services.queries.misc import MiscQueries
+from app.services.sparql_client import SparqlClient
+from app.utils.parsers import parse_sparql_response
+
+MAGIC = b"LBLDICT1"
+HEADER_SIZE = 16
+
+
+def uri_key(uri: str) -> int:
+    return int.from_bytes(hashlib.blake2b(uri.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class LabelDictionary:
+    """Read-only, memory-mapped view of a label dictionary file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:8] != MAGIC:
+            raise ValueError(f"{path} is not a label dictionary")
+        n = int.from_bytes(self._mm[8:16], "little")
+        self.keys = np.frombuffer(self._mm, dtype="<u8", count=n, offset=HEADER_SIZE)
+        self.offsets = np.frombuffer(self._mm, dtype="<u8", count=n + 1, offset=HEADER_SIZE + 8 * n)
+        self._blob_start = HEADER_SIZE + 16 * n + 8
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @staticmethod
+    def write(path: str, labels: Dict[str, str]) -> None:
+        """Write `labels` to `path` atomically (readers keep their old mapping)."""
+        entries = sorted((uri_key(uri), f"{uri}\0{label}".encode("utf-8")) for uri, label in labels.items())
+        keys = np.array([key for key, _ in entries], dtype="<u8")
+        lengths = np.array([len(entry) for _, entry in entries], dtype="<u8")
+        offsets = np.concatenate([np.zeros(1, dtype="<u8"), np.cumsum(lengths, dtype="<u8")])
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(entries).to_bytes(8, "little"))
+            f.write(keys.tobytes())
+            f.write(offsets.tobytes())
+            for _, entry in entries:
+                f.write(entry)
+        os.replace(tmp_path, path)
+
+    def _entry(self, position: int) -> bytes:
+        start = self._blob_start + int(self.offsets[position])
+        end = self._blob_start + int(self.offsets[position + 1])
+        return self._mm[start:end]
+
+    def _find(self, uri: str, key: int, position: int) -> Optional[str]:
+        encoded = uri.encode("utf-8") + b"\0"
+        # Walk the (almost always single) run of entries sharing this hash
+        while position < len(self.keys) and int(self.keys[position]) == key:
+            entry = self._entry(position)
+            if entry.startswith(encoded):
+                return entry[len(encoded):].decode("utf-8")
+            position += 1
+        return None
+
+    def get(self, uri: str) -> Optional[str]:
+        key = uri_key(uri)
+        return self._find(uri, key, int(np.searchsorted(self.keys, np.uint64(key))))
+
+    def lookup(self, uris: Iterable[str]) -> Dict[str, str]:
+        """Labels of the known `uris`; unknown URIs are left out."""
+        uris = list(dict.fromkeys(uris))
+        if not uris or not len(self.keys):
+            return {}
+        keys = [uri_key(uri) for uri in uris]
+        positions = np.searchsorted(self.keys, np.array(keys, dtype="<u8"))
+        result = {}
+        for uri, key, position in zip(uris, keys, positions.tolist()):
+            label = self._find(uri, key, position)
+            if label is not None:
+                result[uri] = label
+        return result
+
+
+class LabelIndex(GraphIndex[LabelDictionary]):
+    """
+    LabelDictionary rebuilt after writes (in the background, like every
+    GraphIndex), on TTL expiry and on data reloads.
+
+    URIs created since the last build are resolved by `resolve_labels()`
+    through the batch resolver meanwhile.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__()
+        self.path = settings.LABEL_DICTIONARY_PATH if path is None else path
+        self._invalidated_at = 0.0
+
+    def invalidate(self) -> None:
+        super().invalidate()
+        self._invalidated_at = time.time()
+
+    def _reusable_file(self) -> bool:
+        """A file written recently by this or another worker, after the last invalidation."""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        return mtime > self._invalidated_at and time.time() - mtime < self.ttl
+
+    async def build(self, client: SparqlClient) -> LabelDictionary:
+        if self._value is None and self._reusable_file():
+            return LabelDictionary(self.path)
+
+        response = await client.query(MiscQueries.ALL_LABELS)
+        LabelDictionary.write(self.path, ranked_labels(parse_sparql_response(response)))
+        return LabelDictionary(self.path)
+
+
+label_index = LabelIndex()
+
+
+async def resolve_labels(client: SparqlClient, uris: Iterable[str]) -> Dict[str, str]:
+    """
+    Internal API: labels for `uris`.
+
+    Served from the shared dictionary; URIs it does not know (e.g. created
+    after the last build) fall back to the batch entity resolver.
+    """
+    uris = list(dict.fromkeys(uris))
+    labels = (await label_index.get(client)).lookup(uris)
+    unknown: List[str] = [uri for uri in uris if uri not in labels and is_valid_uri(uri)]
+    if unknown:
+        resolved, _ = await entity_batch.resolve(client, unknown)
+        labels.update({uri: obj["label"] for uri, obj in resolved.items() if obj and obj.get("label")})
+    return labels
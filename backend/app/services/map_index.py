@@ -0,0 +1,331 @@
+"""
+In-memory index of the geolocated entities shown on the map.
+
+All map points are loaded once from the MapQueries, kept as NumPy coordinate
+arrays, and clustered on a Web Mercator grid for every zoom level
+(supercluster-style). Grids have a power-of-two number of cells per side (the
+cell size is MAP_CLUSTER_RADIUS rounded to a power-of-two fraction of a 256px
+tile), so each cell at zoom z+1 is exactly one quarter of a cell at zoom z and
+the clusters form a hierarchy. Panning or zooming the map is a lookup into
+precomputed arrays instead of a SPARQL round trip.
+"""
+
+import asyncio
+import hashlib
+import math
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.graph_index import GraphIndex
+from app.services.interval_index import IntervalIndex, parse_year
+from app.services.map_snapshot import MapSnapshot
+from app.services.queries.map import MapQueries
+from app.services.spatial_index import KDTree
+from app.services.sparql_client import SparqlClient
+from app.utils.parsers import parse_sparql_response
+
+ENTITY_TYPES = ("exhibition", "institution", "person", "artwork")
+
+ENTITY_QUERIES = {
+    "exhibition": MapQueries.GET_EXHIBITIONS,
+    "institution": MapQueries.GET_INSTITUTIONS,
+    "person": MapQueries.GET_PERSONS,
+    "artwork": MapQueries.GET_ARTWORKS,
+}
+
+# Bounding box as (west, south, east, north) in degrees
+BBox = Tuple[float, float, float, float]
+
+# +/- 0.0001 degrees is roughly 11 meters
+JITTER_DEGREES = 0.0001
+
+
+def jitter(keys: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Deterministic (lat, long) offsets in [-JITTER_DEGREES, JITTER_DEGREES].
+
+    Derived from a hash of each key, so the same point always gets the same
+    offset and responses stay byte-identical (and cacheable) across requests.
+    """
+    digests = b"".join(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest() for key in keys)
+    words = np.frombuffer(digests, dtype="<u4").reshape(-1, 2)
+    offsets = (words / np.float64(0xFFFFFFFF) * 2.0 - 1.0) * JITTER_DEGREES
+    return offsets[:, 0], offsets[:, 1]
+
+
+def process_entities(data: List[dict], entity_type: str) -> List[dict]:
+    rows = []
+    coords = []
+    for item in data:
+        uri = item.get("uri", "")
+        # Extract ID from URI (last part after / or #)
+        id_part = uri.split("/")[-1] if "/" in uri else uri.split("#")[-1]
+
+        # Check for location type (residence/birth) to generate unique ID for multiple points
+        loc_type = item.get("loc_type")
+        if loc_type:
+            id_part = f"{id_part}_{loc_type}"
+
+        lat = item.get("lat")
+        long = item.get("long")
+
+        if not lat or not long:
+            continue
+
+        try:
+            coords.append((float(lat), float(long)))
+        except (ValueError, TypeError):
+            continue
+        rows.append((id_part, uri, item))
+
+    if not rows:
+        return []
+
+    # Jitter: shift points slightly to prevent exact overlaps, keyed on the point id
+    lats, longs = np.array(coords, dtype=np.float64).T
+    lat_offsets, long_offsets = jitter([f"{uri}#{id_part}" for id_part, uri, _ in rows])
+    lats = (lats + lat_offsets).tolist()
+    longs = (longs + long_offsets).tolist()
+
+    return [
+        {
+            "id": id_part,
+            "uri": uri,
+            "type": entity_type,
+            "label": item.get("label", f"Unknown {entity_type}"),
+            "lat": lat,
+            "long": long,
+            "date_start": item.get("date_start"),
+            "date_end": item.get("date_end")
+        }
+        for (id_part, uri, item), lat, long in zip(rows, lats, longs)
+    ]
+
+
+async def fetch_entities(client: SparqlClient, entity_type: str) -> List[dict]:
+    """Run the map query of one entity type and return its processed points."""
+    resp = await client.query(ENTITY_QUERIES[entity_type])
+    return process_entities(parse_sparql_response(resp), entity_type)
+
+
+def parse_bbox(bbox: Optional[str]) -> Optional[BBox]:
+    """
+    Parse a "west,south,east,north" string.
+
+    Raises ValueError for malformed boxes. `west > east` is allowed and means
+    the box crosses the antimeridian.
+    """
+    if not bbox:
+        return None
+    parts = [float(p) for p in bbox.split(",")]
+    if len(parts) != 4:
+        raise ValueError("bbox must be 'west,south,east,north'")
+    west, south, east, north = parts
+    if south > north:
+        raise ValueError("bbox south must be lower than north")
+    return west, south, east, north
+
+
+def bbox_mask(lat: np.ndarray, long: np.ndarray, bbox: Optional[BBox]) -> np.ndarray:
+    """Boolean mask of the coordinates that fall inside `bbox` (all if None)."""
+    if bbox is None:
+        return np.ones(lat.shape, dtype=bool)
+    west, south, east, north = bbox
+    in_lat = (lat >= south) & (lat <= north)
+    if west <= east:
+        in_long = (long >= west) & (long <= east)
+    else:
+        in_long = (long >= west) | (long <= east)
+    return in_lat & in_long
+
+
+def mercator_xy(lat: np.ndarray, long: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Project to Web Mercator unit square: x, y in [0, 1]."""
+    x = long / 360.0 + 0.5
+    sin = np.sin(np.radians(np.clip(lat, -85.05112878, 85.05112878)))
+    y = 0.5 - 0.25 * np.log((1 + sin) / (1 - sin)) / math.pi
+    return np.clip(x, 0.0, 1.0), np.clip(y, 0.0, 1.0)
+
+
+def grid_cells(zoom: int) -> int:
+    """Cells per side of the clustering grid at `zoom` (always a power of two)."""
+    per_tile = round(math.log2(256 / settings.MAP_CLUSTER_RADIUS))
+    return 2 ** max(0, zoom + per_tile)
+
+
+class ZoomLevel:
+    """Clusters of one zoom level: one entry per occupied grid cell."""
+
+    def __init__(self, cell_ids: np.ndarray, lat: np.ndarray, long: np.ndarray, type_codes: np.ndarray):
+        self.cell_ids, self.point_cluster, self.count = np.unique(
+            cell_ids, return_inverse=True, return_counts=True
+        )
+        n_clusters = len(self.cell_ids)
+        self.lat = np.bincount(self.point_cluster, weights=lat, minlength=n_clusters) / self.count
+        self.long = np.bincount(self.point_cluster, weights=long, minlength=n_clusters) / self.count
+        self.type_counts = np.bincount(
+            self.point_cluster * len(ENTITY_TYPES) + type_codes,
+            minlength=n_clusters * len(ENTITY_TYPES),
+        ).reshape(n_clusters, len(ENTITY_TYPES))
+
+
+class ClusterHierarchy:
+    """Grid clusters for every zoom level of a subset of map points."""
+
+    def __init__(self, index: "MapPoints", point_ids: np.ndarray):
+        self.index = index
+        self.point_ids = point_ids
+        self.x, self.y = mercator_xy(index.lat[point_ids], index.long[point_ids])
+        self._levels: Dict[int, ZoomLevel] = {}
+
+    def level(self, zoom: int) -> ZoomLevel:
+        """Clusters of one zoom level, computed on first use."""
+        if zoom not in self._levels:
+            cells = grid_cells(zoom)
+            cx = np.minimum((self.x * cells).astype(np.int64), cells - 1)
+            cy = np.minimum((self.y * cells).astype(np.int64), cells - 1)
+            ids = self.point_ids
+            self._levels[zoom] = ZoomLevel(
+                cx * cells + cy, self.index.lat[ids], self.index.long[ids], self.index.type_codes[ids]
+            )
+        return self._levels[zoom]
+
+    def clusters(self, zoom: int, bbox: Optional[BBox] = None) -> Tuple[List[dict], List[dict]]:
+        """
+        Clusters and standalone points visible at `zoom` inside `bbox`.
+
+        Above MAP_CLUSTER_MAX_ZOOM every point is returned individually. Cells
+        holding a single point are returned as that point (like supercluster).
+        """
+        if zoom > settings.MAP_CLUSTER_MAX_ZOOM:
+            mask = bbox_mask(self.index.lat[self.point_ids], self.index.long[self.point_ids], bbox)
+            return [], self.index.items_at(self.point_ids[mask])
+
+        level = self.level(max(zoom, 0))
+        visible = np.flatnonzero(bbox_mask(level.lat, level.long, bbox))
+
+        clusters = []
+        singles = []
+        for c in visible[level.count[visible] > 1]:
+            clusters.append({
+                "id": f"{zoom}/{int(level.cell_ids[c])}",
+                "lat": float(level.lat[c]),
+                "long": float(level.long[c]),
+                "count": int(level.count[c]),
+                "types": {
+                    etype: int(n) for etype, n in zip(ENTITY_TYPES, level.type_counts[c]) if n
+                },
+            })
+
+        single_clusters = visible[level.count[visible] == 1]
+        if len(single_clusters):
+            in_single = np.isin(level.point_cluster, single_clusters)
+            singles = self.index.items_at(self.point_ids[in_single])
+        return clusters, singles
+
+    def leaves(self, cluster_id: str, limit: int, offset: int = 0) -> List[dict]:
+        """Points contained in a cluster returned by `clusters()`."""
+        zoom, cell_id = (int(part) for part in cluster_id.split("/"))
+        if not 0 <= zoom <= settings.MAP_CLUSTER_MAX_ZOOM:
+            raise ValueError("cluster zoom out of range")
+        level = self.level(zoom)
+        position = np.searchsorted(level.cell_ids, cell_id)
+        if position >= len(level.cell_ids) or level.cell_ids[position] != cell_id:
+            return []
+        members = self.point_ids[level.point_cluster == position]
+        return self.index.items_at(members[offset:offset + limit])
+
+
+class MapPoints:
+    """
+    All map points as columnar arrays, plus spatial and year-interval indexes
+    and cluster hierarchies per type combination.
+    """
+
+    def __init__(self, items: List[dict]):
+        self.items = items
+        self.lat = np.array([item["lat"] for item in items], dtype=np.float64)
+        self.long = np.array([item["long"] for item in items], dtype=np.float64)
+        self.type_codes = np.array(
+            [ENTITY_TYPES.index(item["type"]) for item in items], dtype=np.int64
+        )
+        self._hierarchies: Dict[FrozenSet[str], ClusterHierarchy] = {}
+        self._snapshot: Optional[MapSnapshot] = None
+        self.tree = KDTree(self.long, self.lat)
+        self.intervals = IntervalIndex(
+            (parse_year(item.get("date_start")) for item in items),
+            (parse_year(item.get("date_end")) for item in items),
+        )
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def items_at(self, positions: Iterable[int]) -> List[dict]:
+        return [self.items[int(p)] for p in positions]
+
+    @staticmethod
+    def _codes(types: Iterable[str]) -> List[int]:
+        return [ENTITY_TYPES.index(t) for t in types if t in ENTITY_TYPES]
+
+    def selection(self, types: Iterable[str], from_year: Optional[int] = None, to_year: Optional[int] = None) -> np.ndarray:
+        """Boolean mask of the points of the given types active in [from_year, to_year]."""
+        mask = np.isin(self.type_codes, self._codes(types))
+        if from_year is not None or to_year is not None:
+            mask &= self.intervals.mask(from_year, to_year)
+        return mask
+
+    def point_ids(self, types: Iterable[str], from_year: Optional[int] = None, to_year: Optional[int] = None) -> np.ndarray:
+        return np.flatnonzero(self.selection(types, from_year, to_year))
+
+    def in_bbox(self, bbox: BBox, types: Iterable[str], limit: int,
+                from_year: Optional[int] = None, to_year: Optional[int] = None) -> List[dict]:
+        """Points of the given types inside `bbox`, in index order."""
+        positions = np.sort(self.tree.bbox(*bbox))
+        positions = positions[self.selection(types, from_year, to_year)[positions]]
+        return self.items_at(positions[:limit])
+
+    def nearby(self, lat: float, long: float, radius_km: float, types: Iterable[str], limit: int,
+               from_year: Optional[int] = None, to_year: Optional[int] = None) -> List[dict]:
+        """Points of the given types within `radius_km`, nearest first, with their distance."""
+        positions, distances = self.tree.within(lat, long, radius_km)
+        keep = self.selection(types, from_year, to_year)[positions]
+        positions, distances = positions[keep][:limit], distances[keep][:limit]
+        return [
+            {**self.items[int(p)], "distance_km": round(float(d), 3)}
+            for p, d in zip(positions, distances)
+        ]
+
+    def snapshot(self) -> MapSnapshot:
+        """Compressed columnar snapshot of every point, encoded on first use."""
+        if self._snapshot is None:
+            self._snapshot = MapSnapshot(self.items, self.lat, self.long)
+        return self._snapshot
+
+    def hierarchy(self, types: Iterable[str], from_year: Optional[int] = None,
+                  to_year: Optional[int] = None) -> ClusterHierarchy:
+        """
+        Cluster hierarchy for a combination of entity types, built on first use.
+
+        Hierarchies restricted to a year window are not kept: the slider moves
+        too often for them to be reused, and only the requested zoom is computed.
+        """
+        if from_year is not None or to_year is not None:
+            return ClusterHierarchy(self, self.point_ids(types, from_year, to_year))
+        key = frozenset(t for t in types if t in ENTITY_TYPES)
+        if key not in self._hierarchies:
+            self._hierarchies[key] = ClusterHierarchy(self, self.point_ids(key))
+        return self._hierarchies[key]
+
+
+class MapIndex(GraphIndex[MapPoints]):
+    async def build(self, client: SparqlClient) -> MapPoints:
+        results = await asyncio.gather(*(fetch_entities(client, etype) for etype in ENTITY_TYPES))
+        points = MapPoints([item for res in results for item in res])
+        # Encode the snapshot right away so the first map load is a static fetch
+        points.snapshot()
+        return points
+
+
+map_index = MapIndex()
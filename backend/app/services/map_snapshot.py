@@ -0,0 +1,89 @@
+"""
+Compact columnar snapshot of all map points.
+
+Instead of a JSON list of dicts repeating `type`, `uri` and `label` for every
+point, the snapshot stores one column per field:
+
+- `lat` / `long`: little-endian float32 arrays, base64 encoded.
+- string fields (`type`, `uri` namespace and local name, `label`, dates...):
+  dictionary encoded as a `table` of distinct values plus little-endian
+  unsigned integer `codes`, base64 encoded. Code 0 is reserved for null.
+
+The encoded document is gzip-compressed once and served as a static artifact
+with an ETag derived from its content.
+"""
+
+import base64
+import gzip
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import orjson
+
+from app.utils.http_cache import make_etag
+
+SNAPSHOT_FORMAT = "columnar-v1"
+
+
+def _b64(array: np.ndarray) -> str:
+    return base64.b64encode(array.astype(array.dtype.newbyteorder("<")).tobytes()).decode("ascii")
+
+
+def _code_dtype(size: int) -> np.dtype:
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if size <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+def encode_strings(values: Sequence[Optional[str]]) -> Dict[str, object]:
+    """Dictionary-encode a string column; nulls get code 0."""
+    table: List[str] = []
+    code_of: Dict[str, int] = {}
+    codes = []
+    for value in values:
+        if value is None:
+            codes.append(0)
+            continue
+        code = code_of.get(value)
+        if code is None:
+            table.append(value)
+            code = code_of[value] = len(table)
+        codes.append(code)
+    dtype = _code_dtype(len(table))
+    return {"table": table, "dtype": dtype.name, "codes": _b64(np.array(codes, dtype=dtype))}
+
+
+def split_uri(uri: str) -> Tuple[str, str]:
+    """Split a URI into namespace and local name (after the last '/' or '#')."""
+    cut = max(uri.rfind("/"), uri.rfind("#")) + 1
+    return uri[:cut], uri[cut:]
+
+
+class MapSnapshot:
+    """Encoded snapshot of a list of map points, ready to be served."""
+
+    def __init__(self, items: List[dict], lat: np.ndarray, long: np.ndarray):
+        namespaces, locals_ = zip(*(split_uri(item["uri"]) for item in items)) if items else ((), ())
+        # Person points get an id suffix per location type (_birth, _residence...)
+        id_suffixes = [item["id"][len(local):] or None for item, local in zip(items, locals_)]
+
+        document = {
+            "format": SNAPSHOT_FORMAT,
+            "count": len(items),
+            "lat": _b64(lat.astype(np.float32)),
+            "long": _b64(long.astype(np.float32)),
+            "type": encode_strings([item["type"] for item in items]),
+            "uri_namespace": encode_strings(namespaces),
+            "uri_local": list(locals_),
+            "id_suffix": encode_strings(id_suffixes),
+            "label": encode_strings([item.get("label") for item in items]),
+            "date_start": encode_strings([item.get("date_start") for item in items]),
+            "date_end": encode_strings([item.get("date_end") for item in items]),
+        }
+        self.body = orjson.dumps(document)
+        self.gzipped = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.etag = make_etag(self.body)
+
+    def __len__(self) -> int:
+        return len(self.body)
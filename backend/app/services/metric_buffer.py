@@ -0,0 +1,213 @@
+"""
+Buffered ingestion of metric events (POST /metrics/).
+
+Events are appended to an in-process ring buffer and acknowledged right away;
+a background worker writes them to the `metrics` table with one bulk INSERT
+per batch, when METRIC_FLUSH_SIZE events are waiting or every
+METRIC_FLUSH_INTERVAL_SECONDS. The buffer holds at most METRIC_BUFFER_SIZE
+events: when it is full (e.g. the database is down) the oldest events are
+dropped and counted. Whatever is left is flushed at shutdown.
+
+A batch the database rejects is retried row by row: rows that still fail on
+their own (bad data) are dropped and counted as rejected, so one bad event
+cannot hold back the others. Connection errors keep the events buffered.
+
+Each flush also increments the hourly/daily rollups in the same transaction
+(see app.services.metric_rollups). Inserts run in a worker thread so they
+never block the event loop.
+"""
+
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import exc, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.metric import Metric
+from app.services import metric_rollups
+
+
+def is_row_error(error: Exception) -> bool:
+    """Whether `error` comes from the rows written (not from reaching the database)."""
+    return isinstance(error, exc.StatementError) and not isinstance(error, (exc.OperationalError, exc.InterfaceError))
+
+
+class MetricBuffer:
+    """Bounded buffer of metric rows plus the worker flushing them in bulk."""
+
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        flush_size: Optional[int] = None,
+        interval: Optional[float] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.capacity = settings.METRIC_BUFFER_SIZE if capacity is None else capacity
+        self.flush_size = settings.METRIC_FLUSH_SIZE if flush_size is None else flush_size
+        self.interval = settings.METRIC_FLUSH_INTERVAL_SECONDS if interval is None else interval
+        self.session_factory = session_factory
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=self.capacity)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.accepted = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.failed_flushes = 0
+        self.last_flush: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def add(self, event_type: str, payload: Optional[Dict[str, Any]] = None, user_id: Optional[int] = None) -> None:
+        """Buffer one event (never blocks); the oldest event is dropped if the buffer is full."""
+        if len(self._events) >= self.capacity:
+            self.dropped += 1
+        self._events.append({
+            "user_id": user_id,
+            "event_type": event_type,
+            "payload": payload,
+            "timestamp": datetime.utcnow(),
+        })
+        self.accepted += 1
+        if self._wakeup is not None and len(self._events) >= self.flush_size:
+            self._wakeup.set()
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(insert(Metric), rows)
+            metric_rollups.record(db, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def flush(self) -> int:
+        """Write every buffered event, one bulk INSERT per METRIC_FLUSH_SIZE rows; returns how many were written."""
+        written = 0
+        async with self._lock:
+            while self._events:
+                rows = [self._events.popleft() for _ in range(min(self.flush_size, len(self._events)))]
+                left: List[Dict[str, Any]] = []
+                try:
+                    await asyncio.to_thread(self._insert, rows)
+                    inserted = len(rows)
+                except Exception as e:
+                    self.failed_flushes += 1
+                    self.last_error = str(e)
+                    if is_row_error(e):
+                        inserted, left = await asyncio.to_thread(self._insert_each, rows)
+                    else:
+                        inserted, left = 0, rows
+                written += inserted
+                self.flushed += inserted
+                if inserted:
+                    self.last_flush = time.time()
+                if left:
+                    self._requeue(left)
+                    break
+        return written
+
+    def _insert_each(self, rows: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Insert `rows` one at a time, dropping those rejected by the database;
+        returns (rows inserted, rows left unwritten after a connection error).
+        """
+        inserted = 0
+        for position, row in enumerate(rows):
+            try:
+                self._insert([row])
+                inserted += 1
+            except Exception as e:
+                if not is_row_error(e):
+                    return inserted, rows[position:]
+                self.rejected += 1
+                self.last_error = str(e)
+        return inserted, []
+
+    def _requeue(self, rows: List[Dict[str, Any]]) -> None:
+        """Put a failed batch back in front of newer events, dropping what no longer fits."""
+        room = self.capacity - len(self._events)
+        kept = rows[len(rows) - room:] if room < len(rows) else rows
+        self.dropped += len(rows) - len(kept)
+        self._events.extendleft(reversed(kept))
+
+    def _rebuild_rollups(self, only_if_empty: bool) -> Optional[int]:
+        db = self.session_factory()
+        try:
+            if only_if_empty and not metric_rollups.is_empty(db):
+                return None
+            return metric_rollups.rebuild(db)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def rebuild_rollups(self, only_if_empty: bool = False) -> Optional[int]:
+        """
+        Recompute the rollups from the raw table (no flush runs meanwhile);
+        returns the number of hourly buckets, or None if they were kept.
+        """
+        async with self._lock:
+            return await asyncio.to_thread(self._rebuild_rollups, only_if_empty)
+
+    async def _run(self) -> None:
+        try:
+            # Events stored before the rollups existed
+            await self.rebuild_rollups(only_if_empty=True)
+        except Exception as e:
+            print(f"Error building metric rollups: {e}")
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error flushing metrics: {e}")
+
+    def start(self) -> None:
+        """Start the flush worker (at startup)."""
+        self._wakeup = asyncio.Event()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the worker and flush the remaining events (at shutdown)."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._wakeup = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buffered": len(self._events),
+            "capacity": self.capacity,
+            "accepted": self.accepted,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "failed_flushes": self.failed_flushes,
+            "last_flush": self.last_flush,
+            "last_error": self.last_error,
+        }
+
+
+metric_buffer = MetricBuffer()
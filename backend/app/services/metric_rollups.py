@@ -0,0 +1,166 @@
+"""
+Hourly and daily rollups of metric events for the admin dashboards.
+
+`metrics_hourly` and `metrics_daily` hold the number of events per bucket and
+event type. They are incremented by the ingestion buffer in the same
+transaction as the raw rows (`record()`), and can be rebuilt from the raw
+table (`rebuild()`, run at startup when they are empty).
+
+Counting a time range reads whole days from the daily table and whole hours
+from the hourly one; only the partial hours at either end of the range are
+counted live from `metrics` (an index range scan of less than an hour each).
+The helpers take a sync Session; request handlers run them through
+`AsyncSession.run_sync`.
+"""
+
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.metric import Metric, MetricDaily, MetricHourly
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+# Buckets per upsert statement (keeps the bind parameters well under driver limits)
+UPSERT_CHUNK = 1000
+
+# (day, event type) -> count
+DailyCounts = Dict[Tuple[date, str], int]
+
+
+def floor_hour(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def floor_day(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def ceil_hour(moment: datetime) -> datetime:
+    floor = floor_hour(moment)
+    return floor if floor == moment else floor + HOUR
+
+
+def ceil_day(moment: datetime) -> datetime:
+    floor = floor_day(moment)
+    return floor if floor == moment else floor + DAY
+
+
+def bucket_counts(rows: Iterable[Dict]) -> Tuple[Counter, Counter]:
+    """Hourly and daily counts of metric rows ({"timestamp", "event_type", ...})."""
+    hourly: Counter = Counter()
+    daily: Counter = Counter()
+    for row in rows:
+        hourly[(floor_hour(row["timestamp"]), row["event_type"])] += 1
+        daily[(floor_day(row["timestamp"]), row["event_type"])] += 1
+    return hourly, daily
+
+
+def _increment(db: Session, model: Type, counts: Counter) -> None:
+    if not counts:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        values = [
+            {"bucket": bucket, "event_type": event_type, "count": count}
+            for (bucket, event_type), count in counts.items()
+        ]
+        for i in range(0, len(values), UPSERT_CHUNK):
+            statement = insert(model).values(values[i:i + UPSERT_CHUNK])
+            db.execute(statement.on_conflict_do_update(
+                index_elements=[model.bucket, model.event_type],
+                set_={"count": model.count + statement.excluded.count},
+            ))
+        return
+    # Other backends: read-modify-write, one row per bucket
+    for (bucket, event_type), count in counts.items():
+        row = db.get(model, (bucket, event_type))
+        if row is None:
+            db.add(model(bucket=bucket, event_type=event_type, count=count))
+        else:
+            row.count += count
+
+
+def record(db: Session, rows: List[Dict]) -> None:
+    """Add freshly inserted metric rows to the rollups (caller commits)."""
+    hourly, daily = bucket_counts(rows)
+    _increment(db, MetricHourly, hourly)
+    _increment(db, MetricDaily, daily)
+
+
+def is_empty(db: Session) -> bool:
+    return db.query(MetricHourly.bucket).first() is None
+
+
+def rebuild(db: Session, batch_size: int = 10_000) -> int:
+    """Recompute both rollups from the raw `metrics` table; returns the number of hourly rows."""
+    db.query(MetricHourly).delete()
+    db.query(MetricDaily).delete()
+    events = db.query(Metric.timestamp, Metric.event_type).execution_options(yield_per=batch_size)
+    hourly, daily = bucket_counts({"timestamp": t, "event_type": e} for t, e in events)
+    _increment(db, MetricHourly, hourly)
+    _increment(db, MetricDaily, daily)
+    db.commit()
+    return len(hourly)
+
+
+def _segments(start: datetime, end: datetime) -> Iterator[Tuple[Optional[Type], datetime, datetime]]:
+    """
+    Split [start, end) into (source, from, to) parts: MetricDaily for whole
+    days, MetricHourly for whole hours and None (raw table) for the rest.
+    """
+    first_hour, last_hour = ceil_hour(start), floor_hour(end)
+    if first_hour >= last_hour:
+        yield None, start, end
+        return
+    yield None, start, first_hour
+    first_day, last_day = ceil_day(first_hour), floor_day(last_hour)
+    if first_day < last_day:
+        yield MetricHourly, first_hour, first_day
+        yield MetricDaily, first_day, last_day
+        yield MetricHourly, last_day, last_hour
+    else:
+        yield MetricHourly, first_hour, last_hour
+    yield None, last_hour, end
+
+
+def daily_counts(db: Session, start: datetime, end: datetime, event_type: Optional[str] = None) -> DailyCounts:
+    """Number of events per (day, event type) in [start, end)."""
+    counts: Counter = Counter()
+    for model, lower, upper in _segments(start, end):
+        if lower >= upper:
+            continue
+        if model is None:
+            query = db.query(Metric.event_type, func.count(Metric.id)).filter(
+                Metric.timestamp >= lower,
+                Metric.timestamp < upper,
+            )
+            if event_type:
+                query = query.filter(Metric.event_type == event_type)
+            for type_, count in query.group_by(Metric.event_type):
+                counts[(lower.date(), type_)] += count
+        else:
+            query = db.query(model.bucket, model.event_type, model.count).filter(
+                model.bucket >= lower,
+                model.bucket < upper,
+            )
+            if event_type:
+                query = query.filter(model.event_type == event_type)
+            for bucket, type_, count in query:
+                counts[(bucket.date(), type_)] += count
+    return dict(counts)
+
+
+def event_counts(db: Session, start: datetime, end: datetime) -> Dict[str, int]:
+    """Number of events per event type in [start, end)."""
+    counts: Counter = Counter()
+    for (_, event_type), count in daily_counts(db, start, end).items():
+        counts[event_type] += count
+    return dict(counts)
@@ -0,0 +1,191 @@
+"""
+In-memory index of entity names for duplicate detection while typing.
+
+Names are indexed per entity type under an accent-folded key (lower case, no
+diacritics or punctuation, single spaces), so "José  Pérez" and "jose perez"
+are the same name. A lookup reports:
+
+- exact:     entities whose name folds to the same key;
+- collision: the entity that already has the URI a create with this name
+             would produce (URIs are hash_sha256 of the normalized name);
+- similar:   names within a small edit distance, found through a trigram
+             index and verified with a bounded Levenshtein distance.
+
+The index is built from the graph and updated in place on every create.
+"""
+
+import asyncio
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.services.graph_index import GraphIndex
+from app.services.queries.entities import EntityQueries
+from app.services.sparql_client import SparqlClient
+from app.utils.helpers import hash_sha256, normalize_name
+from app.utils.parsers import parse_sparql_response
+
+ONTOLOGY = "https://w3id.org/OntoExhibit#"
+NAME_TYPES = ("person", "institution", "exhibition", "artwork")
+TYPE_ALIASES = {
+    "actant": "person",
+    "actor": "person",
+    "persona": "person",
+    "human_actant": "person",
+    "institucion": "institution",
+    "exposicion": "exhibition",
+    "obra": "artwork",
+}
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def fold_name(name: str) -> str:
+    """Accent-folded comparison key of a name."""
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _SPACES.sub(" ", _PUNCTUATION.sub(" ", stripped.casefold())).strip()
+
+
+def trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """Levenshtein distance of `a` and `b`, or None if it exceeds `max_distance`."""
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > max_distance:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+def creation_uris(entity_type: str, name: str) -> List[str]:
+    """URIs the add_* builders would give an entity with this name."""
+    normalized = normalize_name(name)
+    if entity_type == "person":
+        # add_persona hashes the name with the actant type
+        return [
+            f"{ONTOLOGY}human_actant/{hash_sha256(f'{normalized} - {kind}')}"
+            for kind in ("person", "group", "human actant")
+        ]
+    if entity_type == "institution":
+        return [f"{ONTOLOGY}institution/{hash_sha256(normalized)}"]
+    if entity_type == "exhibition":
+        return [f"{ONTOLOGY}exhibition/{hash_sha256(f'exhibition - {normalized}')}"]
+    if entity_type == "artwork":
+        return [f"{ONTOLOGY}work_manifestation/{hash_sha256(f'{normalized} - work manifestation')}"]
+    return []
+
+
+class NameIndex:
+    """Folded-name, URI and trigram indexes of the names of one entity type."""
+
+    def __init__(self):
+        self.uris: List[str] = []
+        self.labels: List[str] = []
+        self.keys: List[str] = []
+        self.by_key: Dict[str, List[int]] = {}
+        self.by_uri: Dict[str, List[int]] = {}
+        self.by_gram: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.uris)
+
+    def add(self, uri: str, label: str) -> None:
+        key = fold_name(label)
+        if not key or any(self.keys[i] == key for i in self.by_uri.get(uri, ())):
+            return
+        position = len(self.uris)
+        self.uris.append(uri)
+        self.labels.append(label)
+        self.keys.append(key)
+        self.by_key.setdefault(key, []).append(position)
+        self.by_uri.setdefault(uri, []).append(position)
+        for gram in trigrams(key):
+            self.by_gram.setdefault(gram, []).append(position)
+
+    def _entry(self, position: int) -> dict:
+        return {"uri": self.uris[position], "label": self.labels[position]}
+
+    def similar(self, key: str, max_distance: int, limit: int, max_candidates: int) -> List[dict]:
+        """Names within `max_distance` edits of `key` (excluding `key` itself), closest first."""
+        counts = Counter()
+        for gram in trigrams(key):
+            counts.update(self.by_gram.get(gram, ()))
+        found: Dict[str, dict] = {}
+        for position, _ in counts.most_common(max_candidates):
+            other = self.keys[position]
+            if other == key or self.uris[position] in found:
+                continue
+            distance = edit_distance(key, other, max_distance)
+            if distance is not None:
+                found[self.uris[position]] = {**self._entry(position), "distance": distance}
+        return sorted(found.values(), key=lambda entry: (entry["distance"], entry["label"]))[:limit]
+
+    def check(
+        self,
+        entity_type: str,
+        name: str,
+        limit: int = 10,
+        max_distance: Optional[int] = None,
+        max_candidates: Optional[int] = None,
+    ) -> dict:
+        max_distance = settings.DUPLICATE_MAX_DISTANCE if max_distance is None else max_distance
+        max_candidates = settings.DUPLICATE_MAX_CANDIDATES if max_candidates is None else max_candidates
+        key = fold_name(name)
+        exact = list({self.uris[p]: self._entry(p) for p in self.by_key.get(key, ())}.values())
+        collision = next(
+            (self._entry(self.by_uri[uri][0]) for uri in creation_uris(entity_type, name) if uri in self.by_uri),
+            None,
+        )
+        return {
+            "key": key,
+            "exact": exact[:limit],
+            "collision": collision,
+            "similar": self.similar(key, max_distance, limit, max_candidates) if key else [],
+        }
+
+
+class NameIndexes(GraphIndex[Dict[str, NameIndex]]):
+    """
+    NameIndex of each entity type, refreshed by TTL and data reloads.
+
+    Creates through the API are added with `add()` instead of triggering a
+    rebuild.
+    """
+
+    def is_stale(self, version: Optional[int] = None) -> bool:
+        return super().is_stale(None)
+
+    async def build(self, client: SparqlClient) -> Dict[str, NameIndex]:
+        responses = await asyncio.gather(
+            *(client.query(EntityQueries.entity_names(entity_type)) for entity_type in NAME_TYPES)
+        )
+        indexes = {}
+        for entity_type, response in zip(NAME_TYPES, responses):
+            index = NameIndex()
+            for row in parse_sparql_response(response):
+                if row.get("uri") and row.get("label"):
+                    index.add(row["uri"], row["label"])
+            indexes[entity_type] = index
+        return indexes
+
+    def add(self, entity_type: str, uri: str, label: Optional[str]) -> None:
+        """Record a created entity (ignored until the index is first built)."""
+        entity_type = TYPE_ALIASES.get(entity_type, entity_type)
+        if self._value is not None and label and entity_type in self._value:
+            self._value[entity_type].add(uri, label)
+
+
+name_indexes = NameIndexes()
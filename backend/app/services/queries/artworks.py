@@ -18,6 +18,25 @@ class ArtworkQueries:
         }}
     """
 
+    # One row per (artwork, facet, value); artworks without facets still appear once
+    FACET_TABLE = f"""
+        {PREFIXES}
+        SELECT DISTINCT ?uri ?facet ?value
+        WHERE {{
+            ?uri rdf:type <https://w3id.org/OntoExhibit#Work_Manifestation> .
+            OPTIONAL {{
+                {{
+                    ?uri <https://w3id.org/OntoExhibit#type> ?value .
+                    BIND("type_filter" AS ?facet)
+                }} UNION {{
+                    ?uri <https://w3id.org/OntoExhibit#hasTheme> ?topic_node .
+                    ?topic_node rdfs:label ?value .
+                    BIND("topic" AS ?facet)
+                }}
+            }}
+        }}
+    """
+
     @staticmethod
     def get_obras_ids(limit: int, last_label: str = None, last_uri: str = None, text_search: str = None, 
                       author_name: str = None, type_filter: str = None, start_date: str = None, owner: str = None,
@@ -0,0 +1,72 @@
+"""
+SPARQL queries listing the entities of each detail-page type.
+
+Used to materialize the entity document store after a data load.
+"""
+
+from app.services.queries.base import PREFIXES
+
+ENTITY_CLASSES = {
+    "exhibition": ["https://w3id.org/OntoExhibit#Exhibition"],
+    "person": [
+        "https://w3id.org/OntoExhibit#Human_Actant",
+        "https://cidoc-crm.org/cidoc-crm/7.1.1/E74_Group",
+        "https://cidoc-crm.org/cidoc-crm/7.1.1/E21_Person",
+    ],
+    "institution": [
+        "https://w3id.org/OntoExhibit#Institution",
+        "https://w3id.org/OntoExhibit#Cultural_Institution",
+        "https://w3id.org/OntoExhibit#Art_Center",
+        "https://w3id.org/OntoExhibit#Cultural_Center",
+        "https://w3id.org/OntoExhibit#ExhibitionSpace",
+        "https://w3id.org/OntoExhibit#Interpretation_Center",
+        "https://w3id.org/OntoExhibit#Library",
+        "https://w3id.org/OntoExhibit#Museum",
+        "https://w3id.org/OntoExhibit#Educational_Institution",
+        "https://w3id.org/OntoExhibit#University",
+        "https://w3id.org/OntoExhibit#Foundation_(Institution)",
+    ],
+    "artwork": ["https://w3id.org/OntoExhibit#Work_Manifestation"],
+    "catalog": ["https://w3id.org/OntoExhibit#Catalog"],
+    "company": ["https://w3id.org/OntoExhibit#Company"],
+}
+
+
+class EntityQueries:
+    @staticmethod
+    def entity_uris(entity_type: str) -> str:
+        """URIs of every entity of a detail-page type."""
+        classes = "\n".join(f"<{cls}>" for cls in ENTITY_CLASSES[entity_type])
+        return f"""
+            {PREFIXES}
+            SELECT DISTINCT ?uri
+            WHERE {{
+                VALUES ?class {{
+                    {classes}
+                }}
+                ?uri rdf:type ?class .
+            }}
+        """
+
+    @staticmethod
+    def entity_names(entity_type: str) -> str:
+        """Names (labels, person names and titles) of every entity of a detail-page type."""
+        classes = "\n".join(f"<{cls}>" for cls in ENTITY_CLASSES[entity_type])
+        return f"""
+            {PREFIXES}
+            SELECT DISTINCT ?uri ?label
+            WHERE {{
+                VALUES ?class {{
+                    {classes}
+                }}
+                ?uri rdf:type ?class .
+                {{ ?uri rdfs:label ?label }}
+                UNION
+                {{ ?uri <https://w3id.org/OntoExhibit#person_name> ?label }}
+                UNION
+                {{
+                    ?uri <https://w3id.org/OntoExhibit#hasTitle> ?title_entity .
+                    ?title_entity rdfs:label ?label .
+                }}
+            }}
+        """
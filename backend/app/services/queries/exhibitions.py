@@ -18,6 +18,25 @@ class ExhibitionQueries:
         }}
     """
 
+    # One row per (exhibition, facet, value); exhibitions without facets still appear once
+    FACET_TABLE = f"""
+        {PREFIXES}
+        SELECT DISTINCT ?uri ?facet ?value
+        WHERE {{
+            ?uri rdf:type <https://w3id.org/OntoExhibit#Exhibition> .
+            OPTIONAL {{
+                {{
+                    ?uri <https://w3id.org/OntoExhibit#type> ?value .
+                    BIND("exhibition_type" AS ?facet)
+                }} UNION {{
+                    ?uri <https://w3id.org/OntoExhibit#hasTheme> ?theme_node .
+                    ?theme_node rdfs:label ?value .
+                    BIND("theme" AS ?facet)
+                }}
+            }}
+        }}
+    """
+
     @staticmethod
     def get_exposiciones_ids(limit: int, last_label: str = None, last_uri: str = None, text_search: str = None, 
                              start_date: str = None, end_date: str = None, curator_name: str = None, place: str = None,
@@ -0,0 +1,77 @@
+"""
+SPARQL queries feeding the in-memory graph indexes.
+
+They are read page by page (see fetch_pages): every query orders its rows by
+all the selected variables so LIMIT/OFFSET pages neither skip nor repeat rows.
+"""
+
+from app.services.queries.base import PREFIXES
+
+
+class GraphQueries:
+    @staticmethod
+    def edges(limit: int, offset: int) -> str:
+        """One page of entity-to-entity triples over OntoExhibit properties (rdf:type excluded)."""
+        return f"""
+            {PREFIXES}
+            SELECT ?s ?p ?o
+            WHERE {{
+                ?s ?p ?o .
+                FILTER(isIRI(?s) && isIRI(?o))
+                FILTER(STRSTARTS(STR(?p), "https://w3id.org/OntoExhibit#"))
+            }}
+            ORDER BY ?s ?p ?o
+            LIMIT {limit}
+            OFFSET {offset}
+        """
+
+    @staticmethod
+    def participations(limit: int, offset: int) -> str:
+        """One page of (actor, exhibition, role) rows: actors holding a role in an exhibition making."""
+        return f"""
+            {PREFIXES}
+            SELECT DISTINCT ?actor ?exhibition ?role_type
+            WHERE {{
+                VALUES (?has_role ?is_role_in ?role_type) {{
+                    (<https://w3id.org/OntoExhibit#hasExhibitingActant> <https://w3id.org/OntoExhibit#isExhibitingActantIn> "Exhibitor")
+                    (<https://w3id.org/OntoExhibit#hasCurator> <https://w3id.org/OntoExhibit#isCuratorOf> "Curator")
+                    (<https://w3id.org/OntoExhibit#hasOrganizer> <https://w3id.org/OntoExhibit#isOrganizerOf> "Organizer")
+                    (<https://w3id.org/OntoExhibit#hasFunder> <https://w3id.org/OntoExhibit#isFunderOf> "Funder")
+                }}
+                {{ ?exhibition <https://w3id.org/OntoExhibit#hasExhibitionMaking> ?making }}
+                UNION
+                {{ ?making <https://w3id.org/OntoExhibit#isExhibitionMakingOf> ?exhibition }}
+
+                {{ ?making ?has_role ?role }}
+                UNION
+                {{ ?role ?is_role_in ?making }}
+
+                {{ ?role <https://w3id.org/OntoExhibit#isRoleOf> ?actor }}
+                UNION
+                {{ ?actor <https://w3id.org/OntoExhibit#hasRole> ?role }}
+            }}
+            ORDER BY ?actor ?exhibition ?role_type
+            LIMIT {limit}
+            OFFSET {offset}
+        """
+
+    @staticmethod
+    def exhibition_features(limit: int, offset: int) -> str:
+        """One page of (exhibition, feature) rows: displayed artworks, themes, venue and place."""
+        return f"""
+            {PREFIXES}
+            SELECT DISTINCT ?exhibition ?kind ?feature
+            WHERE {{
+                VALUES (?p ?kind) {{
+                    (<https://w3id.org/OntoExhibit#displays> "artwork")
+                    (<https://w3id.org/OntoExhibit#hasTheme> "theme")
+                    (<https://w3id.org/OntoExhibit#hasVenue> "venue")
+                    (<https://w3id.org/OntoExhibit#takesPlaceAt> "place")
+                }}
+                ?exhibition rdf:type <https://w3id.org/OntoExhibit#Exhibition> .
+                ?exhibition ?p ?feature .
+            }}
+            ORDER BY ?exhibition ?kind ?feature
+            LIMIT {limit}
+            OFFSET {offset}
+        """
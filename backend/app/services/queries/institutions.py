@@ -27,6 +27,35 @@ class InstitutionQueries:
         }}
     """
 
+    # One row per (institution, facet, value); institutions without facets still appear once
+    FACET_TABLE = f"""
+        {PREFIXES}
+        SELECT DISTINCT ?uri ?facet ?value
+        WHERE {{
+            VALUES ?institution_class {{
+                <https://w3id.org/OntoExhibit#Institution>
+                <https://w3id.org/OntoExhibit#Cultural_Institution>
+                <https://w3id.org/OntoExhibit#Art_Center>
+                <https://w3id.org/OntoExhibit#Cultural_Center>
+                <https://w3id.org/OntoExhibit#ExhibitionSpace>
+                <https://w3id.org/OntoExhibit#Interpretation_Center>
+                <https://w3id.org/OntoExhibit#Library>
+                <https://w3id.org/OntoExhibit#Museum>
+                <https://w3id.org/OntoExhibit#Educational_Institution>
+                <https://w3id.org/OntoExhibit#University>
+                <https://w3id.org/OntoExhibit#Foundation_(Institution)>
+            }}
+            ?uri rdf:type ?institution_class .
+            OPTIONAL {{
+                ?uri rdf:type ?type_class .
+                ?type_class rdfs:label ?value .
+                FILTER(lang(?value) = "en" || lang(?value) = "")
+                FILTER(?type_class != <https://w3id.org/OntoExhibit#Institution>)
+                BIND("institution_type" AS ?facet)
+            }}
+        }}
+    """
+
     @staticmethod
     def get_instituciones_ids(
         limit: int,
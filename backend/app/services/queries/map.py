@@ -0,0 +1,155 @@
+"""
+SPARQL queries for the interactive map.
+
+Each query returns one row per geolocated point with ?uri, ?label, ?lat, ?long
+and, where available, ?date_start / ?date_end.
+"""
+
+from app.services.queries.base import PREFIXES
+
+
+class MapQueries:
+    GET_EXHIBITIONS = f"""
+        {PREFIXES}
+        SELECT DISTINCT ?uri ?label ?lat ?long ?date_start ?date_end
+        WHERE {{
+            ?uri rdf:type <https://w3id.org/OntoExhibit#Exhibition> .
+            ?uri <http://www.w3.org/2003/01/geo/wgs84_pos#lat> ?lat .
+            ?uri <http://www.w3.org/2003/01/geo/wgs84_pos#long> ?long .
+        
+            OPTIONAL {{ ?uri rdfs:label ?direct_label }}
+            OPTIONAL {{ 
+                ?uri <https://w3id.org/OntoExhibit#hasTitle> ?title_node . 
+                ?title_node rdfs:label ?title_label 
+            }}
+            BIND(COALESCE(?title_label, ?direct_label, "Untitled Exhibition") AS ?label)
+        
+            OPTIONAL {{
+                ?uri <https://w3id.org/OntoExhibit#hasOpening> ?opening .
+                ?opening <https://w3id.org/OntoExhibit#hasTimeSpan> ?time_opening .
+                ?time_opening rdfs:label ?date_start
+            }}
+            OPTIONAL {{
+                ?uri <https://w3id.org/OntoExhibit#hasClosing> ?closing .
+                ?closing <https://w3id.org/OntoExhibit#hasTimeSpan> ?time_closing .
+                ?time_closing rdfs:label ?date_end
+            }}
+        }}
+    """
+
+    GET_INSTITUTIONS = f"""
+        {PREFIXES}
+        SELECT DISTINCT ?uri ?label ?lat ?long
+        WHERE {{
+            ?uri rdf:type <https://w3id.org/OntoExhibit#Institution> .
+            ?uri <https://w3id.org/OntoExhibit#hasHeadquarters> ?hq .
+            ?hq <http://www.w3.org/2003/01/geo/wgs84_pos#lat> ?lat .
+            ?hq <http://www.w3.org/2003/01/geo/wgs84_pos#long> ?long .
+        
+            ?uri rdfs:label ?label .
+        }}
+    """
+
+    GET_PERSONS = f"""
+        {PREFIXES}
+        SELECT DISTINCT ?uri ?label ?lat ?long ?date_start ?date_end ?loc_type
+        WHERE {{
+            # Relaxed Type Check: Removed completely to allow any entity with location properties
+            # {{
+            #     ?uri rdf:type <https://w3id.org/OntoExhibit#Human_Actant> .
+            # }} UNION {{
+            #     ?uri rdf:type <https://w3id.org/OntoExhibit#Person> .
+            # }} UNION {{
+            #     ?uri rdf:type <https://w3id.org/OntoExhibit#Group> .
+            # }}
+
+            # Get Locations (UNION to get multiple per person)
+            {{
+                ?uri <https://w3id.org/OntoExhibit#hasResidency> ?place .
+                BIND("residence" AS ?loc_type)
+            }} UNION {{
+                ?uri <https://w3id.org/OntoExhibit#hasPlaceOfBirth> ?place .
+                BIND("birth" AS ?loc_type)
+            }} UNION {{ 
+                ?uri <https://w3id.org/OntoExhibit#hasFoundation> ?evt_f . 
+                ?evt_f <https://w3id.org/OntoExhibit#hasPlaceOfFoundation> ?place .
+                BIND("birth" AS ?loc_type)
+            }} UNION {{
+                ?uri <https://w3id.org/OntoExhibit#hasBirth> ?evt_b .
+                ?evt_b <https://w3id.org/OntoExhibit#hasPlaceOfBirth> ?place .
+                BIND("birth" AS ?loc_type)
+            }}
+        
+            ?place <http://www.w3.org/2003/01/geo/wgs84_pos#lat> ?lat .
+            ?place <http://www.w3.org/2003/01/geo/wgs84_pos#long> ?long .
+        
+            ?uri rdfs:label ?label .
+        
+            # Birth / Foundation Date
+            OPTIONAL {{
+                {{
+                    ?uri <https://w3id.org/OntoExhibit#hasBirth> ?start_event .
+                }} UNION {{
+                    ?uri <https://w3id.org/OntoExhibit#hasFoundation> ?start_event .
+                }}
+                ?start_event <https://w3id.org/OntoExhibit#hasTimeSpan> ?start_time .
+                ?start_time rdfs:label ?date_start
+            }}
+        
+            # Death / Dissolution Date
+            OPTIONAL {{
+                {{
+                    ?uri <https://w3id.org/OntoExhibit#hasDeath> ?end_event .
+                }} UNION {{
+                    ?uri <https://w3id.org/OntoExhibit#hasDissolution> ?end_event .
+                }}
+                ?end_event <https://w3id.org/OntoExhibit#hasTimeSpan> ?end_time .
+                ?end_time rdfs:label ?date_end
+            }}
+        }}
+    """
+
+    GET_ARTWORKS = f"""
+        {PREFIXES}
+        SELECT DISTINCT ?uri ?label ?lat ?long ?date_start ?date_end
+        WHERE {{
+            ?uri rdf:type <https://w3id.org/OntoExhibit#Work_Manifestation> .
+        
+            # Find owner
+            ?uri <https://w3id.org/OntoExhibit#hasOwner> ?role .
+            ?owner <https://w3id.org/OntoExhibit#hasRole> ?role .
+        
+            # Get owner's location (Inst HQ or Person Residence)
+            {{
+                ?owner <https://w3id.org/OntoExhibit#hasHeadquarters> ?loc .
+            }} UNION {{
+                ?owner <https://w3id.org/OntoExhibit#hasResidency> ?loc .
+                # ?loc rdf:type <https://w3id.org/OntoExhibit#Place_Of_Residence> . REMOVED STRICT CHECK
+            }}
+        
+            ?loc <http://www.w3.org/2003/01/geo/wgs84_pos#lat> ?lat .
+            ?loc <http://www.w3.org/2003/01/geo/wgs84_pos#long> ?long .
+        
+            OPTIONAL {{ ?uri rdfs:label ?direct_label }}
+            OPTIONAL {{ 
+                ?uri <https://w3id.org/OntoExhibit#hasTitle> ?title_node . 
+                ?title_node rdfs:label ?title_label 
+            }}
+            BIND(COALESCE(?title_label, ?direct_label, "Untitled Artwork") AS ?label)
+
+            # Artwork dates (Production)
+            OPTIONAL {{
+                 ?uri <https://w3id.org/OntoExhibit#hasProduction> ?prod .
+                 OPTIONAL {{
+                    ?prod <https://w3id.org/OntoExhibit#hasTimeSpan> ?tr_s .
+                    ?tr_s <https://w3id.org/OntoExhibit#hasStartingDate> ?start_date_node .
+                    ?start_date_node rdfs:label ?date_start .
+                 }}
+                 OPTIONAL {{
+                    ?prod <https://w3id.org/OntoExhibit#hasTimeSpan> ?tr_e .
+                    ?tr_e <https://w3id.org/OntoExhibit#hasEndingDate> ?end_date_node .
+                    ?end_date_node rdfs:label ?date_end .
+                 }}
+            }}
+        }}
+    """
@@ -1,3 +1,5 @@
+from typing import Iterable
+
 from app.services.queries.base import PREFIXES
 
 
@@ -46,6 +48,31 @@ class MiscQueries:
         }}
     """
 
+    # Label candidates of every entity; lower ?rank wins (title, person name, rdfs:label),
+    # like the COALESCE in the detail queries
+    ALL_LABELS = f"""
+        {PREFIXES}
+        SELECT ?uri ?label ?rank
+        WHERE {{
+            {{
+                ?uri <https://w3id.org/OntoExhibit#hasTitle> ?title_entity .
+                ?title_entity rdfs:label ?label .
+                BIND(1 AS ?rank)
+            }}
+            UNION
+            {{
+                ?uri <https://w3id.org/OntoExhibit#person_name> ?label .
+                BIND(2 AS ?rank)
+            }}
+            UNION
+            {{
+                ?uri rdfs:label ?label .
+                BIND(3 AS ?rank)
+            }}
+            FILTER(isIRI(?uri))
+        }}
+    """
+
     GET_DISTINCT_GENDERS = f"""
         {PREFIXES}
         SELECT DISTINCT ?value WHERE {{
@@ -142,3 +169,35 @@ class MiscQueries:
             FILTER(STRLEN(STR(?value)) > 0)
         }} ORDER BY ?value
     """
+
+    @staticmethod
+    def get_objects(uris: Iterable[str]) -> str:
+        """
+        GET_OBJECT_ANY_TYPE for many entities at once: one ?uri ?p ?o row per
+        property. Label candidates carry the ?rank of ALL_LABELS.
+        """
+        values = " ".join(f"<{uri}>" for uri in uris)
+        return f"""
+            {PREFIXES}
+            SELECT DISTINCT ?uri ?p ?o ?rank
+            WHERE {{
+                VALUES ?uri {{ {values} }}
+                {{
+                    ?uri ?p ?o .
+                    BIND(3 AS ?rank)
+                }}
+                UNION
+                {{
+                    BIND(rdfs:label AS ?p)
+                    ?uri <https://w3id.org/OntoExhibit#person_name> ?o .
+                    BIND(2 AS ?rank)
+                }}
+                UNION
+                {{
+                    BIND(rdfs:label AS ?p)
+                    ?uri <https://w3id.org/OntoExhibit#hasTitle> ?title_entity .
+                    ?title_entity rdfs:label ?o .
+                    BIND(1 AS ?rank)
+                }}
+            }}
+        """
@@ -21,6 +21,34 @@ class PersonQueries:
         ORDER BY ?label
     """
 
+    # One row per (actor, facet, value); actors without facets still appear once
+    FACET_TABLE = f"""
+        {PREFIXES}
+        SELECT DISTINCT ?uri ?facet ?value
+        WHERE {{
+            {{ ?uri rdf:type <https://w3id.org/OntoExhibit#Human_Actant> }}
+            UNION {{ ?uri rdf:type <https://cidoc-crm.org/cidoc-crm/7.1.1/E21_Person> }}
+            UNION {{ ?uri rdf:type <https://cidoc-crm.org/cidoc-crm/7.1.1/E74_Group> }}
+            OPTIONAL {{
+                {{
+                    ?uri <https://w3id.org/OntoExhibit#gender> ?value .
+                    BIND("gender" AS ?facet)
+                }} UNION {{
+                    ?uri <https://w3id.org/OntoExhibit#activity_type> ?value .
+                    BIND("activity" AS ?facet)
+                }} UNION {{
+                    ?uri rdf:type <https://cidoc-crm.org/cidoc-crm/7.1.1/E21_Person> .
+                    BIND("Person" AS ?value)
+                    BIND("entity_type" AS ?facet)
+                }} UNION {{
+                    ?uri rdf:type <https://cidoc-crm.org/cidoc-crm/7.1.1/E74_Group> .
+                    BIND("Group" AS ?value)
+                    BIND("entity_type" AS ?facet)
+                }}
+            }}
+        }}
+    """
+
     @staticmethod
     def get_personas_ids(limit: int, last_label: str = None, last_uri: str = None, text_search: str = None,
                          birth_place: str = None, birth_date: str = None, death_date: str = None, 
@@ -0,0 +1,178 @@
+"""
+Cache of graph read responses with entity-level dependencies.
+
+Every cached JSON response records the tags it depends on:
+
+- the entity URIs it contains (the items of a list page, the subject of a
+  detail page, the related entities of a section);
+- "id:<segment>" for the segments of the request path, so a detail endpoint
+  addressed by local id depends on that entity even if its URI is not echoed;
+- "collection:<type>" for list-like endpoints (all_*, count_*, facets, map...),
+  which new entities of that type can change ("collection:*" when the path does
+  not name a type).
+
+A write invalidates only the responses depending on the entities it touched
+(see app.services.invalidation). Hits and misses are counted since the last
+write and for the period before it, to see how much a write cools the cache.
+"""
+
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.detail_cache import entity_id
+
+_ONTOLOGY_URI = re.compile(rb'https://w3id\.org/OntoExhibit#[^"\s<>\\]+')
+
+# Path prefixes (after DEPLOY_PATH) whose results can change when entities are created
+COLLECTION_PREFIXES = ("/all_", "/count_", "/faceted_", "/map/", "/filter_options/", "/semantic_search")
+
+# Words in a collection path -> entity type segment of the URIs it lists
+COLLECTION_TYPES = (
+    ("person", "human_actant"),
+    ("actor", "human_actant"),
+    ("actant", "human_actant"),
+    ("exhibition", "exhibition"),
+    ("artwork", "work_manifestation"),
+    ("institution", "institution"),
+    ("catalog", "catalog"),
+    ("compan", "company"),
+)
+
+
+def collection_tag(entity_type: str) -> str:
+    return f"collection:{entity_type}"
+
+
+def response_dependencies(path: str, body: bytes) -> Set[str]:
+    """Tags a response to `path` (without DEPLOY_PATH) depends on."""
+    tags = {uri.decode("utf-8") for uri in _ONTOLOGY_URI.findall(body)}
+    tags.update(f"id:{segment}" for segment in path.strip("/").split("/")[1:] if segment)
+    if path.startswith(COLLECTION_PREFIXES):
+        types = {entity_type for word, entity_type in COLLECTION_TYPES if word in path}
+        tags.update(collection_tag(t) for t in types or {"*"})
+    return tags
+
+
+def entity_tags(uri: str) -> Set[str]:
+    """Tags under which responses depend on the entity `uri`."""
+    return {uri, f"id:{entity_id(uri)}"}
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    media_type: str
+    etag: str
+    expires: float
+    tags: Set[str]
+
+
+class WindowStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def as_dict(self) -> Dict[str, Optional[float]]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+        }
+
+
+class ResponseCache:
+    """LRU of responses with a TTL and a reverse index from tag to cached keys."""
+
+    def __init__(self, ttl: Optional[int] = None, max_entries: Optional[int] = None):
+        self.ttl = settings.RESPONSE_CACHE_TTL if ttl is None else ttl
+        self.max_entries = settings.RESPONSE_CACHE_SIZE if max_entries is None else max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._keys_by_tag: Dict[str, Set[str]] = {}
+        self.total = WindowStats()
+        self.since_last_write = WindowStats()
+        self.before_last_write = WindowStats()
+        self.writes = 0
+        self.invalidated = 0
+        self.last_write: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() > entry.expires:
+            self._drop(key)
+            entry = None
+        for stats in (self.total, self.since_last_write):
+            if entry is None:
+                stats.misses += 1
+            else:
+                stats.hits += 1
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, body: bytes, media_type: str, etag: str, tags: Iterable[str]) -> None:
+        self._drop(key)
+        entry = CachedResponse(body, media_type, etag, time.monotonic() + self.ttl, set(tags))
+        self._entries[key] = entry
+        for tag in entry.tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def _start_write_window(self, touched: int, invalidated: int) -> None:
+        self.writes += 1
+        self.invalidated += invalidated
+        self.before_last_write = self.since_last_write
+        self.since_last_write = WindowStats()
+        self.last_write = {"tags": touched, "invalidated": invalidated, "remaining": len(self._entries)}
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        """Drop the responses depending on any of `tags` (a write); returns how many."""
+        tags = set(tags)
+        keys = set()
+        for tag in tags:
+            keys.update(self._keys_by_tag.get(tag, ()))
+        for key in keys:
+            self._drop(key)
+        self._start_write_window(len(tags), len(keys))
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drop everything (writes whose scope is unknown, data reloads)."""
+        invalidated = len(self._entries)
+        self._entries.clear()
+        self._keys_by_tag.clear()
+        self._start_write_window(0, invalidated)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "tags": len(self._keys_by_tag),
+            "total": self.total.as_dict(),
+            "before_last_write": self.before_last_write.as_dict(),
+            "since_last_write": self.since_last_write.as_dict(),
+            "writes": self.writes,
+            "invalidated": self.invalidated,
+            "last_write": self.last_write,
+        }
+
+
+response_cache = ResponseCache()
@@ -7,6 +7,10 @@ from app.core.exceptions import SparqlQueryError
 
 
 class SparqlClient:
+    # Incremented after every successful update and every signalled data reload,
+    # so in-memory views of the graph know when they are out of date
+    version: int = 0
+
     def __init__(
         self,
         endpoint_url: str = settings.VIRTUOSO_URL,
@@ -62,6 +66,7 @@ class SparqlClient:
                 auth = httpx.DigestAuth(settings.VIRTUOSO_USER, settings.VIRTUOSO_PASSWORD)
                 response = await client.post(url, data=data, params=params, auth=auth)
                 response.raise_for_status()
+                self.bump_version()
                 # Updates might not return JSON, but we can try to parse it or return a success dict
                 try:
                     return response.json()
@@ -72,5 +77,15 @@ class SparqlClient:
             except httpx.RequestError as e:
                 raise SparqlQueryError(f"Connection error: {str(e)}") from e
 
+    def bump_version(self) -> int:
+        """
+        Mark the graph as changed.
+        
+        Called after each update, and when the data has been reloaded outside
+        the API (ETL loads into Virtuoso).
+        """
+        self.version += 1
+        return self.version
+
 
 sparql_client = SparqlClient()
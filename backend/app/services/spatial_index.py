@@ -0,0 +1,126 @@
+"""
+Static spatial index over point coordinates.
+
+A packed KD-tree in the style of kdbush: points are sorted in place into a
+balanced tree stored in flat NumPy arrays, so range queries only visit the
+nodes overlapping the query box and scan leaves of NODE_SIZE points with
+vectorized comparisons.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+NODE_SIZE = 64
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat: float, long: float, lats: np.ndarray, longs: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km from (lat, long) to every (lats, longs)."""
+    phi1, phi2 = np.radians(lat), np.radians(lats)
+    dphi = phi2 - phi1
+    dlambda = np.radians(longs - long)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class KDTree:
+    """
+    Packed 2-d tree over (x, y) = (long, lat) in degrees.
+
+    `ids` holds the original position of every point in tree order.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, node_size: int = NODE_SIZE):
+        self.node_size = node_size
+        self.x, self.y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+        self.ids = np.arange(len(x), dtype=np.int64)
+        self.coords = np.column_stack([self.x, self.y]) if len(x) else np.empty((0, 2))
+        self._sort(0, len(x) - 1, 0)
+
+    def _sort(self, left: int, right: int, axis: int) -> None:
+        stack = [(left, right, axis)]
+        while stack:
+            left, right, axis = stack.pop()
+            if right - left <= self.node_size:
+                continue
+            middle = (left + right) >> 1
+            # Partition the slice so that the median on `axis` lands at `middle`
+            order = np.argpartition(self.coords[left:right + 1, axis], middle - left)
+            self.coords[left:right + 1] = self.coords[left:right + 1][order]
+            self.ids[left:right + 1] = self.ids[left:right + 1][order]
+            stack.append((left, middle - 1, 1 - axis))
+            stack.append((middle + 1, right, 1 - axis))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def range(self, min_x: float, min_y: float, max_x: float, max_y: float) -> np.ndarray:
+        """Original positions of the points inside the box (bounds inclusive)."""
+        found: List[np.ndarray] = []
+        stack: List[Tuple[int, int, int]] = [(0, len(self.ids) - 1, 0)]
+
+        while stack:
+            left, right, axis = stack.pop()
+            if left > right:
+                continue
+
+            if right - left <= self.node_size:
+                leaf = self.coords[left:right + 1]
+                inside = (
+                    (leaf[:, 0] >= min_x) & (leaf[:, 0] <= max_x)
+                    & (leaf[:, 1] >= min_y) & (leaf[:, 1] <= max_y)
+                )
+                found.append(self.ids[left:right + 1][inside])
+                continue
+
+            middle = (left + right) >> 1
+            x, y = self.coords[middle]
+            if min_x <= x <= max_x and min_y <= y <= max_y:
+                found.append(self.ids[middle:middle + 1])
+
+            value, low, high = (x, min_x, max_x) if axis == 0 else (y, min_y, max_y)
+            if low <= value:
+                stack.append((left, middle - 1, 1 - axis))
+            if high >= value:
+                stack.append((middle + 1, right, 1 - axis))
+
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    def bbox(self, west: float, south: float, east: float, north: float) -> np.ndarray:
+        """Range query in map terms; `west > east` crosses the antimeridian."""
+        if west <= east:
+            return self.range(west, south, east, north)
+        return np.concatenate([self.range(west, south, 180.0, north), self.range(-180.0, south, east, north)])
+
+    def within(self, lat: float, long: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Points within `radius_km` of (lat, long), nearest first.
+
+        Returns (positions, distances_km). Candidates come from the bounding box
+        of the circle and are then filtered by haversine distance.
+        """
+        dlat = np.degrees(radius_km / EARTH_RADIUS_KM)
+        south, north = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+        # Widest longitude span of the circle is at its latitude closest to a pole
+        cos_lat = np.cos(np.radians(max(abs(south), abs(north))))
+        if north >= 90.0 or south <= -90.0 or cos_lat < 1e-6:
+            west, east = -180.0, 180.0
+        else:
+            dlong = min(dlat / cos_lat, 180.0)
+            west, east = long - dlong, long + dlong
+            if dlong >= 180.0:
+                west, east = -180.0, 180.0
+            else:
+                west = west + 360.0 if west < -180.0 else west
+                east = east - 360.0 if east > 180.0 else east
+
+        candidates = self.bbox(west, south, east, north)
+        if not len(candidates):
+            return candidates, np.empty(0)
+
+        distances = haversine_km(lat, long, self.y[candidates], self.x[candidates])
+        inside = distances <= radius_km
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return candidates[order], distances[order]
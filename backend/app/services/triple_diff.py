@@ -0,0 +1,159 @@
+"""
+Diff-based entity updates.
+
+An update used to run the entity's delete_* queries and then its add_*
+INSERT DATA query, rewriting every triple even when one field changed. Here
+the triples currently in the scope of those delete queries are read first,
+compared with the triples the builder generates, and only the difference is
+written in a single update:
+
+    removed = current - new
+    added   = new - current   (minus triples already present outside the scope)
+
+The resulting graph is the same as with delete-and-reinsert.
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.namespace import XSD
+from rdflib.term import Node
+
+from app.core.config import settings
+from app.services.bulk_insert import insert_data_triples
+from app.services.sparql_client import SparqlClient
+
+Pattern = Tuple[str, str, str]
+TripleKey = Tuple[Node, Node, Node]
+
+_DELETE_PATTERN = re.compile(r"DELETE\s*\{(.*?)\}\s*WHERE", re.DOTALL)
+POSITIONS = ("?s", "?p", "?o")
+
+
+def scope_patterns(delete_queries: Sequence[str]) -> List[Pattern]:
+    """Triple patterns deleted by delete_* queries (`WITH <g> DELETE { s p o . } WHERE { ... }`)."""
+    patterns = []
+    for query in delete_queries:
+        match = _DELETE_PATTERN.search(query)
+        if not match:
+            raise ValueError("Unsupported delete query")
+        terms = match.group(1).strip().rstrip(".").split()
+        if len(terms) != 3:
+            raise ValueError("Unsupported delete pattern")
+        # Variables are named by position so every pattern binds ?s ?p ?o
+        patterns.append(tuple(POSITIONS[i] if term.startswith("?") else term for i, term in enumerate(terms)))
+    return patterns
+
+
+def scope_query(patterns: Sequence[Pattern]) -> str:
+    """SELECT of the triples matched by `patterns` in the default graph."""
+    branches = []
+    for pattern in patterns:
+        binds = " ".join(f"BIND({term} AS {var})" for term, var in zip(pattern, POSITIONS) if not term.startswith("?"))
+        branches.append(f"{{ {' '.join(pattern)} . {binds} }}")
+    return f"""
+        SELECT DISTINCT ?s ?p ?o
+        WHERE {{
+            GRAPH <{settings.DEFAULT_GRAPH_URL}> {{
+                {" UNION ".join(branches)}
+            }}
+        }}
+    """
+
+
+def existing_query(triples: Sequence[str]) -> str:
+    """SELECT of those of `triples` (N-Triples statements) already in the default graph."""
+    rows = " ".join(f"({triple.rstrip().rstrip('.').strip()})" for triple in triples)
+    return f"""
+        SELECT ?s ?p ?o
+        WHERE {{
+            VALUES (?s ?p ?o) {{ {rows} }}
+            GRAPH <{settings.DEFAULT_GRAPH_URL}> {{ ?s ?p ?o }}
+        }}
+    """
+
+
+def term_from_binding(binding: Dict[str, str]) -> Node:
+    kind = binding.get("type")
+    if kind == "uri":
+        return URIRef(binding["value"])
+    if kind == "bnode":
+        return BNode(binding["value"])
+    datatype = binding.get("datatype")
+    return Literal(binding["value"], lang=binding.get("xml:lang"), datatype=URIRef(datatype) if datatype else None)
+
+
+def normalize(term: Node) -> Node:
+    """xsd:string literals compare equal to plain literals (RDF 1.1)."""
+    if isinstance(term, Literal) and term.datatype == XSD.string:
+        return Literal(str(term))
+    return term
+
+
+def triple_key(s: Node, p: Node, o: Node) -> TripleKey:
+    return s, p, normalize(o)
+
+
+def parse_statements(statements: Sequence[str]) -> Dict[TripleKey, str]:
+    """Builder statements keyed by their parsed triple."""
+    parsed = {}
+    for statement in statements:
+        graph = Graph()
+        graph.parse(data=statement, format="nt")
+        for s, p, o in graph:
+            parsed[triple_key(s, p, o)] = statement
+    return parsed
+
+
+def bound_triples(response: dict) -> Dict[TripleKey, str]:
+    """?s ?p ?o rows of a SPARQL JSON response, keyed by triple, with their N-Triples form."""
+    triples = {}
+    for row in (response or {}).get("results", {}).get("bindings", []):
+        s, p, o = (term_from_binding(row[var]) for var in ("s", "p", "o"))
+        triples[triple_key(s, p, o)] = f"{s.n3()} {p.n3()} {o.n3()} ."
+    return triples
+
+
+def in_scope(key: TripleKey, patterns: Sequence[Pattern]) -> bool:
+    for pattern in patterns:
+        if all(term.startswith("?") or URIRef(term.strip("<>")) == value for term, value in zip(pattern, key)):
+            return True
+    return False
+
+
+def delta_update(removed: Sequence[str], added: Sequence[str]) -> Optional[str]:
+    """One request applying the delta (None if there is nothing to change)."""
+    graph = settings.DEFAULT_GRAPH_URL
+    operations = []
+    if removed:
+        operations.append("DELETE DATA {\n\tGRAPH <%s> {\n\t\t%s\n\t}\n}" % (graph, "\n\t\t".join(removed)))
+    if added:
+        operations.append("INSERT DATA {\n\tGRAPH <%s> {\n\t\t%s\n\t}\n}" % (graph, "\n\t\t".join(added)))
+    return " ;\n".join(operations) or None
+
+
+async def diff_update(client: SparqlClient, delete_queries: Sequence[str], insert_query: str) -> Dict[str, int]:
+    """
+    Update an entity by applying only the difference between its current
+    triples and the ones `insert_query` would write.
+
+    Returns the number of triples 'added', 'removed' and 'unchanged'.
+    """
+    patterns = scope_patterns(delete_queries)
+    current = bound_triples(await client.query(scope_query(patterns)))
+    new = parse_statements(insert_data_triples(insert_query))
+
+    removed = [statement for key, statement in current.items() if key not in new]
+    candidates = {key: statement for key, statement in new.items() if key not in current}
+    # Shared nodes (places, dates...) outside the scope may already be there
+    outside = [statement for key, statement in candidates.items() if not in_scope(key, patterns)]
+    if outside:
+        existing = bound_triples(await client.query(existing_query(outside)))
+        candidates = {key: statement for key, statement in candidates.items() if key not in existing}
+    added = list(candidates.values())
+
+    update = delta_update(removed, added)
+    if update is not None:
+        await client.update(update)
+    return {"added": len(added), "removed": len(removed), "unchanged": len(new) - len(added)}
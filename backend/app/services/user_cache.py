@@ -0,0 +1,78 @@
+"""
+Short-lived cache of authenticated users (user id -> account fields).
+
+The auth dependencies need the role and status of the user behind a token on
+every request; they are kept for AUTH_USER_CACHE_TTL seconds so most requests
+skip the users query. Updates and deletes of a User through the ORM (role or
+status changes by an admin...) drop its entry right away in this process;
+other workers pick the change up when the TTL runs out.
+
+Every hit returns a fresh transient User, so callers never share an instance.
+The password hash is not cached.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.user import User
+
+CACHED_FIELDS = [column.key for column in User.__table__.columns if column.key != "hashed_password"]
+
+
+class UserCache:
+    """Bounded LRU of user fields with a TTL."""
+
+    def __init__(self, ttl: Optional[int] = None, max_entries: Optional[int] = None):
+        self.ttl = settings.AUTH_USER_CACHE_TTL if ttl is None else ttl
+        self.max_entries = settings.AUTH_USER_CACHE_SIZE if max_entries is None else max_entries
+        self._entries: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_id: int) -> Optional[User]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires, fields = entry
+        if time.monotonic() > expires:
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return User(**fields)
+
+    def set(self, user: User) -> None:
+        self._entries[user.id] = (time.monotonic() + self.ttl, {key: getattr(user, key) for key in CACHED_FIELDS})
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _drop_changed_user(mapper, connection, target: User) -> None:
+    user_cache.invalidate(target.id)
+
+
+async def load_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    """The user with this id, from the cache or the database (None if it does not exist)."""
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await db.get(User, user_id)
+        if user is not None:
+            user_cache.set(user)
+    return user
@@ -0,0 +1,253 @@
+"""
+Durable queue of graph writes (opt-in asynchronous write mode).
+
+Create/update endpoints called with `async_write=true` store their SPARQL
+Update operations as a job in a local SQLite journal and return its id right
+away. A background worker takes the queued jobs in order, coalesces their
+operations into as few SPARQL Update requests as possible (operations
+separated by ";", bounded by WRITE_QUEUE_MAX_BYTES) and records each job's
+outcome, which /jobs/{id} reports. If a coalesced request fails, its jobs are
+retried one by one so only the faulty ones are marked as failed.
+
+Update jobs (kind "update_*") hold `[*delete_queries, insert_query]` and are
+applied on their own with `diff_update`, like the synchronous endpoints: only
+the changed triples are written and the job result reports them.
+
+Jobs survive restarts: jobs still queued, or interrupted while running, are
+applied when the worker starts again.
+"""
+
+import asyncio
+import os
+import sqlite3
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+from app.core.config import settings
+from app.services.invalidation import invalidate_write
+from app.services.name_index import name_indexes
+from app.services.sparql_client import SparqlClient
+from app.services.triple_diff import diff_update
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+def is_diff_job(job: Dict[str, Any]) -> bool:
+    """Update jobs are applied as a diff against the entity's current triples."""
+    return job["kind"].startswith("update_")
+
+
+class WriteQueue:
+    """SQLite journal of write jobs plus the worker applying them."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        linger: Optional[float] = None,
+    ):
+        self.path = settings.WRITE_QUEUE_PATH if path is None else path
+        self.batch_size = settings.WRITE_QUEUE_BATCH_SIZE if batch_size is None else batch_size
+        self.max_bytes = settings.WRITE_QUEUE_MAX_BYTES if max_bytes is None else max_bytes
+        self.linger = settings.WRITE_QUEUE_LINGER_SECONDS if linger is None else linger
+        self._conn: Optional[sqlite3.Connection] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Only used from the event loop thread
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT NOT NULL UNIQUE,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    queries BLOB NOT NULL,
+                    uris BLOB NOT NULL,
+                    result BLOB,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    finished_at REAL,
+                    user_id INTEGER
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, seq)")
+            # Journals created before jobs recorded who submitted them
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "user_id" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN user_id INTEGER")
+        return self._conn
+
+    def enqueue(
+        self,
+        kind: str,
+        queries: List[str],
+        uris: List[str],
+        result: Optional[Dict[str, Any]] = None,
+        user_id: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Queue the update `queries` of one write (applied in order).
+
+        `uris` are the entities whose cached documents are dropped once the
+        job is applied; `result` is what the synchronous endpoint would have
+        returned. For "update_*" kinds, `queries` are the delete queries
+        followed by the insert query (see `diff_update`). `user_id` is the
+        submitting user, the only one (with admins) allowed to read the job.
+        Returns the job as reported by `get()`.
+        """
+        id = uuid.uuid4().hex
+        self.conn.execute(
+            "INSERT INTO jobs (id, kind, status, queries, uris, result, created_at, user_id)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (id, kind, QUEUED, orjson.dumps(queries), orjson.dumps(uris), orjson.dumps(result), time.time(), user_id),
+        )
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return self.get(id)
+
+    def get(self, id: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT id, kind, status, result, error, created_at, finished_at, user_id FROM jobs WHERE id = ?", (id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(("id", "kind", "status", "result", "error", "created_at", "finished_at", "user_id"), row))
+        job["result"] = orjson.loads(job["result"]) if job["result"] else None
+        if job["status"] == QUEUED:
+            job["position"] = self.conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND seq <= (SELECT seq FROM jobs WHERE id = ?)",
+                (QUEUED, id),
+            ).fetchone()[0]
+        return job
+
+    def pending(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)).fetchone()[0]
+
+    def _claim(self) -> List[Dict[str, Any]]:
+        rows = self.conn.execute(
+            "SELECT id, kind, queries, uris, result FROM jobs WHERE status = ? ORDER BY seq LIMIT ?",
+            (QUEUED, self.batch_size),
+        ).fetchall()
+        self.conn.executemany("UPDATE jobs SET status = ? WHERE id = ?", [(RUNNING, row[0]) for row in rows])
+        return [
+            {
+                "id": id,
+                "kind": kind,
+                "queries": orjson.loads(queries),
+                "uris": orjson.loads(uris),
+                "result": orjson.loads(result) if result else None,
+            }
+            for id, kind, queries, uris, result in rows
+        ]
+
+    def _finish(self, jobs: List[Dict[str, Any]], status: str, error: Optional[str] = None) -> None:
+        now = time.time()
+        self.conn.executemany(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ?, result = ? WHERE id = ?",
+            [(status, error, now, orjson.dumps(job["result"]), job["id"]) for job in jobs],
+        )
+        if status == DONE:
+            invalidate_write(
+                [query for job in jobs for query in job["queries"]],
+                [uri for job in jobs for uri in job["uris"]],
+            )
+            for job in jobs:
+                if job["kind"].startswith("create_") and job["result"]:
+                    name_indexes.add(job["kind"][len("create_"):], job["result"]["uri"], job["result"].get("label"))
+
+    def _requests(self, jobs: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Group consecutive jobs into requests of at most `max_bytes` (a job is
+        never split). Update jobs always form a group of their own.
+        """
+        groups: List[List[Dict[str, Any]]] = []
+        size = 0
+        for job in jobs:
+            length = sum(len(query.encode("utf-8")) + 3 for query in job["queries"])
+            joinable = groups and not is_diff_job(job) and not is_diff_job(groups[-1][-1])
+            if joinable and size + length <= self.max_bytes:
+                groups[-1].append(job)
+                size += length
+            else:
+                groups.append([job])
+                size = length
+        return groups
+
+    async def apply_batch(self, client: SparqlClient) -> int:
+        """Apply the next batch of queued jobs; returns how many jobs were taken."""
+        jobs = self._claim()
+        for group in self._requests(jobs):
+            if len(group) > 1:
+                try:
+                    await client.update(" ;\n".join(query for job in group for query in job["queries"]))
+                    self._finish(group, DONE)
+                    continue
+                except Exception:
+                    pass
+            # A single job, or finding the failing ones: apply one job at a time
+            for job in group:
+                try:
+                    await self._apply(client, job)
+                    self._finish([job], DONE)
+                except Exception as e:
+                    self._finish([job], FAILED, str(e))
+        return len(jobs)
+
+    async def _apply(self, client: SparqlClient, job: Dict[str, Any]) -> None:
+        if is_diff_job(job):
+            *delete_queries, insert_query = job["queries"]
+            report = await diff_update(client, delete_queries, insert_query)
+            job["result"] = {**(job["result"] or {}), **report}
+        else:
+            await client.update(" ;\n".join(job["queries"]))
+
+    async def _run(self, client: SparqlClient) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await asyncio.sleep(self.linger)
+            try:
+                while await self.apply_batch(client):
+                    pass
+            except Exception as e:
+                print(f"Error applying queued writes: {e}")
+
+    def start(self, client: SparqlClient) -> None:
+        """Start the worker (at startup); jobs left over by a previous run are applied first."""
+        self.conn.execute("UPDATE jobs SET status = ? WHERE status = ?", (QUEUED, RUNNING))
+        self._wakeup = asyncio.Event()
+        if self.pending():
+            self._wakeup.set()
+        self._worker = asyncio.create_task(self._run(client))
+
+    async def stop(self) -> None:
+        """Stop the worker (at shutdown); unapplied jobs stay in the journal."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+write_queue = WriteQueue()
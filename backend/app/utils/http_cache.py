@@ -0,0 +1,104 @@
+"""
+HTTP caching helpers: ETags and conditional responses.
+
+Two kinds of validators are used:
+
+- content ETags (strong), hashed from the response body, for artifacts that
+  are computed anyway (map snapshot, clustered map responses);
+- graph ETags (weak), derived from the graph version and the request
+  signature, which let read endpoints answer 304 before touching Virtuoso.
+"""
+
+import hashlib
+import secrets
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+# Path prefixes (after DEPLOY_PATH) of the GET endpoints that only read the graph
+GRAPH_READ_PREFIXES = (
+    "/all_",
+    "/get_",
+    "/count_",
+    "/faceted_",
+    "/map/",
+    "/filter_options/",
+    "/semantic_search",
+    "/entity/",
+    "/graph/",
+    "/persons/",
+    "/exhibitions/",
+)
+
+# The graph version restarts at 0 with the process; this keeps ETags issued
+# before a restart from matching afterwards
+_BOOT_ID = secrets.token_hex(4)
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match lists `etag` (or is '*')."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def is_graph_read(request: Request) -> bool:
+    """True for GET/HEAD requests to endpoints listed in GRAPH_READ_PREFIXES."""
+    if request.method not in ("GET", "HEAD"):
+        return False
+    return graph_path(request).startswith(GRAPH_READ_PREFIXES)
+
+
+def request_signature(request: Request) -> str:
+    """
+    Digest identifying a read request: the path, the query parameters
+    (order-insensitive) and the Authorization header.
+    """
+    signature = "\n".join([
+        request.url.path,
+        repr(sorted(request.query_params.multi_items())),
+        request.headers.get("authorization", ""),
+    ])
+    return hashlib.sha1(signature.encode("utf-8")).hexdigest()[:16]
+
+
+def graph_path(request: Request) -> str:
+    """Request path without DEPLOY_PATH."""
+    path = request.url.path
+    if settings.DEPLOY_PATH and path.startswith(settings.DEPLOY_PATH):
+        path = path[len(settings.DEPLOY_PATH):]
+    return path
+
+
+def graph_etag(request: Request, version: int) -> str:
+    """Weak ETag for a graph read: same graph version + same request = same data."""
+    return f'W/"{_BOOT_ID}-{version}-{request_signature(request)}"'
+
+
+def cached_json_response(
+    request: Request,
+    content: Any,
+    max_age: int,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Serialize `content` and return it with an ETag and Cache-Control.
+
+    Answers 304 Not Modified when the client already has this exact body.
+    """
+    body = orjson.dumps(content)
+    etag = make_etag(body)
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,71 @@
+import asyncio
+import unittest
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from unittest.mock import AsyncMock
+
+from app.models.domain import Persona
+from app.services.bulk_insert import bulk_create, chunk_triples, insert_data_triples
+from app.services.queries.persons import PersonQueries
+from app.services.sparql_client import SparqlClient
+
+
+class TestBulkInsert(unittest.TestCase):
+    def setUp(self):
+        self.client = AsyncMock(spec=SparqlClient)
+        self.personas = [
+            Persona(name="Ana Pérez", country="Spain", birth_date="1900"),
+            Persona(name="Bea López", country="Spain", birth_date="1900"),
+            Persona(name="Ana Pérez", country="Spain"),
+        ]
+
+    def test_builder_triples(self):
+        query, uri = PersonQueries.add_persona(Persona(name='Say "hi"\nagain', country="Spain"))
+        triples = insert_data_triples(query)
+        self.assertTrue(all(triple.endswith(".") for triple in triples))
+        self.assertTrue(any(triple.startswith(f"<{uri}>") for triple in triples))
+        self.assertEqual(len(triples), query.count(" .\n"))
+
+    def test_shared_nodes_and_duplicates(self):
+        single = sum(len(insert_data_triples(PersonQueries.add_persona(p)[0])) for p in [
+            Persona(name="Ana Pérez", country="Spain", birth_date="1900"),
+            Persona(name="Bea López", country="Spain", birth_date="1900"),
+        ])
+        result = asyncio.run(bulk_create(self.client, self.personas, PersonQueries.add_persona, lambda p: p.name))
+
+        self.assertEqual([item["status"] for item in result["data"]], ["created", "created", "duplicate"])
+        self.assertEqual(result["data"][2]["uri"], result["data"][0]["uri"])
+        # The country and date nodes are sent once for both persons
+        self.assertLess(result["triples"], single)
+        self.assertEqual(result["chunks"], 1)
+        self.client.update.assert_awaited_once()
+
+    def test_chunk_failures_are_reported_per_item(self):
+        calls = []
+
+        async def update(query):
+            calls.append(query)
+            if len(calls) == 2:
+                raise RuntimeError("Virtuoso error")
+            return {}
+
+        self.client.update.side_effect = update
+        result = asyncio.run(bulk_create(
+            self.client, self.personas[:2], PersonQueries.add_persona, lambda p: p.name, max_bytes=400
+        ))
+        self.assertGreater(result["chunks"], 2)
+        self.assertEqual(len(calls), result["chunks"])
+        self.assertEqual(result["failed_chunks"], 1)
+        self.assertGreaterEqual(result["failed"], 1)
+        self.assertTrue(all(len(q.encode()) < 400 + 200 for q in calls))
+
+    def test_chunking(self):
+        chunks = chunk_triples(["a" * 10] * 5, max_bytes=30)
+        self.assertEqual(chunks, [[0, 1], [2, 3], [4]])
+        self.assertEqual(chunk_triples(["a" * 100], max_bytes=30), [[0]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from app.services.co_participation import CoParticipation
+
+ONTO = "https://w3id.org/OntoExhibit#"
+ANA, BEA, CAR = (ONTO + "human_actant/" + name for name in ("ana", "bea", "car"))
+MUSEUM = ONTO + "institution/museum"
+
+PAIRS = [
+    (ANA, "expo1"), (BEA, "expo1"), (CAR, "expo1"), (MUSEUM, "expo1"),
+    (ANA, "expo2"), (BEA, "expo2"),
+    (ANA, "expo3"), (MUSEUM, "expo3"), (BEA, "expo3"),
+    (CAR, "expo4"),
+    (ANA, "expo2"),  # duplicate role rows count once
+]
+
+
+class TestCoParticipation(unittest.TestCase):
+    def setUp(self):
+        self.network = CoParticipation(PAIRS)
+
+    def test_matrix(self):
+        self.assertEqual(len(self.network), 4)
+        self.assertEqual(self.network.exhibition_count(ANA), 3)
+        self.assertEqual(self.network.pair_count, 6)
+
+    def test_ranking(self):
+        top = self.network.top_collaborators(ANA, limit=10)
+        self.assertEqual([(c["uri"], c["weight"]) for c in top], [(BEA, 3), (MUSEUM, 2), (CAR, 1)])
+        self.assertEqual(top[0]["jaccard"], 1.0)
+        self.assertEqual(top[2]["jaccard"], round(1 / 4, 4))
+        self.assertEqual(len(self.network.top_collaborators(ANA, limit=1)), 1)
+
+    def test_type_filter(self):
+        top = self.network.top_collaborators(CAR, limit=10, types=["institution"])
+        self.assertEqual([(c["uri"], c["type"]) for c in top], [(MUSEUM, "institution")])
+
+    def test_unknown_and_empty(self):
+        self.assertIsNone(self.network.top_collaborators(ONTO + "human_actant/nobody", limit=5))
+        self.assertEqual(len(CoParticipation([])), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import asyncio
+import unittest
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from unittest.mock import AsyncMock
+
+from app.services.entity_batch import EntityBatchResolver, RDFS_LABEL, entity_type_of, is_valid_uri, ranked_labels
+from app.services.sparql_client import SparqlClient
+
+ONTO = "https://w3id.org/OntoExhibit#"
+
+
+def bindings(rows):
+    return {"results": {"bindings": [
+        {key: {"value": value} for key, value in row.items()} for row in rows
+    ]}}
+
+
+class TestEntityBatch(unittest.TestCase):
+    def setUp(self):
+        self.client = AsyncMock(spec=SparqlClient)
+        self.client.version = 1
+
+        async def query(q):
+            rows = []
+            for n in range(5):
+                uri = f"{ONTO}exhibition/e{n}"
+                if f"<{uri}>" in q:
+                    rows.append({"uri": uri, "p": RDFS_LABEL, "o": f"Expo {n}"})
+            return bindings(rows)
+
+        self.client.query.side_effect = query
+
+    def test_chunks_and_cache(self):
+        resolver = EntityBatchResolver(chunk_size=2, ttl=60, max_entries=100)
+        uris = [f"{ONTO}exhibition/e{n}" for n in range(5)] + [f"{ONTO}person/unknown"]
+
+        resolved, hits = asyncio.run(resolver.resolve(self.client, uris + uris[:2]))
+        self.assertEqual(hits, 0)
+        self.assertEqual(self.client.query.await_count, 3)
+        self.assertEqual(resolved[uris[3]]["label"], "Expo 3")
+        self.assertEqual(resolved[uris[3]]["type"], "exhibition")
+        self.assertIsNone(resolved[uris[5]])
+
+        resolved, hits = asyncio.run(resolver.resolve(self.client, uris))
+        self.assertEqual(hits, 6)
+        self.assertEqual(self.client.query.await_count, 3)
+
+        # A graph change invalidates cached URIs
+        self.client.version = 2
+        asyncio.run(resolver.resolve(self.client, uris[:1]))
+        self.assertEqual(self.client.query.await_count, 4)
+
+    def test_label_ranking_matches_the_dictionary(self):
+        uri = f"{ONTO}exhibition/e9"
+        self.client.query.side_effect = None
+        self.client.query.return_value = bindings([
+            {"uri": uri, "p": RDFS_LABEL, "o": "rdfs label", "rank": "3"},
+            {"uri": uri, "p": RDFS_LABEL, "o": "Title", "rank": "1"},
+        ])
+        resolved, _ = asyncio.run(EntityBatchResolver().resolve(self.client, [uri]))
+        self.assertEqual(resolved[uri]["label"], "Title")
+        self.assertEqual(ranked_labels([{"uri": uri, "label": "B", "rank": "2"}, {"uri": uri, "label": "A", "rank": "2"}]),
+                         {uri: "A"})
+
+    def test_uri_helpers(self):
+        self.assertTrue(is_valid_uri(f"{ONTO}exhibition/e1"))
+        self.assertFalse(is_valid_uri(ONTO + "x> } DROP ALL { <a"))
+        self.assertFalse(is_valid_uri("not a uri"))
+        self.assertEqual(entity_type_of(f"{ONTO}human_actant/abc"), "human_actant")
+        self.assertEqual(entity_type_of("http://example.org/x"), "other")
+
+
+if __name__ == "__main__":
+    unittest.main()
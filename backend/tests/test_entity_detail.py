@@ -0,0 +1,134 @@
+import asyncio
+import unittest
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from unittest.mock import AsyncMock, patch
+
+from app.core.config import settings
+from app.routers.entities import get_entity_full, materialize_documents
+from app.routers.exhibitions import get_exhibition
+from app.services.detail_cache import DetailCache, detail_cache
+from app.services.document_store import DocumentStore
+from app.services.queries.exhibitions import ExhibitionQueries
+from app.services.sparql_client import SparqlClient
+
+
+def bindings(rows):
+    return {"results": {"bindings": [
+        {key: {"value": value} for key, value in row.items()} for row in rows
+    ]}}
+
+
+class TestEntityFull(unittest.TestCase):
+    def setUp(self):
+        self.store = detail_cache.store
+        detail_cache.store = DocumentStore(":memory:")
+        detail_cache.clear()
+        self.client = AsyncMock(spec=SparqlClient)
+
+    def tearDown(self):
+        detail_cache.store.close()
+        detail_cache.store = self.store
+
+    def run_full(self, type, id):
+        return asyncio.run(get_entity_full(type, id, self.client))
+
+    def test_all_sections_and_cache(self):
+        self.client.query.return_value = bindings([{"uri": "http://ex/e1", "label": "Expo"}])
+        result = self.run_full("exposicion", "e1")
+
+        self.assertEqual(set(result["sections"]), {"details", "museographers", "catalogs", "object"})
+        self.assertTrue(result["complete"])
+        self.assertFalse(result["cached"])
+        self.assertEqual(result["sections"]["details"]["data"][0]["label"], "Expo")
+        calls = self.client.query.await_count
+
+        self.assertTrue(self.run_full("exhibition", "e1")["cached"])
+        self.assertEqual(self.client.query.await_count, calls)
+        # The single-section endpoint answers from the stored document
+        stored = asyncio.run(get_exhibition("e1", self.client))
+        self.assertEqual(stored["data"][0]["label"], "Expo")
+        self.assertEqual(self.client.query.await_count, calls)
+
+        detail_cache.invalidate("https://w3id.org/OntoExhibit#exhibition/e1")
+        self.assertFalse(self.run_full("exhibition", "e1")["cached"])
+
+    def test_partial_results(self):
+        details_query = ExhibitionQueries.GET_EXHIBITION_BY_ID % "e2"
+
+        async def query(q):
+            if q == details_query:
+                return bindings([{"uri": "http://ex/e2", "label": "Expo"}])
+            if "company_uri" in q:
+                await asyncio.sleep(5)
+            raise RuntimeError("Virtuoso down")
+
+        self.client.query.side_effect = query
+        with patch.object(settings, "ENTITY_DETAIL_DEADLINE_SECONDS", 0.2):
+            result = self.run_full("exhibition", "e2")
+
+        sections = result["sections"]
+        self.assertEqual(sections["details"]["status"], "ok")
+        self.assertEqual(sections["museographers"]["status"], "timeout")
+        self.assertEqual(sections["catalogs"]["status"], "error")
+        self.assertFalse(result["complete"])
+        self.assertIsNone(detail_cache.get("exhibition", "e2"))
+
+    def test_store_survives_memory_and_rebuilds_on_write(self):
+        self.client.query.return_value = bindings([{"uri": "http://ex/e3", "label": "Expo"}])
+        self.run_full("exhibition", "e3")
+        detail_cache._entries.clear()
+        self.assertEqual(detail_cache.store.count(), {"exhibition": 1})
+        self.assertTrue(self.run_full("exhibition", "e3")["cached"])
+
+        async def write():
+            self.client.query.return_value = bindings([{"uri": "http://ex/e3", "label": "Renamed"}])
+            detail_cache.invalidate("https://w3id.org/OntoExhibit#exhibition/e3")
+            self.assertIsNone(detail_cache.store.get("exhibition", "e3"))
+            # Let the background rebuild run
+            for _ in range(10):
+                await asyncio.sleep(0)
+
+        with patch("app.routers.entities.sparql_client", self.client):
+            asyncio.run(write())
+        rebuilt = detail_cache.store.get("exhibition", "e3")
+        self.assertEqual(rebuilt["sections"]["details"]["data"][0]["label"], "Renamed")
+
+    def test_materialize(self):
+        async def query(q):
+            if "VALUES ?class" in q:
+                return bindings([{"uri": "https://w3id.org/OntoExhibit#catalog/c1"},
+                                 {"uri": "https://w3id.org/OntoExhibit#catalog/c2"}])
+            return bindings([{"uri": "http://ex/c", "label": "Catalog"}])
+
+        self.client.query.side_effect = query
+        stored = asyncio.run(materialize_documents(self.client, ["catalog"]))
+        self.assertEqual(stored, {"catalog": 2})
+        self.assertIsNotNone(detail_cache.store.get("catalog", "c2"))
+
+    def test_materialize_replaces_stored_documents(self):
+        self.client.query.return_value = bindings([{"uri": "http://ex/e4", "label": "Old"}])
+        self.run_full("exhibition", "e4")
+
+        async def query(q):
+            if "VALUES ?class" in q:
+                return bindings([{"uri": "https://w3id.org/OntoExhibit#exhibition/e4"}])
+            return bindings([{"uri": "http://ex/e4", "label": "New"}])
+
+        self.client.query.side_effect = query
+        asyncio.run(materialize_documents(self.client, ["exhibition"]))
+        stored = detail_cache.store.get("exhibition", "e4")
+        self.assertEqual(stored["sections"]["details"]["data"][0]["label"], "New")
+
+    def test_lru_bound(self):
+        cache = DetailCache(ttl=60, max_entries=2)
+        for id in ("a", "b", "c"):
+            cache.set("person", id, {"id": id})
+        self.assertIsNone(cache.get("person", "a"))
+        self.assertEqual(cache.get("person", "c"), {"id": "c"})
+
+
+if __name__ == "__main__":
+    unittest.main()
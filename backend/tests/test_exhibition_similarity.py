@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import numpy as np
+
+from app.services.exhibition_similarity import ExhibitionSimilarity
+
+ROWS = [
+    ("expo1", "actor:ana"), ("expo1", "actor:bea"), ("expo1", "theme:cubism"), ("expo1", "venue:museum"),
+    ("expo2", "actor:ana"), ("expo2", "actor:bea"), ("expo2", "theme:cubism"), ("expo2", "venue:museum"),
+    ("expo3", "actor:ana"), ("expo3", "venue:museum"), ("expo3", "artwork:guernica"),
+    ("expo4", "actor:car"), ("expo4", "venue:museum"),
+    ("expo5", "theme:landscape"),
+]
+
+
+def brute_force(rows):
+    sets = {}
+    for exhibition, feature in rows:
+        sets.setdefault(exhibition, set()).add(feature)
+    return {
+        (a, b): len(sets[a] & sets[b]) / len(sets[a] | sets[b])
+        for a in sets for b in sets if a != b and sets[a] & sets[b]
+    }
+
+
+class TestExhibitionSimilarity(unittest.TestCase):
+    def test_ranking(self):
+        similarity = ExhibitionSimilarity(ROWS, top_k=3)
+        similar = similarity.similar("expo1", 10)
+        self.assertEqual([s["uri"] for s in similar], ["expo2", "expo3", "expo4"])
+        self.assertEqual(similar[0]["score"], 1.0)
+        self.assertEqual(similar[1]["shared"], 2)
+        self.assertEqual(similarity.similar("expo5", 10), [])
+        self.assertEqual(similarity.similar("unknown", 10), [])
+
+    def test_matches_brute_force_in_small_blocks(self):
+        rng = np.random.default_rng(7)
+        rows = [(f"e{e}", f"f{f}") for e in range(60) for f in rng.choice(40, size=rng.integers(1, 8), replace=False)]
+        expected = brute_force(rows)
+        similarity = ExhibitionSimilarity(rows, top_k=60, block_pairs=50)
+        for exhibition in similarity.exhibitions:
+            for s in similarity.similar(exhibition, 60):
+                self.assertAlmostEqual(s["score"], expected[(exhibition, s["uri"])], places=4)
+            self.assertEqual(
+                len(similarity.similar(exhibition, 60)),
+                sum(1 for a, _ in expected if a == exhibition),
+            )
+
+    def test_common_features_are_dropped(self):
+        similarity = ExhibitionSimilarity(ROWS, top_k=3, max_feature_share=0.7, min_feature_cap=1)
+        self.assertEqual(similarity.dropped_features, 1)
+        self.assertNotIn("expo4", [s["uri"] for s in similarity.similar("expo1", 10)])
+
+
+if __name__ == "__main__":
+    unittest.main()
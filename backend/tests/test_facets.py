@@ -0,0 +1,76 @@
+import asyncio
+import unittest
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from unittest.mock import AsyncMock
+from app.routers.pagination import faceted_query
+from app.services.facets import FacetIndex, FacetTable
+from app.services.sparql_client import SparqlClient
+
+
+def bindings(rows):
+    return {"results": {"bindings": [
+        {key: {"value": value} for key, value in row.items()} for row in rows
+    ]}}
+
+
+TABLE_ROWS = [
+    {"uri": "http://ex/1", "facet": "theme", "value": "Cubism"},
+    {"uri": "http://ex/1", "facet": "exhibition_type", "value": "Solo"},
+    {"uri": "http://ex/2", "facet": "theme", "value": "Cubism"},
+    {"uri": "http://ex/2", "facet": "theme", "value": "Surrealism"},
+    {"uri": "http://ex/3", "facet": "exhibition_type", "value": "Group"},
+    {"uri": "http://ex/4"},
+]
+
+
+class TestFacetTable(unittest.TestCase):
+    def test_counts_for_all_rows(self):
+        table = FacetTable(TABLE_ROWS)
+        self.assertEqual(len(table), 4)
+
+        counts = table.counts(table.mask(["http://ex/1", "http://ex/2", "http://ex/3", "http://ex/4"]))
+        self.assertEqual(counts["theme"], {"Cubism": 2, "Surrealism": 1})
+        self.assertEqual(counts["exhibition_type"], {"Group": 1, "Solo": 1})
+
+    def test_counts_for_subset(self):
+        table = FacetTable(TABLE_ROWS)
+        counts = table.counts(table.mask(["http://ex/2", "http://ex/unknown"]))
+        self.assertEqual(counts["theme"], {"Cubism": 1, "Surrealism": 1})
+        self.assertEqual(counts["exhibition_type"], {})
+
+    def test_counts_ordered_by_frequency(self):
+        table = FacetTable(TABLE_ROWS)
+        counts = table.counts(table.mask(["http://ex/1", "http://ex/2"]))
+        self.assertEqual(list(counts["theme"]), ["Cubism", "Surrealism"])
+
+
+class TestFacetedQuery(unittest.TestCase):
+    def test_page_and_facets(self):
+        asyncio.run(self._async_test_page_and_facets())
+
+    async def _async_test_page_and_facets(self):
+        mock_client = AsyncMock(spec=SparqlClient)
+        ids = [{"uri": f"http://ex/{i}", "inner_label": f"Exhibition {i}"} for i in (1, 2, 3)]
+        details = [{"uri": "http://ex/1", "label": "Detail 1"}, {"uri": "http://ex/2", "label": "Detail 2"}]
+        mock_client.query.side_effect = [bindings(TABLE_ROWS), bindings(ids), bindings(details)]
+
+        result = await faceted_query(
+            client=mock_client,
+            facet_index=FacetIndex("FACETS"),
+            get_ids_query="IDS",
+            get_details_func=lambda uris: "DETAILS",
+            page_size=2,
+            label_field="inner_label",
+        )
+
+        self.assertEqual(result["total"], 3)
+        self.assertEqual([item["label"] for item in result["data"]], ["Detail 1", "Detail 2"])
+        self.assertIsNotNone(result["next_cursor"])
+        self.assertEqual(result["facets"]["theme"], {"Cubism": 2, "Surrealism": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
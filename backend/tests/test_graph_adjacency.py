@@ -0,0 +1,101 @@
+import asyncio
+import unittest
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from types import SimpleNamespace
+
+from app.services.graph_adjacency import AdjacencyGraph
+from app.services.graph_index import GraphIndex, _background_tasks
+
+ONTO = "https://w3id.org/OntoExhibit#"
+
+TRIPLES = [
+    ("role1", ONTO + "isRoleOf", "person1"),
+    ("role1", ONTO + "isCuratorInvolvedIn", "expo1"),
+    ("role2", ONTO + "isRoleOf", "person2"),
+    ("role2", ONTO + "isCuratorInvolvedIn", "expo1"),
+    ("expo1", ONTO + "hasVenue", "museum"),
+    ("inst2", ONTO + "hasParentOrganization", "museum"),
+]
+
+
+def ids(result):
+    return sorted(node["id"] for node in result["nodes"])
+
+
+class TestAdjacencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = AdjacencyGraph(TRIPLES)
+
+    def test_csr_layout(self):
+        self.assertEqual(len(self.graph), 7)
+        self.assertEqual(self.graph.edge_count, 6)
+        self.assertEqual(self.graph.degree(self.graph.node_of["expo1"]), 3)
+
+    def test_depth(self):
+        one = self.graph.neighbourhood("person1", depth=1, limit=100, fanout=10)
+        self.assertEqual(ids(one), ["person1", "role1"])
+        self.assertEqual(one["edges"], [{"source": "role1", "target": "person1", "type": "isRoleOf"}])
+
+        three = self.graph.neighbourhood("person1", depth=3, limit=100, fanout=10)
+        self.assertEqual(ids(three), ["expo1", "museum", "person1", "role1", "role2"])
+        self.assertEqual({n["id"]: n["depth"] for n in three["nodes"]}["museum"], 3)
+        self.assertFalse(three["truncated"])
+
+    def test_edge_type_filter(self):
+        result = self.graph.neighbourhood("expo1", depth=2, limit=100, fanout=10,
+                                          predicates=["hasVenue", "hasParentOrganization"])
+        self.assertEqual(ids(result), ["expo1", "inst2", "museum"])
+
+    def test_limits(self):
+        result = self.graph.neighbourhood("expo1", depth=1, limit=100, fanout=1)
+        self.assertEqual(len(result["nodes"]), 2)
+        self.assertTrue(result["truncated"])
+        result = self.graph.neighbourhood("expo1", depth=2, limit=3, fanout=10)
+        self.assertEqual(len(result["nodes"]), 3)
+        self.assertTrue(all(e["source"] in ids(result) and e["target"] in ids(result) for e in result["edges"]))
+
+    def test_unknown(self):
+        self.assertIsNone(self.graph.neighbourhood("nope", depth=1, limit=10, fanout=10))
+
+
+
+class CountingIndex(GraphIndex[int]):
+    def __init__(self):
+        super().__init__(ttl=0, refresh_delay=0.01)
+        self.builds = 0
+
+    async def build(self, client):
+        self.builds += 1
+        return self.builds
+
+
+class TestGraphIndexRefresh(unittest.TestCase):
+    def test_writes_share_one_background_rebuild(self):
+        async def run():
+            index, client = CountingIndex(), SimpleNamespace(version=1)
+            self.assertEqual(await index.get(client), 1)
+            # Writes bump the version: the old value keeps being served meanwhile
+            for version in (2, 3, 4):
+                client.version = version
+                self.assertEqual(await index.get(client), 1)
+            await asyncio.sleep(0.05)
+            self.assertEqual(await index.get(client), 2)
+            self.assertEqual(index.builds, 2)
+
+        asyncio.run(run())
+
+    def test_background_tasks_are_referenced_until_done(self):
+        async def run():
+            task = CountingIndex().warm(SimpleNamespace(version=1))
+            self.assertIn(task, _background_tasks)
+            await task
+            self.assertNotIn(task, _background_tasks)
+
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import time
+import unittest
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_sparql_client
+from app.main import app
+from app.services.map_index import MapPoints, map_index
+from app.services.response_cache import response_cache
+from app.services.sparql_client import SparqlClient, sparql_client
+
+POINT = {"id": "e1", "uri": "https://w3id.org/OntoExhibit#exhibition/e1", "type": "exhibition",
+         "label": "Old", "lat": 40.0, "long": -3.0, "date_start": None, "date_end": None}
+
+
+class TestGraphETags(unittest.TestCase):
+    def setUp(self):
+        self.client = AsyncMock(spec=SparqlClient)
+        self.client.query.return_value = {"results": {"bindings": [{"value": {"value": "Painting"}}]}}
+        app.dependency_overrides[get_sparql_client] = lambda: self.client
+        response_cache.clear()
+        self.http = TestClient(app)
+
+    def tearDown(self):
+        app.dependency_overrides.clear()
+
+    def test_not_modified_without_query(self):
+        first = self.http.get("/filter_options/topic")
+        etag = first.headers["etag"]
+        self.assertEqual(first.json(), {"data": ["Painting"]})
+
+        second = self.http.get("/filter_options/topic", headers={"If-None-Match": etag})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.headers["etag"], etag)
+        self.assertEqual(self.client.query.await_count, 1)
+
+    def test_cached_until_a_dependency_changes(self):
+        etag = self.http.get("/filter_options/topic").headers["etag"]
+        self.client.query.return_value = {"results": {"bindings": [{"value": {"value": "Sculpture"}}]}}
+        self.assertNotEqual(self.http.get("/filter_options/gender").headers["etag"], etag)
+
+        # A write elsewhere in the graph leaves the cached response valid
+        sparql_client.bump_version()
+        response_cache.invalidate({"https://w3id.org/OntoExhibit#exhibition/other"})
+        response = self.http.get("/filter_options/topic", headers={"If-None-Match": etag})
+        self.assertEqual((response.status_code, response.headers["x-cache"]), (304, "HIT"))
+
+        # Creating entities changes every list
+        response_cache.invalidate({"collection:*"})
+        response = self.http.get("/filter_options/topic", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"data": ["Sculpture"]})
+        self.assertNotEqual(response.headers["etag"], etag)
+
+    def test_full_map_from_index(self):
+        map_index._value, map_index._version, map_index._built_at = MapPoints([POINT]), 1, time.monotonic()
+        self.addCleanup(map_index.invalidate)
+        self.client.version = 1
+        first = self.http.get("/map/all")
+        self.assertEqual(first.json(), {"data": [POINT], "count": 1})
+
+        second = self.http.get("/map/all", headers={"If-None-Match": first.headers["etag"]})
+        self.assertEqual(second.status_code, 304)
+        self.client.query.assert_not_awaited()
+
+    def test_stale_index_answers_are_not_cached(self):
+        map_index._value, map_index._version = MapPoints([POINT]), 0
+        self.addCleanup(map_index.invalidate)
+        self.client.version = 1
+        with patch.object(map_index, "_schedule_refresh") as refresh:
+            response = self.http.get("/map/bbox", params={"bbox": "-10,30,10,50"})
+        refresh.assert_called_once()
+        self.assertEqual(response.json()["count"], 1)
+        self.assertEqual(response.headers["cache-control"], "no-store")
+        self.assertNotIn("etag", response.headers)
+        self.assertEqual(len(response_cache), 0)
+
+    def test_other_endpoints_untouched(self):
+        self.assertNotIn("etag", self.http.get("/").headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+sys.path.append(os.getcwd())
+
+from unittest.mock import AsyncMock
+
+from app.services.label_dictionary import LabelDictionary, LabelIndex
+from app.services.queries.misc import MiscQueries
+from app.services.sparql_client import SparqlClient
+
+
+def bindings(rows):
+    return {"results": {"bindings": [
+        {key: {"value": value} for key, value in row.items()} for row in rows
+    ]}}
+
+
+class TestLabelDictionary(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "labels.bin")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_write_and_lookup(self):
+        labels = {f"http://ex/{n}": f"Label {n} ñ" for n in range(1000)}
+        LabelDictionary.write(self.path, labels)
+        dictionary = LabelDictionary(self.path)
+
+        self.assertEqual(len(dictionary), 1000)
+        self.assertEqual(dictionary.get("http://ex/42"), "Label 42 ñ")
+        self.assertIsNone(dictionary.get("http://ex/unknown"))
+        found = dictionary.lookup(["http://ex/1", "http://ex/999", "http://ex/x"])
+        self.assertEqual(found, {"http://ex/1": "Label 1 ñ", "http://ex/999": "Label 999 ñ"})
+
+    def test_empty(self):
+        LabelDictionary.write(self.path, {})
+        self.assertEqual(LabelDictionary(self.path).lookup(["http://ex/1"]), {})
+
+    def test_index_applies_label_precedence(self):
+        client = AsyncMock(spec=SparqlClient)
+        client.version = 1
+        client.query.return_value = bindings([
+            {"uri": "http://ex/e1", "label": "rdfs label", "rank": "3"},
+            {"uri": "http://ex/e1", "label": "Title", "rank": "1"},
+            {"uri": "http://ex/p1", "label": "Name", "rank": "2"},
+        ])
+        index = LabelIndex(self.path)
+        dictionary = asyncio.run(index.get(client))
+        client.query.assert_awaited_once_with(MiscQueries.ALL_LABELS)
+        self.assertEqual(dictionary.lookup(["http://ex/e1", "http://ex/p1"]),
+                         {"http://ex/e1": "Title", "http://ex/p1": "Name"})
+
+        # Another process (or a restart) reuses the fresh file instead of querying
+        other = LabelIndex(self.path)
+        self.assertEqual(asyncio.run(other.get(client)).get("http://ex/p1"), "Name")
+        self.assertEqual(client.query.await_count, 1)
+
+        # A write makes it stale
+        self.assertFalse(index.is_stale(client.version))
+        self.assertTrue(index.is_stale(client.version + 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,236 @@
+import unittest
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from app.core.config import settings
+from app.services.map_index import JITTER_DEGREES, MapPoints, grid_cells, parse_bbox, process_entities
+from app.services.interval_index import IntervalIndex, parse_year
+from app.services.map_snapshot import MapSnapshot
+from app.services.spatial_index import KDTree
+
+
+def point(uri, etype, lat, long):
+    return {"id": uri, "uri": uri, "type": etype, "label": uri, "lat": lat, "long": long,
+            "date_start": None, "date_end": None}
+
+
+# Two groups far apart (Madrid, Paris) and one lone point (New York)
+ITEMS = [
+    point("m1", "exhibition", 40.4168, -3.7038),
+    point("m2", "exhibition", 40.4170, -3.7040),
+    point("m3", "person", 40.4165, -3.7035),
+    point("p1", "institution", 48.8566, 2.3522),
+    point("p2", "institution", 48.8570, 2.3525),
+    point("ny", "artwork", 40.7128, -74.0060),
+]
+
+
+class TestMapClustering(unittest.TestCase):
+    def test_low_zoom_clusters(self):
+        points = MapPoints(ITEMS)
+        clusters, singles = points.hierarchy(["exhibition", "institution", "person", "artwork"]).clusters(2)
+
+        counts = sorted(c["count"] for c in clusters)
+        self.assertEqual(counts, [2, 3])
+        madrid = next(c for c in clusters if c["count"] == 3)
+        self.assertEqual(madrid["types"], {"exhibition": 2, "person": 1})
+        self.assertAlmostEqual(madrid["lat"], 40.4168, places=3)
+        self.assertEqual([s["uri"] for s in singles], ["ny"])
+
+    def test_type_combination(self):
+        points = MapPoints(ITEMS)
+        clusters, singles = points.hierarchy(["exhibition"]).clusters(2)
+        self.assertEqual([c["count"] for c in clusters], [2])
+        self.assertEqual(singles, [])
+
+    def test_bbox_filter(self):
+        points = MapPoints(ITEMS)
+        europe = parse_bbox("-10,35,10,55")
+        clusters, singles = points.hierarchy(["exhibition", "institution", "person", "artwork"]).clusters(2, europe)
+        self.assertEqual(sum(c["count"] for c in clusters), 5)
+        self.assertEqual(singles, [])
+
+    def test_high_zoom_returns_points(self):
+        points = MapPoints(ITEMS)
+        clusters, singles = points.hierarchy(["institution"]).clusters(settings.MAP_CLUSTER_MAX_ZOOM + 1)
+        self.assertEqual(clusters, [])
+        self.assertEqual(sorted(s["uri"] for s in singles), ["p1", "p2"])
+
+    def test_leaves(self):
+        points = MapPoints(ITEMS)
+        hierarchy = points.hierarchy(["exhibition", "institution", "person", "artwork"])
+        clusters, _ = hierarchy.clusters(2)
+        madrid = next(c for c in clusters if c["count"] == 3)
+        leaves = hierarchy.leaves(madrid["id"], limit=10)
+        self.assertEqual(sorted(leaf["uri"] for leaf in leaves), ["m1", "m2", "m3"])
+
+    def test_invalid_bbox(self):
+        with self.assertRaises(ValueError):
+            parse_bbox("1,2,3")
+
+
+class TestSpatialIndex(unittest.TestCase):
+    def test_range_matches_brute_force(self):
+        import numpy as np
+        rng = np.random.default_rng(0)
+        x, y = rng.uniform(-180, 180, 5000), rng.uniform(-90, 90, 5000)
+        tree = KDTree(x, y, node_size=16)
+
+        found = np.sort(tree.range(-20, 10, 30, 45))
+        expected = np.flatnonzero((x >= -20) & (x <= 30) & (y >= 10) & (y <= 45))
+        np.testing.assert_array_equal(found, expected)
+
+    def test_bbox_across_antimeridian(self):
+        points = MapPoints(ITEMS + [point("fj", "exhibition", -17.7, 178.0), point("ws", "exhibition", -13.8, -172.1)])
+        found = points.in_bbox(parse_bbox("170,-30,-170,0"), ["exhibition"], limit=10)
+        self.assertEqual(sorted(p["uri"] for p in found), ["fj", "ws"])
+
+    def test_nearby_sorted_by_distance(self):
+        points = MapPoints(ITEMS)
+        found = points.nearby(40.4168, -3.7038, 5, ["exhibition", "institution", "person", "artwork"], limit=10)
+        self.assertEqual([p["uri"] for p in found][0], "m1")
+        self.assertEqual(sorted(p["uri"] for p in found), ["m1", "m2", "m3"])
+        self.assertTrue(all(a["distance_km"] <= b["distance_km"] for a, b in zip(found, found[1:])))
+
+    def test_nearby_filters_types(self):
+        points = MapPoints(ITEMS)
+        found = points.nearby(48.8566, 2.3522, 1100, ["exhibition"], limit=10)
+        self.assertEqual(sorted(p["uri"] for p in found), ["m1", "m2"])
+
+
+class TestProcessEntities(unittest.TestCase):
+    ROWS = [
+        {"uri": "http://ex.org/p/1", "label": "A", "lat": "40.0", "long": "-3.0", "loc_type": "birth"},
+        {"uri": "http://ex.org/p/1", "label": "A", "lat": "40.0", "long": "-3.0", "loc_type": "residence"},
+        {"uri": "http://ex.org/p/2", "label": "B", "lat": "bad", "long": "-3.0"},
+        {"uri": "http://ex.org/p/3", "label": "C", "lat": None, "long": "-3.0"},
+    ]
+
+    def test_jitter_is_deterministic_and_bounded(self):
+        first = process_entities(self.ROWS, "person")
+        second = process_entities(list(reversed(self.ROWS)), "person")
+        self.assertEqual([p["id"] for p in first], ["1_birth", "1_residence"])
+        self.assertEqual(sorted(first, key=lambda p: p["id"]), sorted(second, key=lambda p: p["id"]))
+        for p in first:
+            self.assertLessEqual(abs(p["lat"] - 40.0), JITTER_DEGREES)
+            self.assertLessEqual(abs(p["long"] + 3.0), JITTER_DEGREES)
+        # Points sharing a location are still pulled apart
+        self.assertNotEqual((first[0]["lat"], first[0]["long"]), (first[1]["lat"], first[1]["long"]))
+
+    def test_empty(self):
+        self.assertEqual(process_entities([], "person"), [])
+
+
+class TestIntervalIndex(unittest.TestCase):
+    def test_parse_year(self):
+        self.assertEqual(parse_year("1901-05-03"), 1901)
+        self.assertEqual(parse_year("1901-05-03T10:00:00Z"), 1901)
+        self.assertEqual(parse_year(" 1901 "), 1901)
+        self.assertIsNone(parse_year("1901/1902"))
+        self.assertIsNone(parse_year("19th century"))
+        self.assertIsNone(parse_year("1901-13-45"))
+        self.assertIsNone(parse_year("s. XIX"))
+        self.assertIsNone(parse_year(None))
+
+    def test_overlap_matches_brute_force(self):
+        import numpy as np
+        rng = np.random.default_rng(1)
+        starts = [int(y) for y in rng.integers(1800, 2000, 500)]
+        ends = [s + int(d) for s, d in zip(starts, rng.integers(0, 30, 500))]
+        index = IntervalIndex(starts, ends)
+        for lo, hi in [(1850, 1860), (1700, 1799), (1999, 2100), (1900, 1900)]:
+            expected = [s <= hi and e >= lo for s, e in zip(starts, ends)]
+            self.assertEqual(list(index.mask(lo, hi)), expected)
+
+    def test_missing_bounds(self):
+        index = IntervalIndex([1900, None, None, 1950], [None, 1920, None, 1960])
+        self.assertEqual(list(index.mask(1910, 1930)), [False, True, True, False])
+        self.assertEqual(list(index.mask(to_year=1905)), [True, False, True, False])
+        self.assertEqual(list(index.mask(from_year=1955)), [False, False, True, True])
+
+    def test_map_year_window(self):
+        items = [dict(item) for item in ITEMS]
+        items[0].update(date_start="1920-01-01", date_end="1921")
+        items[1].update(date_start="1980")
+        points = MapPoints(items)
+        selected = [items[i]["uri"] for i in points.point_ids(["exhibition", "person"], 1900, 1950)]
+        self.assertEqual(selected, ["m1", "m3"])
+        clusters, singles = points.hierarchy(["exhibition", "person"], 1900, 1950).clusters(2)
+        self.assertEqual(clusters[0]["count"], 2)
+
+
+class TestMapSnapshot(unittest.TestCase):
+    def decode(self, column):
+        import base64
+        import numpy as np
+        codes = np.frombuffer(base64.b64decode(column["codes"]), dtype=column["dtype"])
+        return [column["table"][c - 1] if c else None for c in codes]
+
+    def test_round_trip(self):
+        import base64
+        import gzip
+        import numpy as np
+        import orjson
+        items = ITEMS + [dict(point("http://ex.org/p/7", "person", 10.5, 20.25), id="7_birth", date_start="1901")]
+        points = MapPoints(items)
+        snapshot = points.snapshot()
+        doc = orjson.loads(gzip.decompress(snapshot.gzipped))
+
+        self.assertEqual(doc["count"], len(items))
+        lat = np.frombuffer(base64.b64decode(doc["lat"]), dtype="<f4")
+        np.testing.assert_allclose(lat, [item["lat"] for item in items], atol=1e-5)
+        self.assertEqual(self.decode(doc["type"]), [item["type"] for item in items])
+        uris = [(ns or "") + local for ns, local in zip(self.decode(doc["uri_namespace"]), doc["uri_local"])]
+        self.assertEqual(uris, [item["uri"] for item in items])
+        self.assertEqual(self.decode(doc["id_suffix"])[-1], "_birth")
+        self.assertEqual(self.decode(doc["date_start"])[-1], "1901")
+        self.assertIs(points.snapshot(), snapshot)
+
+    def test_etag_follows_content(self):
+        self.assertEqual(MapSnapshot(ITEMS, MapPoints(ITEMS).lat, MapPoints(ITEMS).long).etag,
+                         MapPoints(ITEMS).snapshot().etag)
+        self.assertNotEqual(MapPoints(ITEMS).snapshot().etag, MapPoints(ITEMS[:-1]).snapshot().etag)
+
+
+class TestMapStream(unittest.TestCase):
+    def test_error_isolated_per_type(self):
+        import orjson
+        from unittest.mock import AsyncMock
+        from fastapi.testclient import TestClient
+        from app.dependencies import get_sparql_client
+        from app.main import app
+        from app.services.queries.map import MapQueries
+        from app.services.sparql_client import SparqlClient
+
+        async def query(q):
+            if q == MapQueries.GET_PERSONS:
+                raise RuntimeError("timeout")
+            return {"results": {"bindings": [
+                {"uri": {"value": "http://ex/1"}, "label": {"value": "A"}, "lat": {"value": "1"}, "long": {"value": "2"}}
+            ]}}
+
+        client = AsyncMock(spec=SparqlClient)
+        client.query.side_effect = query
+        app.dependency_overrides[get_sparql_client] = lambda: client
+        try:
+            response = TestClient(app).get("/map/stream?types=person&types=institution")
+        finally:
+            app.dependency_overrides.clear()
+
+        lines = [orjson.loads(line) for line in response.text.splitlines()]
+        by_type = {line.get("type"): line for line in lines[:-1]}
+        self.assertEqual(by_type["person"]["error"], "timeout")
+        self.assertEqual(by_type["institution"]["count"], 1)
+        self.assertEqual(lines[-1], {"done": True, "count": 1})
+
+
+
+class TestGridCells(unittest.TestCase):
+    def test_grids_nest(self):
+        for zoom in range(settings.MAP_CLUSTER_MAX_ZOOM):
+            self.assertEqual(grid_cells(zoom + 1), 2 * grid_cells(zoom))
+        self.assertEqual(grid_cells(0), 4)  # 64px cells for the default 60px radius
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import asyncio
+import unittest
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.metric import Metric
+from app.models.user import User  # noqa: F401 (metrics.user_id references users)
+from app.services.metric_buffer import MetricBuffer
+
+
+class TestMetricBuffer(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.Session = sessionmaker(bind=engine)
+        self.buffer = MetricBuffer(capacity=5, flush_size=2, interval=60, session_factory=self.Session)
+
+    def count(self):
+        with self.Session() as db:
+            return db.query(Metric).count()
+
+    def test_flush_writes_in_batches(self):
+        for i in range(3):
+            self.buffer.add("page_view", {"path": f"/{i}"})
+        self.assertEqual(self.count(), 0)
+
+        self.assertEqual(asyncio.run(self.buffer.flush()), 3)
+        self.assertEqual(self.count(), 3)
+        stats = self.buffer.stats()
+        self.assertEqual((stats["buffered"], stats["flushed"], stats["dropped"]), (0, 3, 0))
+
+    def test_full_buffer_drops_oldest(self):
+        for i in range(7):
+            self.buffer.add("page_view", {"n": i})
+        self.assertEqual(len(self.buffer), 5)
+        self.assertEqual(self.buffer.dropped, 2)
+
+        asyncio.run(self.buffer.flush())
+        with self.Session() as db:
+            self.assertEqual(sorted(m.payload["n"] for m in db.query(Metric)), [2, 3, 4, 5, 6])
+
+    def test_failed_flush_keeps_events(self):
+        def broken_session():
+            raise RuntimeError("database is down")
+
+        self.buffer.session_factory = broken_session
+        self.buffer.add("download")
+        self.assertEqual(asyncio.run(self.buffer.flush()), 0)
+        self.assertEqual((len(self.buffer), self.buffer.failed_flushes), (1, 1))
+
+        self.buffer.session_factory = self.Session
+        self.assertEqual(asyncio.run(self.buffer.flush()), 1)
+
+    def test_bad_row_is_rejected_alone(self):
+        self.buffer.add("page_view", {"n": 1})
+        self.buffer.add("page_view", {"n": object()})  # not JSON serializable
+        self.buffer.add("page_view", {"n": 3})
+
+        self.assertEqual(asyncio.run(self.buffer.flush()), 2)
+        stats = self.buffer.stats()
+        self.assertEqual((stats["buffered"], stats["rejected"], stats["flushed"]), (0, 1, 2))
+
+    def test_stop_flushes_remaining_events(self):
+        async def run():
+            self.buffer.start()
+            self.buffer.add("page_view")
+            await self.buffer.stop()
+
+        asyncio.run(run())
+        self.assertEqual(self.count(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import csv
+import gzip
+import io
+import unittest
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.metric import Metric
+from app.models.user import User  # noqa: F401 (metrics.user_id references users)
+from app.services.metric_export import export_csv
+
+
+class TestMetricExport(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.Session = sessionmaker(bind=engine)
+        with self.Session() as db:
+            db.execute(Metric.__table__.insert(), [
+                {"event_type": "page_view", "payload": {"path": f"/p/{i}", "q": "a,b"}, "timestamp": datetime(2024, 3, 1, 0, i)}
+                for i in range(7)
+            ] + [{"event_type": "download", "payload": None, "timestamp": datetime(2023, 1, 1)}])
+            db.commit()
+        self.range = (datetime(2024, 1, 1), datetime(2024, 12, 31))
+
+    def test_streams_in_batches(self):
+        chunks = list(export_csv(*self.range, batch_size=3, session_factory=self.Session))
+        self.assertEqual(len(chunks), 4)  # header + 3 batches
+
+        rows = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+        self.assertEqual(rows[0], ['ID', 'Timestamp', 'Event Type', 'User ID', 'Payload'])
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[1][1:], ["2024-03-01T00:06:00", "page_view", "", '{"path":"/p/6","q":"a,b"}'])
+
+    def test_gzip(self):
+        plain = b"".join(export_csv(*self.range, session_factory=self.Session))
+        compressed = b"".join(export_csv(*self.range, compress=True, session_factory=self.Session))
+        self.assertEqual(gzip.decompress(compressed), plain)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from datetime import date, datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.metric import Metric, MetricDaily, MetricHourly
+from app.models.user import User  # noqa: F401 (metrics.user_id references users)
+from app.services import metric_rollups
+
+
+def event(timestamp, event_type="page_view"):
+    return {"timestamp": timestamp, "event_type": event_type, "user_id": None, "payload": None}
+
+
+class TestMetricRollups(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+        self.events = [
+            event(datetime(2024, 3, 1, 9, 15)),
+            event(datetime(2024, 3, 1, 9, 45)),
+            event(datetime(2024, 3, 1, 23, 59), "download"),
+            event(datetime(2024, 3, 2, 10, 5)),
+            event(datetime(2024, 3, 4, 12, 30)),
+            event(datetime(2024, 3, 4, 12, 50), "download"),
+        ]
+
+    def ingest(self, rows):
+        self.db.execute(Metric.__table__.insert(), rows)
+        metric_rollups.record(self.db, rows)
+        self.db.commit()
+
+    def raw_counts(self, start, end):
+        counts = {}
+        for row in self.events:
+            if start <= row["timestamp"] < end:
+                key = (row["timestamp"].date(), row["event_type"])
+                counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def test_record_increments_buckets(self):
+        self.ingest(self.events[:2])
+        self.ingest(self.events[2:])
+        hourly = {(r.bucket, r.event_type): r.count for r in self.db.query(MetricHourly)}
+        self.assertEqual(hourly[(datetime(2024, 3, 1, 9), "page_view")], 2)
+        daily = {(r.bucket, r.event_type): r.count for r in self.db.query(MetricDaily)}
+        self.assertEqual(daily[(datetime(2024, 3, 1), "page_view")], 2)
+        self.assertEqual(daily[(datetime(2024, 3, 4), "download")], 1)
+
+    def test_ranges_match_raw_counts(self):
+        self.ingest(self.events)
+        ranges = [
+            (datetime(2024, 3, 1, 9, 30), datetime(2024, 3, 4, 12, 40)),
+            (datetime(2024, 3, 1), datetime(2024, 3, 5)),
+            (datetime(2024, 3, 1, 9, 20), datetime(2024, 3, 1, 9, 50)),
+            (datetime(2024, 3, 1, 23, 30), datetime(2024, 3, 2, 10, 10)),
+        ]
+        for start, end in ranges:
+            self.assertEqual(metric_rollups.daily_counts(self.db, start, end), self.raw_counts(start, end))
+
+        self.assertEqual(
+            metric_rollups.event_counts(self.db, datetime(2024, 3, 1), datetime(2024, 3, 5)),
+            {"page_view": 4, "download": 2},
+        )
+        self.assertEqual(
+            metric_rollups.daily_counts(self.db, datetime(2024, 3, 1), datetime(2024, 3, 5), "download"),
+            {(date(2024, 3, 1), "download"): 1, (date(2024, 3, 4), "download"): 1},
+        )
+
+    def test_rebuild_from_raw_table(self):
+        self.db.execute(Metric.__table__.insert(), self.events)
+        self.db.commit()
+        self.assertTrue(metric_rollups.is_empty(self.db))
+
+        self.assertEqual(metric_rollups.rebuild(self.db), 5)
+        start, end = datetime(2024, 3, 1), datetime(2024, 3, 5)
+        self.assertEqual(metric_rollups.daily_counts(self.db, start, end), self.raw_counts(start, end))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import asyncio
+import unittest
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from unittest.mock import AsyncMock, patch
+
+from app.routers.institutions import create_institution
+from app.services.name_index import NameIndex, creation_uris, edit_distance, fold_name
+from app.services.queries.persons import PersonQueries
+from app.services.sparql_client import SparqlClient
+from app.models.domain import Institucion, Persona
+
+ONTO = "https://w3id.org/OntoExhibit#"
+
+
+class TestNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = NameIndex()
+        _, self.picasso = PersonQueries.add_persona(Persona(name="Pablo Picasso", type="Individual"))
+        self.index.add(self.picasso, "Pablo Picasso")
+        self.index.add(ONTO + "human_actant/2", "José  Pérez")
+        self.index.add(ONTO + "human_actant/3", "Joan Miró")
+        self.index.add(ONTO + "human_actant/4", "Juan Gris")
+
+    def test_fold_name(self):
+        self.assertEqual(fold_name("  José-María  PÉREZ. "), "jose maria perez")
+        self.assertEqual(fold_name("Ñandú"), "nandu")
+
+    def test_edit_distance(self):
+        self.assertEqual(edit_distance("picasso", "picaso", 2), 1)
+        self.assertEqual(edit_distance("miro", "gris", 4), 4)
+        self.assertIsNone(edit_distance("miro", "gris", 2))
+        self.assertIsNone(edit_distance("ab", "abcdef", 2))
+
+    def test_check(self):
+        result = self.index.check("person", "jose perez")
+        self.assertEqual([e["uri"] for e in result["exact"]], [ONTO + "human_actant/2"])
+
+        result = self.index.check("person", "Pablo Picaso")
+        self.assertEqual(result["exact"], [])
+        self.assertEqual(result["similar"][0]["uri"], self.picasso)
+        self.assertEqual(result["similar"][0]["distance"], 1)
+        self.assertNotIn(ONTO + "human_actant/4", [e["uri"] for e in result["similar"]])
+
+    def test_collision_with_creation_uri(self):
+        self.assertIn(self.picasso, creation_uris("person", "  pablo   picasso"))
+        result = self.index.check("person", "pablo picasso")
+        self.assertEqual(result["collision"]["uri"], self.picasso)
+
+    def test_add_is_idempotent(self):
+        self.index.add(ONTO + "human_actant/3", "Joan Miró")
+        self.assertEqual(len(self.index), 4)
+
+
+    def test_created_institution_uri(self):
+        client = AsyncMock(spec=SparqlClient)
+        with patch("app.routers.institutions.invalidate_write"), \
+                patch("app.routers.institutions.name_indexes") as indexes:
+            result = asyncio.run(create_institution(Institucion(nombre="Museo del Prado"), client, False, None))
+        self.assertEqual([result["uri"]], creation_uris("institution", "Museo del Prado"))
+        indexes.add.assert_called_once_with("institution", result["uri"], result["label"])
+        self.assertIn(f"<{result['uri']}>", client.update.await_args.args[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from unittest.mock import patch
+
+from app.services.invalidation import invalidate_entities, invalidate_for_update, invalidate_write
+from app.services.graph_adjacency import AdjacencyGraph
+from app.services.response_cache import ResponseCache, response_dependencies
+
+ONTO = "https://w3id.org/OntoExhibit#"
+ANA = ONTO + "human_actant/ana"
+EXPO = ONTO + "exhibition/expo1"
+ROLE = ONTO + "role/r1"
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = ResponseCache(ttl=60, max_entries=10)
+        self.cache.set("detail", b"{}", "application/json", '"a"', response_dependencies(
+            "/get_exhibition/expo1", ('{"uri": "%s", "curators": ["%s"]}' % (EXPO, ANA)).encode()))
+        self.cache.set("list", b"{}", "application/json", '"b"', response_dependencies(
+            "/all_persons", ('{"data": [{"uri": "%s"}]}' % ANA).encode()))
+        self.cache.set("other", b"{}", "application/json", '"c"', response_dependencies(
+            "/get_artwork/w1", b'{"uri": "%sa"}' % ONTO.encode()))
+
+    def test_dependencies(self):
+        tags = response_dependencies("/all_persons", ('{"uri": "%s"}' % ANA).encode())
+        self.assertEqual(tags, {ANA, "collection:human_actant"})
+        self.assertIn("id:expo1", response_dependencies("/get_exhibition/expo1", b"{}"))
+        self.assertIn("collection:*", response_dependencies("/map/all", b"{}"))
+
+    def test_only_dependent_entries_are_dropped(self):
+        self.assertEqual(self.cache.invalidate({ANA}), 2)
+        self.assertIsNone(self.cache.get("detail"))
+        self.assertIsNotNone(self.cache.get("other"))
+        self.assertEqual(self.cache.invalidate({"id:w1"}), 1)
+
+    def test_hit_ratio_around_writes(self):
+        self.cache.get("detail")
+        self.cache.get("missing")
+        self.cache.invalidate({EXPO})
+        self.cache.get("other")
+        stats = self.cache.stats()
+        self.assertEqual(stats["before_last_write"]["hit_ratio"], 0.5)
+        self.assertEqual(stats["since_last_write"]["hit_ratio"], 1.0)
+        self.assertEqual(stats["last_write"]["invalidated"], 1)
+
+    def test_invalidate_entities_reaches_neighbours(self):
+        graph = AdjacencyGraph([(ROLE, ONTO + "isRoleOf", ANA), (ROLE, ONTO + "isCuratorOf", EXPO)])
+        with patch("app.services.invalidation.response_cache", self.cache), \
+                patch("app.services.invalidation.detail_cache") as detail_cache, \
+                patch("app.services.invalidation.adjacency_index.peek", return_value=graph):
+            # The role node is written: the person and the exhibition depend on it
+            self.assertEqual(invalidate_entities([ROLE]), 2)
+            self.assertEqual(
+                sorted(call.args[0] for call in detail_cache.invalidate.call_args_list), sorted([ROLE, ANA, EXPO])
+            )
+
+            self.assertEqual(invalidate_for_update("DELETE WHERE { ?s ?p ?o }"), 1)
+            detail_cache.clear.assert_called_once()
+
+
+    def test_write_invalidates_linked_entities(self):
+        # A new exhibition whose curator is an existing person
+        new_expo = ONTO + "exhibition/expo2"
+        query = "INSERT DATA { GRAPH <g> { <%s> <%sisRoleOf> <%s> . <%s> <%sisCuratorOf> <%s> } }" % (
+            ROLE, ONTO, ANA, ROLE, ONTO, new_expo)
+        with patch("app.services.invalidation.response_cache", self.cache), \
+                patch("app.services.invalidation.detail_cache") as detail_cache, \
+                patch("app.services.invalidation.adjacency_index.peek", return_value=None):
+            self.assertEqual(invalidate_write([query], [new_expo]), 2)
+            self.assertIsNone(self.cache.get("list"))
+            self.assertIsNotNone(self.cache.get("other"))
+
+
+if __name__ == "__main__":
+    unittest.main()
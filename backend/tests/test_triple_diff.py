@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from unittest.mock import AsyncMock
+
+from app.core.config import settings
+from app.models.domain import Persona
+from app.services.queries.persons import PersonQueries
+from app.services.sparql_client import SparqlClient
+from app.services.triple_diff import diff_update, scope_patterns
+
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+
+def binding(term):
+    if term.startswith("<"):
+        return {"type": "uri", "value": term[1:-1]}
+    value, _, datatype = term.partition("^^")
+    return {"type": "typed-literal", "value": value.strip('"'), "datatype": datatype[1:-1]}
+
+
+def stored(statements):
+    """SPARQL JSON rows of N-Triples statements (as Virtuoso returns them)."""
+    rows = []
+    for statement in statements:
+        s, p, o = statement.rstrip(" .").split(" ", 2)
+        rows.append({"s": binding(s), "p": binding(p), "o": binding(o)})
+    return {"results": {"bindings": rows}}
+
+
+class TestTripleDiff(unittest.TestCase):
+    def setUp(self):
+        self.old_query, self.uri = PersonQueries.add_persona(Persona(name="Ana Pérez", country="Spain", gender="female"))
+        self.client = AsyncMock(spec=SparqlClient)
+        current = [line.strip() for line in self.old_query.splitlines() if line.strip().endswith(" .")]
+        scope = [line for line in current if line.startswith(f"<{self.uri}") or line.endswith(f"<{self.uri}> .")]
+        outside = [line for line in current if line not in scope]
+
+        async def query(q):
+            return stored(scope if "UNION" in q else [line for line in outside if line.split(" ")[0] in q])
+
+        self.client.query.side_effect = query
+
+    def test_scope_patterns(self):
+        patterns = scope_patterns(PersonQueries.delete_persona(self.uri))
+        self.assertEqual(patterns[0], (f"<{self.uri}>", "?p", "?o"))
+        self.assertEqual(patterns[1], ("?s", "?p", f"<{self.uri}>"))
+
+    def test_only_changes_are_written(self):
+        new_query, uri = PersonQueries.add_persona(Persona(name="Ana Pérez", country="Spain", gender="male"))
+        result = asyncio.run(diff_update(self.client, PersonQueries.delete_persona(uri), new_query))
+
+        self.assertEqual((result["added"], result["removed"]), (1, 1))
+        update = self.client.update.await_args.args[0]
+        self.assertIn("DELETE DATA", update)
+        self.assertIn('"female"', update.split("INSERT DATA")[0])
+        self.assertIn('"male"', update.split("INSERT DATA")[1])
+        self.assertIn(f"GRAPH <{settings.DEFAULT_GRAPH_URL}>", update)
+
+    def test_no_change_no_update(self):
+        result = asyncio.run(diff_update(self.client, PersonQueries.delete_persona(self.uri), self.old_query))
+        self.assertEqual((result["added"], result["removed"]), (0, 0))
+        self.client.update.assert_not_awaited()
+
+
+if __name__ == "__main__":
+    unittest.main()
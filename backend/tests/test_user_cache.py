@@ -0,0 +1,76 @@
+import asyncio
+import unittest
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import security
+from app.core.database import Base
+from app.models.user import User, UserRole, UserStatus
+from app.services.user_cache import load_user, user_cache
+
+
+class TestUserCache(unittest.TestCase):
+    def setUp(self):
+        user_cache.clear()
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+        self.user = User(email="ana@example.org", username="ana", hashed_password="x", role=UserRole.USER, status=UserStatus.PENDING)
+        self.db.add(self.user)
+        self.db.commit()
+
+    def test_second_lookup_skips_the_database(self):
+        db = AsyncMock()
+        db.get.return_value = self.user
+
+        first = asyncio.run(load_user(db, self.user.id))
+        second = asyncio.run(load_user(db, self.user.id))
+        db.get.assert_awaited_once_with(User, self.user.id)
+        self.assertEqual((second.username, second.status), ("ana", UserStatus.PENDING))
+        self.assertIsNot(first, second)
+        self.assertIsNone(second.hashed_password)
+
+    def test_status_change_invalidates(self):
+        user_cache.set(self.user)
+        self.user.status = UserStatus.ACTIVE
+        self.db.commit()
+        self.assertIsNone(user_cache.get(self.user.id))
+
+    def test_entries_expire(self):
+        user_cache.set(self.user)
+        with patch("app.services.user_cache.time.monotonic", return_value=10 ** 9):
+            self.assertIsNone(user_cache.get(self.user.id))
+
+
+class TestTokenCache(unittest.TestCase):
+    def setUp(self):
+        security.clear_token_cache()
+        patcher = patch.object(security.settings, "JWT_SECRET", "secret")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_valid_token_is_verified_once(self):
+        token = security.create_access_token({"sub": "1"})
+        with patch.object(security.jwt, "decode", wraps=security.jwt.decode) as decode:
+            self.assertEqual(security.decode_token(token)["sub"], "1")
+            self.assertEqual(security.decode_token(token)["sub"], "1")
+        decode.assert_called_once()
+
+    def test_invalid_and_expired_tokens(self):
+        self.assertIsNone(security.decode_token("not-a-token"))
+        expired = security.create_access_token({"sub": "1"}, expires_delta=timedelta(seconds=-5))
+        self.assertIsNone(security.decode_token(expired))
+        self.assertEqual(len(security._verified_tokens), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from fastapi import HTTPException
+
+from app.models.user import UserRole
+from app.routers.jobs import get_job
+from app.services.sparql_client import SparqlClient
+from app.services.write_queue import WriteQueue
+
+
+class TestWriteQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = WriteQueue(path=":memory:", batch_size=10, max_bytes=10_000, linger=0)
+        self.client = AsyncMock(spec=SparqlClient)
+        patcher = patch("app.services.write_queue.invalidate_write")
+        self.invalidate_write = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_jobs_are_coalesced(self):
+        first = self.queue.enqueue("create_person", ["INSERT DATA { <a> <p> <b> }"], ["a"], {"uri": "a"})
+        second = self.queue.enqueue("create_exhibition", ["INSERT DATA { <c> <p> <d> }", "INSERT DATA { <d> <q> <e> }"], ["c"])
+        self.assertEqual(first["status"], "queued")
+        self.assertEqual(self.queue.get(second["id"])["position"], 2)
+
+        self.assertEqual(asyncio.run(self.queue.apply_batch(self.client)), 2)
+        self.client.update.assert_awaited_once_with(
+            "INSERT DATA { <a> <p> <b> } ;\nINSERT DATA { <c> <p> <d> } ;\nINSERT DATA { <d> <q> <e> }"
+        )
+        job = self.queue.get(first["id"])
+        self.assertEqual((job["status"], job["result"]), ("done", {"uri": "a"}))
+        self.assertEqual(self.queue.pending(), 0)
+        self.invalidate_write.assert_called_once_with(
+            ["INSERT DATA { <a> <p> <b> }", "INSERT DATA { <c> <p> <d> }", "INSERT DATA { <d> <q> <e> }"], ["a", "c"]
+        )
+
+    def test_update_jobs_apply_a_diff(self):
+        create = self.queue.enqueue("create_person", ["INSERT DATA { <a> <p> <b> }"], ["a"])
+        queries = ["DELETE WHERE { <c> ?p ?o }", "INSERT DATA { <c> <p> <d> }"]
+        update = self.queue.enqueue("update_person", queries, ["c"], {"uri": "c", "updated": True})
+        report = {"added": 1, "removed": 2, "unchanged": 0}
+        with patch("app.services.write_queue.diff_update", AsyncMock(return_value=report)) as diff:
+            self.assertEqual(asyncio.run(self.queue.apply_batch(self.client)), 2)
+
+        diff.assert_awaited_once_with(self.client, ["DELETE WHERE { <c> ?p ?o }"], "INSERT DATA { <c> <p> <d> }")
+        self.client.update.assert_awaited_once_with("INSERT DATA { <a> <p> <b> }")
+        self.assertEqual(self.queue.get(create["id"])["status"], "done")
+        job = self.queue.get(update["id"])
+        self.assertEqual((job["status"], job["result"]), ("done", {"uri": "c", "updated": True, **report}))
+
+    def test_failing_job_is_isolated(self):
+        async def update(query):
+            if "<bad>" in query:
+                raise RuntimeError("syntax error")
+            return {}
+
+        self.client.update.side_effect = update
+        good = self.queue.enqueue("create_person", ["INSERT DATA { <a> <p> <b> }"], ["a"])
+        bad = self.queue.enqueue("create_person", ["INSERT DATA { <bad> }"], ["bad"])
+        asyncio.run(self.queue.apply_batch(self.client))
+
+        self.assertEqual(self.queue.get(good["id"])["status"], "done")
+        failed = self.queue.get(bad["id"])
+        self.assertEqual((failed["status"], failed["error"]), ("failed", "syntax error"))
+        self.assertEqual(self.client.update.await_count, 3)
+
+    def test_interrupted_jobs_are_resumed(self):
+        job = self.queue.enqueue("create_person", ["INSERT DATA { <a> <p> <b> }"], ["a"])
+        self.queue._claim()
+        self.assertEqual(self.queue.get(job["id"])["status"], "running")
+
+        async def restart():
+            self.queue.start(self.client)
+            await asyncio.sleep(0.05)
+            await self.queue.stop()
+
+        asyncio.run(restart())
+        self.assertEqual(self.queue.get(job["id"])["status"], "done")
+
+    def test_jobs_are_private_to_their_user(self):
+        job = self.queue.enqueue("create_person", ["INSERT DATA { <a> <p> <b> }"], ["a"], user_id=1)
+        owner = SimpleNamespace(id=1, role=UserRole.USER)
+        other = SimpleNamespace(id=2, role=UserRole.USER)
+        admin = SimpleNamespace(id=3, role=UserRole.ADMIN)
+        with patch("app.routers.jobs.write_queue", self.queue):
+            self.assertEqual(asyncio.run(get_job(job["id"], owner))["status"], "queued")
+            self.assertEqual(asyncio.run(get_job(job["id"], admin))["id"], job["id"])
+            with self.assertRaises(HTTPException) as raised:
+                asyncio.run(get_job(job["id"], other))
+        self.assertEqual(raised.exception.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()